@@ -4,11 +4,14 @@
 MariaDB Cloud DB 설정: sensors, telemetry 테이블 생성 + 장비 10개 분량 더미 데이터(~100건) 삽입
 skysql_ca.pem 인증서를 사용한 SSL 보안 연결
 
-실행: python db_setup.py
+실행: python db_setup.py [--partitioned]
+      --partitioned: telemetry 를 recorded_at 일 단위 파티션 테이블로 생성 (docs/09_telemetry_partitioned.sql,
+                     이후 파티션 관리는 python_backend/telemetry_partitions.py maintain)
 필수: .env 또는 python_backend/.env 에 DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME 설정
       skysql_ca.pem 파일 (프로젝트 루트 또는 DB_CA_PATH 경로)
 """
 
+import argparse
 import os
 import random
 from datetime import datetime, timedelta
@@ -119,8 +122,26 @@ def _gen_value(sensor_idx: int, is_anomaly: bool) -> tuple[float, str]:
     return round(random.uniform(n_min, n_max), 2), "normal"
 
 
-def create_tables(cur):
-    """sensors, telemetry 테이블 생성"""
+# --partitioned 시 오늘 기준 과거/미래 일자 파티션 수 (더미 데이터가 최근 7일 범위)
+PARTITION_DAYS_BEFORE = 8
+PARTITION_DAYS_AHEAD = 14
+
+
+def _telemetry_partitions_sql() -> str:
+    """p_history + 일 단위 파티션 + p_future(MAXVALUE) 정의 (telemetry_partitions.py 이름 규칙과 동일)"""
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=PARTITION_DAYS_BEFORE)
+    parts = [f"PARTITION p_history VALUES LESS THAN ('{start.isoformat()} 00:00:00')"]
+    for i in range(PARTITION_DAYS_BEFORE + PARTITION_DAYS_AHEAD + 1):
+        day = start + timedelta(days=i)
+        upper = day + timedelta(days=1)
+        parts.append(f"PARTITION {day.strftime('p%Y%m%d')} VALUES LESS THAN ('{upper.isoformat()} 00:00:00')")
+    parts.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    return "PARTITION BY RANGE COLUMNS (recorded_at) (\n  " + ",\n  ".join(parts) + "\n)"
+
+
+def create_tables(cur, partitioned: bool = False):
+    """sensors, telemetry 테이블 생성 (partitioned: PK (id, recorded_at), FK 없음 — 파티션 테이블 제약)"""
     cur.execute("""
         CREATE TABLE IF NOT EXISTS sensors (
           id INT AUTO_INCREMENT PRIMARY KEY,
@@ -136,6 +157,25 @@ def create_tables(cur):
           INDEX idx_sensor_type (sensor_type)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     """)
+    if partitioned:
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS telemetry (
+          id BIGINT AUTO_INCREMENT,
+          sensor_id INT NOT NULL,
+          recorded_at DATETIME NOT NULL,
+          value DOUBLE NOT NULL,
+          label VARCHAR(20) NOT NULL DEFAULT 'normal',
+          meta JSON DEFAULT NULL,
+          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (id, recorded_at),
+          INDEX idx_sensor_recorded (sensor_id, recorded_at),
+          INDEX idx_recorded (recorded_at),
+          INDEX idx_label (label)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        {_telemetry_partitions_sql()}
+        """)
+        print("테이블 생성 완료: sensors, telemetry (일 단위 파티션)")
+        return
     cur.execute("""
         CREATE TABLE IF NOT EXISTS telemetry (
           id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -192,11 +232,15 @@ def insert_sensors_and_dummy(cur, conn):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="sensors, telemetry 테이블 생성 + 더미 데이터 삽입")
+    parser.add_argument("--partitioned", action="store_true", help="telemetry 를 recorded_at 일 단위 파티션 테이블로 생성")
+    args = parser.parse_args()
+
     print("MariaDB Cloud DB 설정 시작 (skysql_ca.pem SSL 연결)")
     conn = get_conn()
     try:
         cur = conn.cursor()
-        create_tables(cur)
+        create_tables(cur, partitioned=args.partitioned)
         insert_sensors_and_dummy(cur, conn)
         cur.close()
         print("DB 설정 완료.")
@@ -14,11 +14,13 @@ CREATE TABLE IF NOT EXISTS training_data (
 -- 예측 결과 (대시보드에서 보여줄 데이터)
 CREATE TABLE IF NOT EXISTS predictions (
   id INT AUTO_INCREMENT PRIMARY KEY,
+  uid CHAR(36) NULL COMMENT 'write-behind 저장 시 발급한 UUID (docs/06_predictions_uid.sql)',
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   model_name VARCHAR(50) COMMENT '사용한 모델 이름',
   input_summary JSON COMMENT '예측에 쓴 입력 요약',
   prediction_value FLOAT COMMENT '예측값',
-  meta JSON COMMENT '기타 메타정보'
+  meta JSON COMMENT '기타 메타정보',
+  UNIQUE INDEX uq_predictions_uid (uid)
 );
 
 -- 위험/이상 징후 알림 이벤트 로그 (이상 징후 자동 알림 시스템, Slack 발송 기록)
@@ -0,0 +1,10 @@
+-- predictions.uid: write-behind 저장(PREDICTION_WRITE_BEHIND=true)용 사전 발급 UUID
+-- 사용법: mysql -u 사용자명 -p 데이터베이스명 < docs/06_predictions_uid.sql
+-- /api/predict 는 INSERT 전에 uid 를 응답으로 돌려주고, 저장 후 uid → id 로 조회해 위험 알림에 사용합니다.
+
+ALTER TABLE predictions
+  ADD COLUMN IF NOT EXISTS uid CHAR(36) NULL COMMENT 'write-behind 저장 시 발급한 UUID' AFTER id,
+  ADD UNIQUE INDEX IF NOT EXISTS uq_predictions_uid (uid);
+
+-- 예시: 확인
+-- DESCRIBE predictions;
@@ -0,0 +1,31 @@
+-- sensor_stats: 센서별 누적 통계 (고장 확률 계산용, 텔레메트리 원본 재조회 없이 O(센서 수))
+-- job_watermarks: 증분 작업의 처리 위치 (telemetry.id 워터마크)
+-- 사용법: mysql -u 사용자명 -p 데이터베이스명 < docs/07_sensor_stats.sql
+-- 갱신: 텔레메트리 적재 시 증분 반영 + python_backend/sensor_stats.py 의 catch-up 작업 (FastAPI 실행 시 백그라운드)
+
+CREATE TABLE IF NOT EXISTS sensor_stats (
+  sensor_id INT PRIMARY KEY COMMENT '센서 ID (sensors.id)',
+  sample_count BIGINT NOT NULL DEFAULT 0 COMMENT '반영된 측정값 수',
+  mean DOUBLE NOT NULL DEFAULT 0 COMMENT '누적 평균 (Welford)',
+  m2 DOUBLE NOT NULL DEFAULT 0 COMMENT '편차 제곱합 (Welford M2, 분산 = m2 / sample_count)',
+  ewma_mean DOUBLE DEFAULT NULL COMMENT '지수가중 이동평균',
+  ewma_var DOUBLE DEFAULT NULL COMMENT '지수가중 이동분산',
+  last_value DOUBLE DEFAULT NULL COMMENT '마지막 반영 측정값',
+  last_recorded_at DATETIME DEFAULT NULL COMMENT '마지막 반영 측정 시각',
+  last_telemetry_id BIGINT NOT NULL DEFAULT 0 COMMENT '마지막 반영 telemetry.id (중복 반영 방지)',
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  CONSTRAINT fk_sensor_stats_sensor FOREIGN KEY (sensor_id) REFERENCES sensors(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT '센서별 누적 통계 (Welford + EWMA)';
+
+CREATE TABLE IF NOT EXISTS job_watermarks (
+  job_name VARCHAR(64) PRIMARY KEY COMMENT '작업 이름 (예: sensor_stats)',
+  last_id BIGINT NOT NULL DEFAULT 0 COMMENT '처리 완료한 마지막 원본 id',
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT '증분 작업 워터마크';
+
+-- 예시: 확인
+-- SELECT * FROM sensor_stats;
+-- SELECT * FROM job_watermarks;
+-- 전체 재계산: python sensor_stats.py rebuild
@@ -0,0 +1,26 @@
+-- telemetry_rollups: 센서별 시간 구간 집계 (1분 / 1시간 / 1일)
+-- 대시보드 장기 차트는 원본 telemetry 대신 이 테이블을 조회 (GET /api/telemetry/series)
+-- 사용법: mysql -u 사용자명 -p 데이터베이스명 < docs/08_telemetry_rollups.sql
+-- 선행: docs/07_sensor_stats.sql (job_watermarks 테이블)
+-- 갱신: python_backend/telemetry_rollups.py catch-up 작업 (FastAPI 실행 시 백그라운드, telemetry.id 워터마크 기준 증분)
+
+CREATE TABLE IF NOT EXISTS telemetry_rollups (
+  sensor_id INT NOT NULL COMMENT '센서 ID (sensors.id)',
+  resolution VARCHAR(4) NOT NULL COMMENT '집계 단위: 1m, 1h, 1d',
+  bucket_start DATETIME NOT NULL COMMENT '구간 시작 시각 (recorded_at 내림)',
+  sample_count BIGINT NOT NULL DEFAULT 0 COMMENT '측정값 수',
+  min_value DOUBLE DEFAULT NULL COMMENT '최소값',
+  max_value DOUBLE DEFAULT NULL COMMENT '최대값',
+  sum_value DOUBLE NOT NULL DEFAULT 0 COMMENT '합계 (평균 = sum_value / sample_count)',
+  sum_sq DOUBLE NOT NULL DEFAULT 0 COMMENT '제곱합 (분산 = sum_sq / n - 평균^2)',
+  anomaly_count BIGINT NOT NULL DEFAULT 0 COMMENT 'label = anomaly 건수',
+  PRIMARY KEY (sensor_id, resolution, bucket_start),
+  CONSTRAINT fk_telemetry_rollups_sensor FOREIGN KEY (sensor_id) REFERENCES sensors(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT '텔레메트리 시간 구간 집계';
+
+-- 예시: 센서 1 의 최근 하루 1시간 집계
+-- SELECT bucket_start, sample_count, sum_value / sample_count AS mean, min_value, max_value
+-- FROM telemetry_rollups WHERE sensor_id = 1 AND resolution = '1h' AND bucket_start >= NOW() - INTERVAL 1 DAY
+-- ORDER BY bucket_start;
+-- 전체 재계산: python telemetry_rollups.py rebuild
@@ -0,0 +1,47 @@
+-- telemetry 파티션 구조 (RANGE COLUMNS(recorded_at), 일 단위)
+-- 오래된 데이터 삭제를 대량 DELETE 대신 DROP PARTITION 으로, recorded_at 범위 조회는 해당 파티션만 읽도록(파티션 프루닝)
+-- 사용법: mysql -u 사용자명 -p 데이터베이스명 < docs/09_telemetry_partitioned.sql
+-- 이후 파티션 생성·만료 삭제: python python_backend/telemetry_partitions.py maintain (매일 cron 권장)
+--
+-- 파티션 테이블 제약 (MariaDB/InnoDB)
+-- - 모든 PRIMARY/UNIQUE 키에 파티션 컬럼 포함 → PRIMARY KEY (id, recorded_at). id 는 계속 AUTO_INCREMENT 로 유일
+-- - FOREIGN KEY 미지원 → fk_telemetry_sensor 제거 (센서 존재 검증은 /api/telemetry/bulk 가 수행)
+-- 파생 테이블 sensor_stats, telemetry_rollups 는 원본 파티션을 삭제해도 그대로 유지됩니다.
+
+-- ① 새로 만드는 경우 (기존 telemetry 가 없을 때)
+CREATE TABLE IF NOT EXISTS telemetry (
+  id BIGINT AUTO_INCREMENT,
+  sensor_id INT NOT NULL COMMENT '센서 ID (sensors.id)',
+  recorded_at DATETIME NOT NULL COMMENT '측정 시각',
+  value DOUBLE NOT NULL COMMENT '측정값',
+  label VARCHAR(20) NOT NULL DEFAULT 'normal' COMMENT '정상/이상 레이블: normal, anomaly (분석·테스트용)',
+  meta JSON DEFAULT NULL COMMENT '추가 메타 (원시값, 보정계수 등)',
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id, recorded_at),
+  INDEX idx_sensor_recorded (sensor_id, recorded_at),
+  INDEX idx_recorded (recorded_at),
+  INDEX idx_label (label)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT '설비 예지보전 텔레메트리 시계열 (일 단위 파티션)'
+PARTITION BY RANGE COLUMNS (recorded_at) (
+  PARTITION p_history VALUES LESS THAN ('2025-01-01 00:00:00'),
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+-- 생성 직후 한 번 실행해 오늘 이후 파티션을 만들어 두세요: python telemetry_partitions.py maintain
+-- (p_history 경계는 보관할 가장 오래된 데이터 시점에 맞게 조정. 그 이전 데이터는 p_history 에 모임)
+
+-- ② 기존 (파티션 없는) telemetry 를 옮기는 경우
+-- 1) 위 CREATE 문에서 테이블 이름만 telemetry_p 로 바꿔 생성 (p_history 경계 = 일 단위로 나눌 가장 오래된 날짜)
+--    빈 상태에서 일자 파티션을 먼저 만들어 둠 (복사 후 REORGANIZE 하면 데이터가 이동하므로):
+--    python telemetry_partitions.py --table telemetry_p maintain
+-- 2) id 구간별로 나눠 복사 (한 번에 너무 큰 트랜잭션이 되지 않도록)
+--    INSERT INTO telemetry_p SELECT * FROM telemetry WHERE id > 0 AND id <= 1000000;
+--    INSERT INTO telemetry_p SELECT * FROM telemetry WHERE id > 1000000 AND id <= 2000000;  -- ... 반복
+-- 3) 복사 중 새로 들어온 행까지 옮긴 뒤 한 번에 교체
+--    RENAME TABLE telemetry TO telemetry_old, telemetry_p TO telemetry;
+-- 4) 확인 후 DROP TABLE telemetry_old;
+
+-- 예시: 파티션 확인
+-- SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS
+-- WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'telemetry';
+-- EXPLAIN PARTITIONS SELECT * FROM telemetry WHERE recorded_at >= '2025-03-01' AND recorded_at < '2025-03-02';
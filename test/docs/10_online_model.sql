@@ -0,0 +1,19 @@
+-- model_online_stats: 훈련 데이터 온라인 학습용 정규방정식 충분 통계량 (python_backend/online_model.py)
+-- POST /api/training-data 저장 시 같은 트랜잭션에서 XᵀX, Xᵀy 를 갱신하고, refit 이 계수를 풀어 모델 레지스트리에 게시
+-- 사용법: mysql -u 사용자명 -p 데이터베이스명 < docs/10_online_model.sql
+-- 사용: .env 에 ONLINE_MODEL_ENABLED=true, 주기 게시는 ONLINE_MODEL_REFIT_SEC (또는 POST /api/model/refit)
+
+CREATE TABLE IF NOT EXISTS model_online_stats (
+  model_name VARCHAR(64) NOT NULL COMMENT '통계 이름 (capacity_online)',
+  spec JSON DEFAULT NULL COMMENT '항 구성·정규화 값: features, terms, shift, scale, forget',
+  stats JSON DEFAULT NULL COMMENT '충분 통계량: n(유효 표본 수), xtx, xty, yty, ysum',
+  last_training_id BIGINT NOT NULL DEFAULT 0 COMMENT '마지막으로 반영한 training_data.id',
+  published_training_id BIGINT DEFAULT NULL COMMENT '마지막 게시 시점의 last_training_id',
+  published_version VARCHAR(64) DEFAULT NULL COMMENT '마지막으로 게시한 레지스트리 버전',
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (model_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT '훈련 데이터 온라인 학습 통계';
+
+-- 기존 training_data 반영: python online_model.py catchup (FastAPI refit 주기에도 자동 수행)
+-- 차수·망각 계수 변경 후 전체 재계산: python online_model.py rebuild
@@ -11,7 +11,7 @@ from pathlib import Path
 # 프로젝트 경로 추가
 sys.path.insert(0, str(Path(__file__).parent / "python_backend"))
 
-from db import get_db, insert_training_data
+from db import get_db, insert_training_data, lock_online_stats
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -49,8 +49,9 @@ def example_2_insert_single():
     )
     print(f"✓ 함수 사용: ID {new_id} 삽입 완료")
     
-    # 방법 2: 직접 SQL 실행
+    # 방법 2: 직접 SQL 실행 (training_data 저장 전에는 온라인 학습 통계 잠금 — python_backend/db.py 참고)
     with get_db() as cur:
+        lock_online_stats(cur)
         cur.execute(
             "INSERT INTO training_data (feature1, feature2, target) VALUES (%s, %s, %s)",
             (973.0, 9.4, 189.45)
@@ -80,6 +81,7 @@ def example_3_insert_multiple():
     # 방법 2: executemany 사용 (더 빠름)
     print("\n방법 2: executemany 사용")
     with get_db() as cur:
+        lock_online_stats(cur)
         cur.executemany(
             "INSERT INTO training_data (feature1, feature2, target) VALUES (%s, %s, %s)",
             data_list
@@ -1,74 +1,137 @@
 """
 2차전지 양극재 소성 공정 가상 데이터 생성
 - 방전용량: 소성온도, Li_Me_비율과 상관관계 있음
+- NumPy 벡터화: 청크 단위로 생성해 바로 파일에 쓰므로 --rows 가 1억 행이어도 메모리는 청크 크기만큼만 사용
+- 재현성: BLOCK_ROWS 행 블록마다 (시드, 블록 번호) 로 만든 난수 생성기를 쓰므로 같은 시드면 --chunk 와 무관하게 같은 데이터
+
+실행: python generate_cathode_data.py                      (500행 → cathode_calcination_data.csv)
+      python generate_cathode_data.py --rows 10000000 --out big.csv --chunk 1000000
+      python generate_cathode_data.py --rows 100000000 --format npy --out big.npy   (열 순서 = COLUMNS, float64)
 """
 
-import csv
-import random
-
-# 재현성을 위한 시드
-random.seed(42)
-
-def generate_cathode_data(n_rows=500):
-    """양극재 소성 공정 데이터 생성"""
-    data = []
-    
-    for _ in range(n_rows):
-        # 소성온도 (℃): 750~1000, 양극재 소성 전형 구간
-        temp = round(random.uniform(750, 1000), 1)
-        
-        # 소성시간 (h): 8~24
-        time = round(random.uniform(8, 24), 1)
-        
-        # Li_Me_비율: 0.98~1.08, NCM 전형 구간
-        ratio = round(random.uniform(0.98, 1.08), 4)
-        
-        # 니켈함량 (%): 60~90, 고니켈 NCM
-        ni = round(random.uniform(60, 90), 2)
-        
-        # 방전용량: 온도·비율과 상관관계
-        # - 온도: 880~920°C 근처에서 최대 (포물선)
-        temp_opt = 900
-        temp_factor = -0.002 * (temp - temp_opt) ** 2 + 1.0  # 0.5~1.0 구간
-        # - 비율: 1.02~1.04 근처에서 최대
-        ratio_opt = 1.03
-        ratio_factor = -80 * (ratio - ratio_opt) ** 2 + 1.0  # 0.2~1.0 구간
-        
-        base_capacity = 185  # mAh/g 근처 기준
-        capacity = (
-            base_capacity * 0.85
-            + base_capacity * 0.15 * max(0.3, temp_factor)
-            + base_capacity * 0.15 * max(0.2, ratio_factor)
-            + random.gauss(0, 2.5)
-        )
-        capacity = round(max(160, min(210, capacity)), 2)
-        
-        data.append({
-            '소성온도': temp,
-            '소성시간': time,
-            'Li_Me_비율': ratio,
-            '니켈함량': ni,
-            '방전용량': capacity
-        })
-    
-    return data
+import argparse
+import time
 
+import numpy as np
 
-def main():
-    data = generate_cathode_data(500)
-    path = 'cathode_calcination_data.csv'
-    
-    columns = ['소성온도', '소성시간', 'Li_Me_비율', '니켈함량', '방전용량']
-    
+COLUMNS = ['소성온도', '소성시간', 'Li_Me_비율', '니켈함량', '방전용량']
+DECIMALS = [1, 1, 4, 2, 2]  # 컬럼별 반올림 자릿수 (CSV 출력 형식도 동일)
+BLOCK_ROWS = 1 << 16  # 난수 블록 크기 (바꾸면 같은 시드라도 데이터가 달라짐)
+DEFAULT_SEED = 42  # 재현성을 위한 시드
+
+
+def _block(seed, block_no):
+    """블록 1개 (BLOCK_ROWS, 5) 생성. 블록마다 독립 난수열 → 어느 청크 경계에서 시작해도 같은 값."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block_no,)))
+    n = BLOCK_ROWS
+    # 소성온도 (℃): 750~1000, 양극재 소성 전형 구간
+    temp = np.round(rng.uniform(750, 1000, n), 1)
+    # 소성시간 (h): 8~24
+    hours = np.round(rng.uniform(8, 24, n), 1)
+    # Li_Me_비율: 0.98~1.08, NCM 전형 구간
+    ratio = np.round(rng.uniform(0.98, 1.08, n), 4)
+    # 니켈함량 (%): 60~90, 고니켈 NCM
+    ni = np.round(rng.uniform(60, 90, n), 2)
+
+    # 방전용량: 온도·비율과 상관관계
+    # - 온도: 880~920°C 근처에서 최대 (포물선)
+    temp_opt = 900
+    temp_factor = -0.002 * (temp - temp_opt) ** 2 + 1.0  # 0.5~1.0 구간
+    # - 비율: 1.02~1.04 근처에서 최대
+    ratio_opt = 1.03
+    ratio_factor = -80 * (ratio - ratio_opt) ** 2 + 1.0  # 0.2~1.0 구간
+
+    base_capacity = 185  # mAh/g 근처 기준
+    capacity = (
+        base_capacity * 0.85
+        + base_capacity * 0.15 * np.maximum(0.3, temp_factor)
+        + base_capacity * 0.15 * np.maximum(0.2, ratio_factor)
+        + rng.normal(0, 2.5, n)
+    )
+    capacity = np.round(np.clip(capacity, 160, 210), 2)
+    return np.column_stack((temp, hours, ratio, ni, capacity))
+
+
+def generate_rows(start, stop, seed=DEFAULT_SEED, cache=None):
+    """
+    [start, stop) 번째 행 → (stop - start, 5) 배열 (열 순서 = COLUMNS).
+    cache: 호출 간에 재사용할 dict (마지막 블록 1개 보관) → 이어지는 호출이 같은 블록을 다시 생성하지 않음
+    """
+    if stop <= start:
+        return np.empty((0, len(COLUMNS)))
+    first, last = start // BLOCK_ROWS, (stop - 1) // BLOCK_ROWS
+    cache = {} if cache is None else cache
+    blocks = [cache[b] if b in cache else _block(seed, b) for b in range(first, last + 1)]
+    cache.clear()
+    cache[last] = blocks[-1]
+    offset = start - first * BLOCK_ROWS
+    rows = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+    return rows[offset:offset + (stop - start)].copy()
+
+
+def iter_chunks(n_rows, chunk_rows=1_000_000, seed=DEFAULT_SEED):
+    """chunk_rows 행씩 (n, 5) 배열 yield (청크가 BLOCK_ROWS 보다 작아도 블록마다 1번만 생성)"""
+    cache = {}
+    for start in range(0, n_rows, chunk_rows):
+        yield generate_rows(start, min(n_rows, start + chunk_rows), seed, cache)
+
+
+def generate_cathode_data(n_rows=500, seed=DEFAULT_SEED):
+    """양극재 소성 공정 데이터 생성 (행 dict 리스트, 소량용)"""
+    return [dict(zip(COLUMNS, row)) for row in generate_rows(0, n_rows, seed).tolist()]
+
+
+def write_csv(path, n_rows, chunk_rows, seed, progress=None):
+    # 청크 전체를 % 포맷 1회로 문자열화 (np.savetxt 의 행별 포맷보다 2배 이상 빠름)
+    row_fmt = ','.join(f'%.{d}f' for d in DECIMALS) + '\n'
     with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-        w = csv.DictWriter(f, fieldnames=columns)
-        w.writeheader()
-        w.writerows(data)
-    
-    print(f'저장 완료: {path} ({len(data)}행)')
-    print('컬럼:', columns)
+        f.write(','.join(COLUMNS) + '\n')
+        done = 0
+        for chunk in iter_chunks(n_rows, chunk_rows, seed):
+            f.write((row_fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+            done += len(chunk)
+            if progress:
+                progress(done)
+
+
+def write_npy(path, n_rows, chunk_rows, seed, progress=None):
+    """(n_rows, 5) float64 .npy 를 청크씩 채움 (np.load(path, mmap_mode='r') 로 바로 읽기 가능)"""
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(n_rows, len(COLUMNS)))
+    done = 0
+    for chunk in iter_chunks(n_rows, chunk_rows, seed):
+        out[done:done + len(chunk)] = chunk
+        done += len(chunk)
+        if progress:
+            progress(done)
+    out.flush()
+    del out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='양극재 소성 공정 가상 데이터 생성')
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--chunk', type=int, default=1_000_000, help='한 번에 생성·기록할 행 수 (메모리 한도)')
+    parser.add_argument('--format', choices=('csv', 'npy'), default='csv')
+    parser.add_argument('--out', help='출력 파일 (기본: cathode_calcination_data.csv / .npy)')
+    args = parser.parse_args()
+    path = args.out or f'cathode_calcination_data.{args.format}'
+
+    t0 = time.perf_counter()
+    chunks_total = max(1, -(-args.rows // args.chunk))
+
+    def progress(done):
+        if chunks_total > 1:
+            elapsed = time.perf_counter() - t0
+            print(f'  {done:,}/{args.rows:,}행 ({done / elapsed:,.0f} rows/s)')
+
+    writer = write_csv if args.format == 'csv' else write_npy
+    writer(path, args.rows, args.chunk, args.seed, progress)
+
+    print(f'저장 완료: {path} ({args.rows}행, {time.perf_counter() - t0:.1f}초)')
+    print('컬럼:', COLUMNS)
     print('\n처음 5행:')
-    for row in data[:5]:
+    for row in generate_cathode_data(min(5, args.rows), args.seed):
         print(row)
 
 
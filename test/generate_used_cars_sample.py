@@ -4,19 +4,23 @@
 중고차 샘플 데이터 500건 생성 (학습용)
 - used_cars: 브랜드, 모델, 연식, 주행거리, 사고 이력
 - monthly_market_prices: 월별 시장 시세 (최근 12개월)
-실행: python generate_used_cars_sample.py [--sql-only] [--db]
-  --sql-only: DB 없이 SQL 파일만 생성 (used_cars_sample.sql)
-  --db: .env 기반으로 MariaDB에 직접 INSERT (기본 동작)
+실행: python generate_used_cars_sample.py [--sql-only] [--db] [--count N] [--chunk 10000]
+  --sql-only: DB 없이 SQL 파일만 생성 (used_cars_sample.sql, --rows-per-insert 행씩 다중 행 INSERT)
+  --db: .env 기반으로 MariaDB에 직접 INSERT (기본 동작, 청크마다 executemany + 커밋)
+차량을 --chunk 대씩 생성해 바로 기록하므로 --count 1000만도 메모리는 청크 크기만큼만 사용
 """
 
 import argparse
 import os
 import random
+import time
 from pathlib import Path
 
 # 프로젝트 루트 기준
 ROOT = Path(__file__).resolve().parent
 SQL_OUT = ROOT / "docs" / "used_cars_sample.sql"
+SQL_INSERT_CAR = "INSERT INTO used_cars (id, brand, model, model_year, mileage, accident_count, accident_notes)"
+SQL_INSERT_PRICE = "INSERT INTO monthly_market_prices (car_id, `year_month`, market_price)"
 
 # 브랜드별 모델 (한국·수입 혼합)
 BRAND_MODELS = {
@@ -53,22 +57,25 @@ BASE_PRICE_RANGES = [
 ]
 
 
-def pick_brand_model():
-    brand = random.choice(list(BRAND_MODELS.keys()))
-    model = random.choice(BRAND_MODELS[brand])
+BRANDS = list(BRAND_MODELS.keys())
+
+
+def pick_brand_model(rng):
+    brand = rng.choice(BRANDS)
+    model = rng.choice(BRAND_MODELS[brand])
     return brand, model
 
 
-def pick_base_price_range(brand):
+def pick_base_price_range(brand, rng):
     if brand in ("BMW", "벤츠", "아우디", "폭스바겐", "토요타", "혼다"):
-        return random.choice(BASE_PRICE_RANGES[2:])
+        return rng.choice(BASE_PRICE_RANGES[2:])
     if brand == "제네시스":
-        return random.choice(BASE_PRICE_RANGES[1:])
-    return random.choice(BASE_PRICE_RANGES)
+        return rng.choice(BASE_PRICE_RANGES[1:])
+    return rng.choice(BASE_PRICE_RANGES)
 
 
 def generate_car(rng, year_base=2025):
-    brand, model = pick_brand_model()
+    brand, model = pick_brand_model(rng)
     # 연식: 최근 2~10년
     model_year = rng.randint(year_base - 10, year_base - 2)
     # 주행거리: 연식에 비례 + 편차 (년당 1.5만~2.5만 km 가정)
@@ -103,7 +110,7 @@ def price_for_month(base_price, year_month_str, model_year, mileage, accident_co
 
 
 def generate_monthly_prices(car_id, car, year_months, rng):
-    low, high = pick_base_price_range(car["brand"])
+    low, high = pick_base_price_range(car["brand"], rng)
     base_price = rng.randint(low, high)
     rows = []
     for ym in year_months:
@@ -120,47 +127,94 @@ def year_months(count=12, year_base=2025):
     return [f"{y}{m:02d}" for m in range(1, min(count, 12) + 1)]
 
 
+def iter_chunks(rng, n, chunk_size, months, start_id=1):
+    """차량 chunk_size 대씩 (차량 행 목록, 월별 시세 행 목록) yield. 한 청크만 메모리에 유지 (스트리밍)."""
+    for chunk_start in range(0, n, chunk_size):
+        cars, prices = [], []
+        for car_id in range(start_id + chunk_start, start_id + min(n, chunk_start + chunk_size)):
+            c = generate_car(rng)
+            cars.append((car_id, c["brand"], c["model"], c["model_year"], c["mileage"], c["accident_count"], c["accident_notes"]))
+            prices.extend(generate_monthly_prices(car_id, c, months, rng))
+        yield cars, prices
+
+
+def _sql_value(v):
+    if v is None:
+        return "NULL"
+    if isinstance(v, str):
+        return "'" + v.replace("\\", "\\\\").replace("'", "''") + "'"
+    return str(v)
+
+
+def _write_inserts(f, head, rows, rows_per_insert):
+    """rows 를 rows_per_insert 행씩 다중 행 INSERT 문으로 기록"""
+    for i in range(0, len(rows), rows_per_insert):
+        values = ",\n  ".join("(" + ",".join(_sql_value(v) for v in row) + ")" for row in rows[i:i + rows_per_insert])
+        f.write(f"{head} VALUES\n  {values};\n")
+
+
+def write_sql(path, chunks, n, months, rows_per_insert, progress):
+    """SQL 파일 출력. 청크마다 트랜잭션 1개 (재실행 시 커밋 횟수 = 청크 수), id 를 명시해 car_id 와 일치 보장."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("-- 중고차 샘플 데이터 (학습용, {}건)\n".format(n))
+        f.write("-- 생성: generate_used_cars_sample.py --sql-only (다중 행 INSERT, {}행/문)\n".format(rows_per_insert))
+        f.write("-- 월별 시세: 차량별 기준월 {}개월\n\n".format(len(months)))
+        f.write("SET NAMES utf8mb4;\n\n")
+        done = 0
+        for cars, prices in chunks:
+            f.write("START TRANSACTION;\n")
+            _write_inserts(f, SQL_INSERT_CAR, cars, rows_per_insert)
+            _write_inserts(f, SQL_INSERT_PRICE, prices, rows_per_insert)
+            f.write("COMMIT;\n")
+            done += len(cars)
+            progress(done)
+
+
+def insert_db(conn, chunks, progress):
+    """청크마다 executemany(다중 행 INSERT) 2회 + 커밋 1회"""
+    with conn.cursor() as cur:
+        done = 0
+        for cars, prices in chunks:
+            try:
+                cur.executemany(SQL_INSERT_CAR + " VALUES (%s,%s,%s,%s,%s,%s,%s)", cars)
+                cur.executemany(SQL_INSERT_PRICE + " VALUES (%s,%s,%s)", prices)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            done += len(cars)
+            progress(done)
+
+
+
 def main():
     parser = argparse.ArgumentParser(description="중고차 샘플 500건 생성")
     parser.add_argument("--sql-only", action="store_true", help="DB 없이 SQL 파일만 생성")
     parser.add_argument("--count", type=int, default=500, help="생성할 차량 수 (기본 500)")
     parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--chunk", type=int, default=10000, help="청크(트랜잭션) 당 차량 수")
+    parser.add_argument("--rows-per-insert", type=int, default=1000, help="--sql-only: INSERT 문 1개당 행 수")
+    parser.add_argument("--start-id", type=int, default=1, help="--sql-only: 첫 차량 id (DB 모드는 MAX(id)+1)")
+    parser.add_argument("--out", type=Path, default=SQL_OUT, help="--sql-only: 출력 파일")
     args = parser.parse_args()
 
     rng = random.Random(args.seed)
     n = args.count
     year_months_list = year_months(12)
+    chunk = max(1, args.chunk)
+    t0 = time.perf_counter()
 
-    cars = [generate_car(rng) for _ in range(n)]
+    def progress(done):
+        if n > chunk:
+            print(f"  {done:,}/{n:,}대 ({done / (time.perf_counter() - t0):,.0f}대/s)")
 
     if args.sql_only:
         # SQL 파일로 출력
-        SQL_OUT.parent.mkdir(parents=True, exist_ok=True)
-        with open(SQL_OUT, "w", encoding="utf-8") as f:
-            f.write("-- 중고차 샘플 데이터 (학습용, {}건)\n".format(n))
-            f.write("-- 생성: generate_used_cars_sample.py --sql-only\n\n")
-            f.write("SET NAMES utf8mb4;\n\n")
-            for i, c in enumerate(cars, start=1):
-                notes = ("'" + c["accident_notes"].replace("'", "''") + "'") if c["accident_notes"] else "NULL"
-                f.write(
-                    "INSERT INTO used_cars (brand, model, model_year, mileage, accident_count, accident_notes) "
-                    "VALUES ('{}','{}',{},{},{},{});\n".format(
-                        c["brand"].replace("'", "''"),
-                        c["model"].replace("'", "''"),
-                        c["model_year"],
-                        c["mileage"],
-                        c["accident_count"],
-                        notes,
-                    )
-                )
-            f.write("\n-- 월별 시세 (car_id 1~{} 기준월 12개월)\n".format(n))
-            for i, c in enumerate(cars, start=1):
-                for (_, ym, mp) in generate_monthly_prices(i, c, year_months_list, rng):
-                    f.write(
-                        "INSERT INTO monthly_market_prices (car_id, `year_month`, market_price) "
-                        "VALUES ({},'{}',{});\n".format(i, ym, mp)
-                    )
-        print(f"생성 완료: {SQL_OUT} (used_cars {n}건 + monthly_market_prices {n * 12}건)")
+        chunks = iter_chunks(rng, n, chunk, year_months_list, args.start_id)
+        write_sql(args.out, chunks, n, year_months_list, max(1, args.rows_per_insert), progress)
+        print(f"생성 완료: {args.out} (used_cars {n}건 + monthly_market_prices {n * 12}건, "
+              f"{time.perf_counter() - t0:.1f}초)")
         return
 
     # DB 직접 INSERT
@@ -186,21 +240,13 @@ def main():
         charset="utf8mb4",
     )
     try:
+        # 시세 행의 car_id 를 미리 정하기 위해 차량 id 를 직접 지정 (실행 중 다른 곳에서 used_cars 에 넣지 않는다고 가정)
         with conn.cursor() as cur:
-            for c in cars:
-                cur.execute(
-                    """INSERT INTO used_cars (brand, model, model_year, mileage, accident_count, accident_notes)
-                       VALUES (%s,%s,%s,%s,%s,%s)""",
-                    (c["brand"], c["model"], c["model_year"], c["mileage"], c["accident_count"], c["accident_notes"]),
-                )
-                car_id = cur.lastrowid
-                for (_, ym, mp) in generate_monthly_prices(car_id, c, year_months_list, rng):
-                    cur.execute(
-                        "INSERT INTO monthly_market_prices (car_id, `year_month`, market_price) VALUES (%s,%s,%s)",
-                        (car_id, ym, mp),
-                    )
-        conn.commit()
-        print(f"DB 삽입 완료: used_cars {n}건, monthly_market_prices {n * 12}건")
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM used_cars")
+            start_id = cur.fetchone()[0] + 1
+        insert_db(conn, iter_chunks(rng, n, chunk, year_months_list, start_id), progress)
+        print(f"DB 삽입 완료: used_cars {n}건, monthly_market_prices {n * 12}건 "
+              f"({time.perf_counter() - t0:.1f}초)")
     finally:
         conn.close()
 
@@ -107,6 +107,7 @@ server.listen(PORT, () => {
   console.log(`  - 훈련 데이터:     GET  /api/dashboard/training`);
   console.log(`  - 예측 결과:       GET  /api/dashboard/predictions`);
   console.log(`  - 고장 확률:       GET  /api/dashboard/failure-probability`);
+  console.log(`  - 전체 설비 고장 확률: GET  /api/dashboard/failure-probability/all?min_probability=0.5`);
   console.log(`  - 예측 요청:       POST /api/dashboard/predict  body: { feature1, feature2 }`);
   console.log(`  - 위험/이상 알림:  POST /api/dashboard/alert  (FastAPI → Slack + DB)`);
   console.log(`  - 이벤트 타임라인: GET  /api/dashboard/events`);
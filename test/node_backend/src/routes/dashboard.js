@@ -10,7 +10,7 @@ const {
   getAlertEvents,
   insertAlertEvent,
 } = require("../db");
-const { getFailureProbability } = require("../services/failureProbabilityService");
+const { getFailureProbability, getFleetFailureProbability } = require("../services/failureProbabilityService");
 
 const router = express.Router();
 const PREDICTION_API_URL = process.env.PREDICTION_API_URL || "http://localhost:8000";
@@ -237,7 +237,8 @@ router.get("/failure-probability", async (req, res) => {
     const equipmentId = req.query.equipment_id || null;
     const sensorId = req.query.sensor_id != null ? parseInt(req.query.sensor_id, 10) : null;
     const limit = Math.min(parseInt(req.query.limit, 10) || 200, 500);
-    const data = await getFailureProbability({ equipmentId, sensorId, limit });
+    const perSensorLimit = req.query.per_sensor_limit != null ? parseInt(req.query.per_sensor_limit, 10) : null;
+    const data = await getFailureProbability({ equipmentId, sensorId, limit, perSensorLimit });
     res.json(data);
   } catch (err) {
     const status = err.response?.status || 500;
@@ -246,6 +247,22 @@ router.get("/failure-probability", async (req, res) => {
   }
 });
 
+/** 전체 설비 고장 확률 (FastAPI /api/equipment/failure-probability/all, 위험도 순) */
+router.get("/failure-probability/all", async (req, res) => {
+  try {
+    const minProbability = parseFloat(req.query.min_probability) || 0;
+    const offset = Math.max(parseInt(req.query.offset, 10) || 0, 0);
+    const pageSize = Math.min(parseInt(req.query.page_size, 10) || 100, 1000);
+    const limit = Math.min(parseInt(req.query.limit, 10) || 200, 500);
+    const data = await getFleetFailureProbability({ minProbability, offset, pageSize, limit });
+    res.json(data);
+  } catch (err) {
+    const status = err.response?.status || 500;
+    const detail = err.response?.data?.detail || err.message;
+    res.status(status).json({ error: "전체 설비 고장 확률 조회 실패", detail: String(detail) });
+  }
+});
+
 /** 이벤트 타임라인 (알림 이벤트 목록) */
 router.get("/events", async (req, res) => {
   try {
@@ -14,20 +14,45 @@ const DEFAULT_TIMEOUT_MS = 15000;
  * @param {string} [options.equipmentId] - 설비 ID (예: EQ-DUMMY-01)
  * @param {number} [options.sensorId] - 특정 센서 ID
  * @param {number} [options.limit=200] - 조회할 텔레메트리 건수
+ * @param {number} [options.perSensorLimit] - 센서마다 최근 N건 (지정 시 limit 대신)
  * @returns {Promise<Object>} { equipment_id, failure_probability, details }
  */
 async function getFailureProbability(options = {}) {
-  const { equipmentId, sensorId, limit = 200 } = options;
+  const { equipmentId, sensorId, limit = 200, perSensorLimit } = options;
   const params = new URLSearchParams();
   if (equipmentId) params.set("equipment_id", equipmentId);
   if (sensorId != null) params.set("sensor_id", String(sensorId));
   params.set("limit", String(Math.min(limit, 500)));
+  if (perSensorLimit != null) params.set("per_sensor_limit", String(perSensorLimit));
 
   const url = `${PREDICTION_API_URL}/api/equipment/failure-probability?${params.toString()}`;
   const res = await axios.get(url, { timeout: DEFAULT_TIMEOUT_MS });
   return res.data;
 }
 
+/**
+ * 전체 설비 고장 확률을 한 번에 조회합니다 (위험도 높은 순, 페이지).
+ * @param {Object} options
+ * @param {number} [options.minProbability=0] - 이 값 이상인 설비만
+ * @param {number} [options.offset=0]
+ * @param {number} [options.pageSize=100]
+ * @param {number} [options.limit=200] - 설비별 텔레메트리 건수 (window 계산 시)
+ * @returns {Promise<Object>} { source, method, total, equipment_count, offset, page_size, items }
+ */
+async function getFleetFailureProbability(options = {}) {
+  const { minProbability = 0, offset = 0, pageSize = 100, limit = 200 } = options;
+  const params = new URLSearchParams({
+    min_probability: String(minProbability),
+    offset: String(offset),
+    page_size: String(pageSize),
+    limit: String(Math.min(limit, 500)),
+  });
+  const url = `${PREDICTION_API_URL}/api/equipment/failure-probability/all?${params.toString()}`;
+  const res = await axios.get(url, { timeout: DEFAULT_TIMEOUT_MS });
+  return res.data;
+}
+
 module.exports = {
   getFailureProbability,
+  getFleetFailureProbability,
 };
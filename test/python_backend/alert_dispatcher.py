@@ -0,0 +1,174 @@
+# Node 알림 웹훅 비동기 전송기
+# /api/predict·/api/anomaly/check 요청 경로에서 urlopen 호출을 빼고, 큐에 넣은 알림을 백그라운드 스레드가 전송합니다.
+# - NODE_ALERT_WEBHOOK_URL 로 keep-alive HTTP 연결을 유지해 재사용
+# - 실패 시 지수 백오프로 재시도 (5xx·연결 오류만, 4xx 는 재시도하지 않음)
+# - coalesce_window 초 안에 몰린 알림은 eventType 별로 1건의 묶음 payload 로 전송 (payload.alerts 에 원본 목록)
+# - stats(): queued / sent / dropped / failed 등 카운터
+
+import http.client
+import json
+import queue
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+class AlertDispatcher:
+    def __init__(
+        self,
+        url: str,
+        coalesce_window: float = 2.0,
+        max_batch: int = 50,
+        max_queue: int = 1000,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        timeout: float = 5.0,
+    ):
+        self._url = url.strip()
+        self._coalesce_window = coalesce_window
+        self._max_batch = max(1, max_batch)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._timeout = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "sent": 0, "dropped": 0, "failed": 0, "retries": 0, "requests": 0, "coalesced": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._url)
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """큐에 남은 알림을 전송한 뒤 종료."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._close()
+
+    def submit(self, alert: dict) -> bool:
+        """알림 1건을 전송 큐에 넣음 (블로킹 없음). 웹훅 미설정·큐 초과 시 False."""
+        if not self.enabled:
+            return False
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("queued")
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "queue_depth": self._queue.qsize(), "enabled": self.enabled}
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # ---------- 백그라운드 전송 ----------
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            by_type: dict[str, list[dict]] = {}
+            for a in batch:
+                by_type.setdefault(a.get("eventType", "danger"), []).append(a)
+            for alerts in by_type.values():
+                body = alerts[0] if len(alerts) == 1 else _coalesce(alerts)
+                if self._send(body):
+                    self._count("sent", len(alerts))
+                    if len(alerts) > 1:
+                        self._count("coalesced", len(alerts))
+                else:
+                    self._count("failed", len(alerts))
+
+    def _collect(self) -> list[dict]:
+        """첫 알림 이후 coalesce_window 동안 들어온 알림을 max_batch 까지 모음."""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self._coalesce_window
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            parts = urlsplit(self._url)
+            cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(parts.hostname, parts.port, timeout=self._timeout)
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _send(self, body: dict) -> bool:
+        parts = urlsplit(self._url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        data = json.dumps(body).encode("utf-8")
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                if self._stop.is_set() and attempt > 1:
+                    break  # 종료 중에는 재시도 1회까지만
+                self._count("retries")
+                self._stop.wait(min(30.0, self._backoff_base * 2 ** (attempt - 1)))
+            try:
+                self._count("requests")
+                conn = self._connection()
+                conn.request("POST", path, body=data, headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()  # 연결 재사용을 위해 본문까지 읽음
+                if resp.status < 400:
+                    return True
+                if resp.status < 500:
+                    return False
+                self._close()
+            except (OSError, http.client.HTTPException):
+                self._close()
+        return False
+
+
+def _coalesce(alerts: list[dict]) -> dict:
+    """같은 eventType 알림 여러 건 → 1건 (가장 최근 알림 기준, payload.alerts 에 전체 목록)."""
+    last = alerts[-1]
+    values = [a["predictionValue"] for a in alerts if isinstance(a.get("predictionValue"), (int, float))]
+    if last.get("eventType") == "danger" and values:
+        message = f"위험 신호 {len(alerts)}건 (최저 예측 방전용량 {min(values):.2f} mAh/g, 기준 미만)"
+    else:
+        message = f"{last.get('message', '')} 외 {len(alerts) - 1}건"
+    return {
+        **last,
+        "predictionValue": min(values) if values else last.get("predictionValue"),
+        "message": message,
+        "payload": {**(last.get("payload") or {}), "coalesced": len(alerts), "alerts": alerts},
+    }
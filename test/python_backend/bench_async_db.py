@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+동기(DB_ASYNC=false) vs 비동기(DB_ASYNC=true) 모드 처리량 비교 벤치마크.
+각 모드로 uvicorn 서버를 띄운 뒤 동시 클라이언트로 같은 엔드포인트를 호출해 requests/sec, 지연시간을 출력합니다.
+.env 의 DB 접속 정보가 필요합니다 (실제 DB 에 요청이 갑니다).
+
+실행 예:
+  python bench_async_db.py --concurrency 64 --duration 10
+  python bench_async_db.py --path "/api/equipment/failure-probability?equipment_id=EQ-SF-01"
+  python bench_async_db.py --method POST --path /api/predict --body '{"feature1": 900, "feature2": 12}'
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def _wait_ready(host: str, port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"서버가 {timeout}s 안에 준비되지 않았습니다 ({host}:{port})")
+
+
+def _client(host, port, method, path, body, stop_at, latencies, errors, lock):
+    """keep-alive 연결 1개로 stop_at 까지 반복 호출."""
+    headers = {"Content-Type": "application/json"} if body else {}
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    local_lat, local_err = [], 0
+    while time.monotonic() < stop_at:
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400:
+                local_err += 1
+            else:
+                local_lat.append(time.perf_counter() - t0)
+        except (OSError, http.client.HTTPException):
+            local_err += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.close()
+    with lock:
+        latencies.extend(local_lat)
+        errors[0] += local_err
+
+
+def run_load(host, port, method, path, body, concurrency, duration) -> dict:
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=_client, args=(host, port, method, path, body, stop_at, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    t0 = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+def bench_mode(async_mode: bool, args) -> dict:
+    env = {**os.environ, "DB_ASYNC": "true" if async_mode else "false"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", args.host, "--port", str(args.port), "--log-level", "warning"],
+        cwd=HERE,
+        env=env,
+    )
+    try:
+        _wait_ready(args.host, args.port)
+        # 워밍업 (풀 연결 생성, 모델 로드)
+        run_load(args.host, args.port, args.method, args.path, args.body, min(4, args.concurrency), 1.0)
+        return run_load(args.host, args.port, args.method, args.path, args.body, args.concurrency, args.duration)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB_ASYNC=false/true 처리량 비교")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/api/predictions?limit=20")
+    parser.add_argument("--body", default=None, help="POST 요청 본문 (JSON 문자열)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    body = args.body.encode("utf-8") if args.body else None
+    args.body = body
+
+    print(f"{args.method} {args.path}  동시 {args.concurrency}, {args.duration:.0f}s")
+    results = {}
+    for mode in (False, True):
+        name = "async" if mode else "sync"
+        results[name] = r = bench_mode(mode, args)
+        print(
+            f"  [{name:5}] {r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f}ms  p99 {r['p99_ms']:7.1f}ms"
+            f"  (요청 {r['requests']}, 오류 {r['errors']})"
+        )
+    if results["sync"]["rps"] > 0:
+        print(f"  async/sync 처리량 비율: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
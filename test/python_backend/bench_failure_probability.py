@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+고장 확률 계산 벤치마크: 기존 구현(defaultdict + 센서별 scipy.stats.zscore) vs failure_engine (NumPy 그룹 연산).
+- legacy: 기존 main._compute_failure_probability 를 그대로 옮긴 함수
+- engine(rows): db.get_telemetry 와 같은 최신순 행(dict 목록) → 배열 변환 + 계산 (API 경로)
+- engine(arrays): 이미 배열로 가진 경우 계산만
+DB 는 필요 없습니다. 결과 일치 여부도 함께 확인합니다
+(기존 구현은 최신순 행의 마지막 = 가장 오래된 값을 기준으로 해서, 비교 시 legacy 에는 시간순 행을 넣습니다).
+
+실행: python bench_failure_probability.py [--rows 10000,100000,1000000] [--sensors 10,1000] [--repeat 3]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+from scipy import stats
+
+from failure_engine import compute_failure_probability, compute_failure_probability_arrays, rows_to_arrays
+
+
+def legacy_compute_failure_probability(rows: list[dict]) -> tuple[float, dict]:
+    """기존 구현 (비교용 사본)"""
+    if not rows:
+        return 0.0, {"message": "데이터 없음", "sensors": []}
+    by_sensor: dict[int, list[float]] = defaultdict(list)
+    sensor_info: dict[int, dict] = {}
+    for r in rows:
+        sid = r.get("sensor_id")
+        val = r.get("value")
+        if sid is not None and val is not None:
+            try:
+                by_sensor[sid].append(float(val))
+            except (TypeError, ValueError):
+                pass
+        if sid and sid not in sensor_info:
+            sensor_info[sid] = {
+                "sensor_id": sid,
+                "sensor_name": r.get("sensor_name"),
+                "sensor_type": r.get("sensor_type"),
+                "equipment_id": r.get("equipment_id"),
+            }
+    details = []
+    max_abs_z = 0.0
+    for sid, vals in by_sensor.items():
+        if len(vals) < 2:
+            z_last = 0.0
+        else:
+            zs = stats.zscore(np.array(vals), nan_policy="omit")
+            z_last = float(zs[-1]) if not np.isnan(zs[-1]) else 0.0
+        max_abs_z = max(max_abs_z, abs(z_last))
+        details.append({
+            **sensor_info.get(sid, {}),
+            "value_last": vals[-1] if vals else None,
+            "z_score": round(z_last, 4),
+            "sample_count": len(vals),
+        })
+    prob = min(1.0, max(0.0, max_abs_z / 3.0))
+    return round(prob, 4), {"method": "zscore", "max_abs_z": round(max_abs_z, 4), "sensors": details}
+
+
+def make_rows(n: int, n_sensors: int, seed: int = 0) -> list[dict]:
+    """get_telemetry 와 같은 형태의 행 (시간순)"""
+    rng = np.random.default_rng(seed)
+    base = datetime(2025, 1, 1)
+    sids = rng.integers(1, n_sensors + 1, size=n).tolist()
+    values = rng.normal(70.0, 5.0, size=n).round(3).tolist()
+    return [
+        {
+            "id": i + 1,
+            "sensor_id": sid,
+            "recorded_at": base + timedelta(seconds=i),
+            "value": v,
+            "equipment_id": f"EQ-SF-{sid % 50:02d}",
+            "sensor_name": f"sensor-{sid}",
+            "sensor_type": "temperature",
+        }
+        for i, (sid, v) in enumerate(zip(sids, values))
+    ]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _check_same(a: tuple[float, dict], b: tuple[float, dict]) -> bool:
+    if a[0] != b[0] or a[1]["max_abs_z"] != b[1]["max_abs_z"]:
+        return False
+    sa = {x["sensor_id"]: x for x in a[1]["sensors"]}
+    sb = {x["sensor_id"]: x for x in b[1]["sensors"]}
+    return sa.keys() == sb.keys() and all(
+        sa[k]["sample_count"] == sb[k]["sample_count"]
+        and sa[k]["value_last"] == sb[k]["value_last"]
+        and abs(sa[k]["z_score"] - sb[k]["z_score"]) <= 1e-4
+        for k in sa
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="고장 확률 계산 벤치마크")
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--sensors", default="10,1000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'sensors':>8} {'legacy(ms)':>11} {'rows(ms)':>9} {'arrays(ms)':>11} {'배속':>6} {'일치':>4}")
+    for n in (int(x) for x in args.rows.split(",")):
+        for k in (int(x) for x in args.sensors.split(",")):
+            rows = make_rows(n, k)
+            rows_desc = rows[::-1]
+            arrays = rows_to_arrays(rows_desc, newest_first=True)
+            t_legacy = _best_of(lambda: legacy_compute_failure_probability(rows_desc), args.repeat)
+            t_rows = _best_of(lambda: compute_failure_probability(rows_desc, newest_first=True), args.repeat)
+            t_arrays = _best_of(lambda: compute_failure_probability_arrays(*arrays), args.repeat)
+            same = _check_same(
+                legacy_compute_failure_probability(rows), compute_failure_probability(rows_desc, newest_first=True)
+            )
+            print(f"{n:9d} {k:8d} {t_legacy * 1000:11.1f} {t_rows * 1000:9.1f} {t_arrays * 1000:11.1f} "
+                  f"{t_legacy / t_rows:5.1f}x {'O' if same else 'X':>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+응답 직렬화 마이크로 벤치마크: FastAPI 기본 경로 vs fast_json.FastJSONResponse.
+- 기본: jsonable_encoder(rows) → JSONResponse.render (표준 json)
+- fast: FastJSONResponse.render(rows) (orjson, jsonable_encoder 생략)
+페이로드는 db.get_predictions / get_telemetry 가 반환하는 형태(datetime, Decimal, JSON 텍스트 컬럼)를 흉내 낸 행입니다.
+DB 는 필요 없습니다.
+
+실행: python bench_json.py [--sizes 100,1000,10000,100000] [--repeat 5]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import fast_json
+from fast_json import FastJSONResponse
+
+
+def make_prediction_rows(n: int) -> list[dict]:
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i + 1,
+            "created_at": base + timedelta(seconds=i),
+            "model_name": "capacity_linear",
+            "input_summary": '{"feature1": %.1f, "feature2": %.1f}' % (750 + i % 250, 8 + i % 16),
+            "prediction_value": 180.0 + (i % 300) / 10,
+            "meta": '{"note": "모델 예측", "model_version": "v20250101-000000"}',
+        }
+        for i in range(n)
+    ]
+
+
+def make_telemetry_rows(n: int) -> list[dict]:
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i + 1,
+            "sensor_id": i % 10 + 1,
+            "recorded_at": base + timedelta(seconds=i),
+            "value": Decimal("55.25") + i % 30,
+            "label": "normal",
+            "meta": None,
+            "equipment_id": f"EQ-SF-{i % 10 + 1:02d}",
+            "sensor_name": "모터 베어링 온도",
+            "sensor_type": "temperature",
+            "unit": "°C",
+            "normal_min": 55.0,
+            "normal_max": 85.0,
+        }
+        for i in range(n)
+    ]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 직렬화 벤치마크")
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",")]
+    std = JSONResponse(content=None)
+    fast = FastJSONResponse(content=None)
+
+    print(f"fast_json 백엔드: {'orjson' if fast_json.orjson is not None else '표준 json (orjson 미설치)'}")
+    print(f"{'payload':12} {'rows':>8} {'기본(ms)':>10} {'fast(ms)':>10} {'배속':>6} {'bytes':>10}")
+    for name, make in (("predictions", make_prediction_rows), ("telemetry", make_telemetry_rows)):
+        for n in sizes:
+            rows = make(n)
+            t_std = _best_of(lambda: std.render(jsonable_encoder(rows)), args.repeat)
+            t_fast = _best_of(lambda: fast.render(rows), args.repeat)
+            size = len(fast.render(rows))
+            print(f"{name:12} {n:8d} {t_std * 1000:10.2f} {t_fast * 1000:10.2f} {t_std / t_fast:5.1f}x {size:10d}")
+
+
+if __name__ == "__main__":
+    main()
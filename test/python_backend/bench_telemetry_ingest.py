@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+텔레메트리 대량 적재(POST /api/telemetry/bulk) 처리량 벤치마크.
+- 기본(--url 없음): DB 없이 요청 1건 처리 단계별 시간 (JSON/NDJSON 파싱, 벡터화 검증)
+- --url: 실행 중인 API 에 배치를 동시 클라이언트로 duration 초 동안 계속 보내 지속 rows/sec 출력 (실제 DB 에 저장됨)
+
+실행 예:
+  python bench_telemetry_ingest.py --rows 50000
+  python bench_telemetry_ingest.py --url http://127.0.0.1:8000 --sensor-ids 1,2,3,4,5 --batch 10000 --concurrency 4 --duration 20
+  python bench_telemetry_ingest.py --url http://127.0.0.1:8000 --format ndjson
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import numpy as np
+
+from fast_json import dumps, loads
+from telemetry_ingest import SensorIdCache, columns_from_json, columns_from_ndjson, validate
+
+
+def make_body(n: int, sensor_ids: list[int], fmt: str, seed: int = 0) -> bytes:
+    """sensor_ids 중 무작위 센서의 최근 시각 측정값 n 건 (컬럼형 JSON 또는 NDJSON)"""
+    rng = np.random.default_rng(seed)
+    base = datetime.now().replace(microsecond=0) - timedelta(seconds=n)
+    sid = rng.choice(sensor_ids, size=n).tolist()
+    value = rng.normal(60.0, 5.0, size=n).round(3).tolist()
+    ts = [(base + timedelta(seconds=i)).isoformat(sep=" ") for i in range(n)]
+    if fmt == "ndjson":
+        return b"\n".join(dumps({"sensor_id": s, "recorded_at": t, "value": v}) for s, t, v in zip(sid, ts, value))
+    return dumps({"sensor_id": sid, "recorded_at": ts, "value": value})
+
+
+def bench_local(rows: int, sensor_ids: list[int], repeat: int) -> None:
+    cache = SensorIdCache(loader=lambda: sensor_ids)
+    for fmt in ("json", "ndjson"):
+        body = make_body(rows, sensor_ids, fmt)
+        best_parse = best_validate = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            cols = columns_from_ndjson(body) if fmt == "ndjson" else columns_from_json(loads(body))
+            t1 = time.perf_counter()
+            v = validate(cols, cache)
+            t2 = time.perf_counter()
+            best_parse, best_validate = min(best_parse, t1 - t0), min(best_validate, t2 - t1)
+        total = best_parse + best_validate
+        print(f"{fmt:7} rows={rows:<8d} 파싱 {best_parse * 1000:8.1f}ms  검증 {best_validate * 1000:8.1f}ms  "
+              f"→ {rows / total:12,.0f} rows/s (DB 제외, 유효 {int(v['mask'].sum())}건)")
+
+
+def _client(host, port, body, content_type, stop_at, totals, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    accepted = rejected = requests = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            conn.request("POST", "/api/telemetry/bulk", body=body, headers={"Content-Type": content_type})
+            resp = conn.getresponse()
+            data = resp.read()
+            if resp.status >= 400:
+                errors += 1
+                continue
+            r = loads(data)
+            accepted += r["accepted"]
+            rejected += r["rejected"]
+            requests += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=120)
+    conn.close()
+    with lock:
+        totals["accepted"] += accepted
+        totals["rejected"] += rejected
+        totals["requests"] += requests
+        totals["errors"] += errors
+
+
+def bench_http(url: str, batch: int, sensor_ids: list[int], fmt: str, concurrency: int, duration: float) -> None:
+    u = urlparse(url)
+    body = make_body(batch, sensor_ids, fmt)
+    content_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    totals = {"accepted": 0, "rejected": 0, "requests": 0, "errors": 0}
+    lock = threading.Lock()
+    t0 = time.monotonic()
+    stop_at = t0 + duration
+    threads = [
+        threading.Thread(target=_client, args=(u.hostname, u.port or 80, body, content_type, stop_at, totals, lock))
+        for _ in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+    print(f"{fmt} batch={batch} concurrency={concurrency} {elapsed:.1f}s: 요청 {totals['requests']} (오류 {totals['errors']}), "
+          f"저장 {totals['accepted']:,} / 거부 {totals['rejected']:,} → {totals['accepted'] / elapsed:,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텔레메트리 대량 적재 벤치마크")
+    parser.add_argument("--url", help="API 주소 (예: http://127.0.0.1:8000). 없으면 DB 없이 파싱·검증만 측정")
+    parser.add_argument("--sensor-ids", default="1,2,3,4,5", help="sensors 테이블에 있는 id 목록")
+    parser.add_argument("--rows", type=int, default=100000, help="로컬 측정 행 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=10000, help="요청 1건당 행 수 (--url)")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+    sensor_ids = [int(x) for x in args.sensor_ids.split(",")]
+
+    if args.url:
+        bench_http(args.url, args.batch, sensor_ids, args.format, args.concurrency, args.duration)
+    else:
+        bench_local(args.rows, sensor_ids, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+양극재 소성 CSV(cathode_calcination_data.csv) 공용 로더 (train_model.py, upload_csv_to_db.py, visualize_temp_capacity.py).
+
+CSV 를 청크 단위(np.loadtxt)로 읽어 컬럼별 float64 NumPy 배열로 만들고,
+파싱 결과를 청크씩 CSV 옆 바이너리 사이드카(<CSV>.npy + <CSV>.npy.json)에 기록합니다 (파일 전체를 메모리에 올리지 않음).
+다음 실행부터는 CSV 크기·수정 시각이 같으면 .npy 를 메모리 매핑(mmap)으로 바로 열어 파싱을 건너뜁니다.
+iter_chunks() 는 검증한 청크씩 yield (train_model.py, upload_csv_to_db.py), load() 는 한 번에 (작은 파일·시각화).
+
+검증 규칙 (모든 진입점 공통, load/iter_chunks(columns=...) 로 요청한 컬럼 기준):
+  - 요청한 컬럼이 헤더에 없으면 ValueError
+  - 숫자가 아니거나 비어 있는 칸이 있는 행 → invalid (행 번호 보고 후 제외)
+  - 요청한 컬럼 값이 모두 0 인 행 → 빈 행으로 보고 skipped (제외)
+training_data 매핑: TRAINING_COLUMNS (feature1 = 소성온도, feature2 = 소성시간, target = 방전용량)
+
+CLI:
+  python cathode_csv.py [CSV 경로] [--no-cache]   (로드 결과 요약·소요 시간)
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CSV = Path(__file__).resolve().parent.parent / "cathode_calcination_data.csv"
+# training_data 컬럼 → CSV 컬럼
+TRAINING_COLUMNS = {"feature1": "소성온도", "feature2": "소성시간", "target": "방전용량"}
+CHUNK_ROWS = 100_000
+CACHE_VERSION = 1
+
+
+@dataclass
+class CathodeData:
+    """검증을 통과한 행의 컬럼 배열 (읽기 전용일 수 있음: 캐시 mmap 을 그대로 넘기는 경우)."""
+    columns: dict[str, np.ndarray]
+    skipped: int = 0  # 요청 컬럼이 모두 0 인 행
+    invalid_rows: list[int] = field(default_factory=list)  # 숫자 변환 실패 행 번호 (헤더 = 1번째 줄, 빈 줄 제외)
+    cached: bool = False  # 사이드카 캐시에서 읽었는지
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def matrix(self, names: Sequence[str]) -> np.ndarray:
+        """(n, len(names)) 행렬"""
+        return np.column_stack([self.columns[n] for n in names]) if names else np.empty((len(self), 0))
+
+
+def _parse_chunk(lines: list[str], ncols: int) -> np.ndarray:
+    """CSV 줄 → (n, ncols) float64. 변환할 수 없는 칸은 NaN (열 수가 다른 행은 전부 NaN)."""
+    try:
+        return np.loadtxt(lines, delimiter=",", quotechar='"', comments=None, dtype=np.float64, ndmin=2).reshape(-1, ncols)
+    except ValueError:
+        pass
+    out = np.full((len(lines), ncols), np.nan)
+    for i, row in enumerate(csv.reader(lines)):
+        if len(row) != ncols:
+            continue
+        for j, cell in enumerate(row):
+            try:
+                out[i, j] = float(cell)
+            except ValueError:
+                pass
+    return out
+
+
+def _read_header(f) -> list[str]:
+    return [h.strip() for h in next(csv.reader([f.readline()]), [])]
+
+
+def _iter_parsed(f, ncols: int, chunk_rows: int) -> Iterator[np.ndarray]:
+    """헤더 다음부터 chunk_rows 줄씩 파싱한 (n, ncols) float64 (잘못된 칸은 NaN). 빈 줄은 건너뜀 (csv.DictReader 와 같음)."""
+    while True:
+        lines = list(islice(f, chunk_rows))
+        if not lines:
+            break
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            yield _parse_chunk(lines, ncols)
+
+
+def _cache_paths(path: Path) -> tuple[Path, Path]:
+    return path.with_name(path.name + ".npy"), path.with_name(path.name + ".npy.json")
+
+
+def _signature(path: Path) -> dict:
+    st = path.stat()
+    return {"version": CACHE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _read_cache(path: Path) -> Optional[tuple[list[str], np.ndarray]]:
+    """CSV 와 크기·수정 시각이 같은 캐시가 있으면 (헤더, mmap 배열). 없거나 오래됐으면 None."""
+    npy, meta_path = _cache_paths(path)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if {k: meta.get(k) for k in ("version", "size", "mtime_ns")} != _signature(path):
+            return None
+        data = np.load(npy, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if data.shape != (meta["rows"], len(meta["header"])):
+        return None
+    return meta["header"], data
+
+
+def _build_cache(path: Path, chunk_rows: int) -> Optional[tuple[list[str], np.ndarray]]:
+    """
+    CSV 를 청크씩 파싱해 사이드카에 바로 기록 (np.lib.format.open_memmap, 전체를 메모리에 올리지 않음) 후 mmap 으로 열기.
+    행 수를 먼저 세어 크기를 정함. 컬럼 단위로 읽으므로 열 우선(Fortran) 순서. 임시 파일 + os.replace.
+    쓰기 실패나 도중에 CSV 가 바뀌면 None (호출자는 캐시 없이 CSV 를 직접 읽음).
+    """
+    npy, meta_path = _cache_paths(path)
+    tmp = npy.with_name(f".{npy.name}.{os.getpid()}.tmp")
+    signature = _signature(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        header = _read_header(f)
+        rows = sum(1 for line in f if line.strip())
+    try:
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(rows, len(header)), fortran_order=True)
+        done = 0
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            _read_header(f)
+            for chunk in _iter_parsed(f, len(header), chunk_rows):
+                if done + len(chunk) > rows:
+                    break
+                out[done:done + len(chunk)] = chunk
+                done += len(chunk)
+        out.flush()
+        del out
+        if done != rows or _signature(path) != signature:
+            tmp.unlink(missing_ok=True)
+            return None
+        os.replace(tmp, npy)
+        meta = {**signature, "header": header, "rows": rows}
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return None
+    return _read_cache(path)
+
+
+def _column_names(header: list[str], columns: Optional[Sequence[str]]) -> list[str]:
+    names = list(columns) if columns is not None else header
+    missing = [c for c in names if c not in header]
+    if missing:
+        raise ValueError(f"CSV 에 없는 컬럼: {missing} (있는 컬럼: {header})")
+    return names
+
+
+def _validate(header: list[str], data: np.ndarray, names: list[str], first_row: int, cached: bool) -> CathodeData:
+    """
+    (n, 컬럼 수) 배열(CSV first_row 번째 행부터) → 검증을 통과한 요청 컬럼.
+    걸러낼 행이 없으면 열을 복사 없이 그대로 (캐시 mmap 이면 읽기 전용).
+    """
+    cols = [data[:, header.index(c)] for c in names]
+    if not cols:
+        return CathodeData({}, cached=cached)
+    invalid = np.zeros(data.shape[0], dtype=bool)
+    nonzero = np.zeros(data.shape[0], dtype=bool)
+    for col in cols:
+        invalid |= np.isnan(col)
+        nonzero |= col != 0
+    skip = ~invalid & ~nonzero
+    keep = ~(invalid | skip)
+    if keep.all():
+        selected = {c: col for c, col in zip(names, cols)}
+    else:
+        selected = {c: np.ascontiguousarray(col[keep]) for c, col in zip(names, cols)}
+    return CathodeData(
+        selected,
+        skipped=int(skip.sum()),
+        invalid_rows=(np.flatnonzero(invalid) + first_row + 2).tolist(),
+        cached=cached,
+    )
+
+
+def iter_chunks(
+    path: Path = DEFAULT_CSV,
+    columns: Optional[Sequence[str]] = None,
+    cache: bool = True,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[CathodeData]:
+    """
+    CSV(빈 줄 제외) chunk_rows 행씩 검증한 요청 컬럼(기본: 전체). 메모리는 청크 크기만큼만 사용.
+    사이드카가 없으면 청크씩 기록하며 만든 뒤 mmap 을 청크씩, cache=False 거나 기록할 수 없으면 CSV 를 청크씩 직접 파싱.
+    각 청크의 skipped·invalid_rows 는 그 청크 몫 (행 번호는 파일 전체 기준). 검증을 통과한 행이 없는 청크도 yield.
+    """
+    path = Path(path)
+    loaded = _read_cache(path) if cache else None
+    cached = loaded is not None
+    if loaded is None and cache:
+        loaded = _build_cache(path, chunk_rows)
+    if loaded is not None:
+        header, data = loaded
+        names = _column_names(header, columns)
+        for start in range(0, data.shape[0], chunk_rows):
+            yield _validate(header, data[start:start + chunk_rows], names, start, cached)
+        return
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        header = _read_header(f)
+        names = _column_names(header, columns)
+        start = 0
+        for chunk in _iter_parsed(f, len(header), chunk_rows):
+            yield _validate(header, chunk, names, start, cached)
+            start += len(chunk)
+
+
+def load(
+    path: Path = DEFAULT_CSV,
+    columns: Optional[Sequence[str]] = None,
+    cache: bool = True,
+    chunk_rows: int = CHUNK_ROWS,
+) -> CathodeData:
+    """
+    CSV → 요청 컬럼(기본: 전체) 배열을 한 번에. 검증 규칙은 모듈 설명 참고.
+    캐시가 있고 걸러낼 행이 없으면 mmap 열을 복사 없이 그대로 반환 (읽기 전용).
+    캐시 없이는 검증한 청크를 이어 붙이므로 큰 파일은 iter_chunks 로 청크씩 처리할 것.
+    """
+    path = Path(path)
+    loaded = _read_cache(path) if cache else None
+    cached = loaded is not None
+    if loaded is None and cache:
+        loaded = _build_cache(path, chunk_rows)
+    if loaded is not None:
+        header, data = loaded
+        return _validate(header, data, _column_names(header, columns), 0, cached)
+    parts = list(iter_chunks(path, columns, cache=False, chunk_rows=chunk_rows))
+    if not parts:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            names = _column_names(_read_header(f), columns)
+        return CathodeData({c: np.empty(0) for c in names})
+    return CathodeData(
+        {c: np.concatenate([p[c] for p in parts]) for c in parts[0].columns},
+        skipped=sum(p.skipped for p in parts),
+        invalid_rows=[r for p in parts for r in p.invalid_rows],
+    )
+
+
+def load_training(path: Path = DEFAULT_CSV, cache: bool = True) -> CathodeData:
+    """training_data 매핑(TRAINING_COLUMNS) 으로 로드 → 컬럼 이름 feature1, feature2, target"""
+    data = load(path, list(TRAINING_COLUMNS.values()), cache=cache)
+    data.columns = {k: data.columns[v] for k, v in TRAINING_COLUMNS.items()}
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="양극재 소성 CSV 로드 요약")
+    parser.add_argument("csv", nargs="?", type=Path, default=DEFAULT_CSV)
+    parser.add_argument("--no-cache", action="store_true", help="사이드카 캐시를 쓰지 않고 CSV 를 다시 파싱")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    data = load(args.csv, cache=not args.no_cache)
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"{args.csv}: {len(data)}행 ({'캐시' if data.cached else '파싱'} {elapsed:.1f}ms)")
+    print(f"  건너뜀(모두 0): {data.skipped}행, 숫자 변환 실패: {len(data.invalid_rows)}행 {data.invalid_rows[:10]}")
+    for name, col in data.columns.items():
+        if len(col):
+            print(f"  {name}: {col.min():.4g} ~ {col.max():.4g} (평균 {col.mean():.4g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 # 가이드 ② 단계: MariaDB 연결과 조회/저장 함수
 # 사용 전: .env 에 DB_HOST, DB_USER, DB_PASSWORD, DB_NAME 설정
 
+import json
 import os
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -12,6 +15,22 @@ from dotenv import load_dotenv
 _env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(_env_path)
 
+# 커넥션 풀 설정 (요청마다 TCP/TLS 핸드셰이크를 반복하지 않도록 연결 재사용)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))  # 최대 동시 연결 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # 풀이 가득 찼을 때 대기 시간(초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 이 시간(초)보다 오래된 연결은 폐기 후 재생성
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+
+
+def _ssl_option():
+    """DB_SSL=true 이면 SSL 설정 반환 (DB_CA_PATH 가 있으면 CA 검증). 아니면 None."""
+    if os.getenv("DB_SSL", "false").lower() in ("true", "1", "yes"):
+        ca_path = os.getenv("DB_CA_PATH", "").strip()
+        if ca_path and Path(ca_path).exists():
+            return {"ca": ca_path}
+        return True
+    return None
+
 
 def _conn():
     """MariaDB 접속 설정 (환경변수 사용). 클라우드 사용 시 DB_SSL=true, DB_CA_PATH 로 SSL+CA 적용."""
@@ -25,106 +44,492 @@ def _conn():
         "cursorclass": pymysql.cursors.DictCursor,
         "auth_plugin_map": {},
     }
-    if os.getenv("DB_SSL", "false").lower() in ("true", "1", "yes"):
-        ca_path = os.getenv("DB_CA_PATH", "").strip()
-        if ca_path and Path(ca_path).exists():
-            kwargs["ssl"] = {"ca": ca_path}
-        else:
-            kwargs["ssl"] = True
+    ssl = _ssl_option()
+    if ssl is not None:
+        kwargs["ssl"] = ssl
     return pymysql.connect(**kwargs)
 
 
+class ConnectionPool:
+    """
+    스레드 안전한 고정 크기 커넥션 풀.
+    - 최대 size 개까지 연결 생성, 모두 사용 중이면 timeout 초 동안 반납(또는 폐기로 자리가 날 때까지) 대기
+    - 꺼낼 때 recycle 초 초과 연결은 폐기, pre_ping 이면 ping 으로 끊긴 연결 걸러냄
+    - stats(): checkouts / waits / creations 등 통계
+    """
+
+    def __init__(self, factory, size: int = 5, timeout: float = 10.0, recycle: int = 1800, pre_ping: bool = True):
+        self._factory = factory
+        self._size = max(1, size)
+        self._timeout = timeout
+        self._recycle = recycle
+        self._pre_ping = pre_ping
+        self._idle: list = []  # (conn, created_at), 끝에서 꺼냄 → 최근 반납된 연결 우선
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)  # 반납·폐기 시 notify (대기 중인 checkout 깨움)
+        self._created = 0  # 현재 살아있는 연결 수 (사용 중 + 유휴)
+        self._stats = {"checkouts": 0, "waits": 0, "creations": 0, "recycled": 0, "ping_failures": 0, "timeouts": 0}
+
+    def _new_conn(self):
+        conn = self._factory()
+        with self._lock:
+            self._stats["creations"] += 1
+        return conn, time.monotonic()
+
+    def _release_slot(self) -> None:
+        """연결 1개 자리 반환 (폐기·생성 실패). 자리가 나기를 기다리는 checkout 을 깨움."""
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _discard(self, conn) -> None:
+        self._release_slot()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn, created_at: float) -> bool:
+        if self._recycle > 0 and time.monotonic() - created_at > self._recycle:
+            with self._lock:
+                self._stats["recycled"] += 1
+            return False
+        if self._pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._lock:
+                    self._stats["ping_failures"] += 1
+                return False
+        return True
+
+    def checkout(self):
+        """연결 1개를 (conn, created_at) 으로 꺼냄. 풀이 가득 차 있으면 반납·폐기될 때까지 최대 timeout 초 대기."""
+        deadline = None
+        with self._lock:
+            self._stats["checkouts"] += 1
+        while True:
+            with self._available:
+                while not self._idle and self._created >= self._size:
+                    if deadline is None:
+                        deadline = time.monotonic() + self._timeout
+                        self._stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError(f"DB 커넥션 풀 대기 시간 초과 ({self._timeout}s, size={self._size})")
+                    self._available.wait(remaining)
+                if self._idle:
+                    conn, created_at = self._idle.pop()
+                else:
+                    self._created += 1
+                    conn = None
+            if conn is None:
+                try:
+                    return self._new_conn()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_usable(conn, created_at):
+                return conn, created_at
+            self._discard(conn)
+
+    def checkin(self, conn, created_at: float, broken: bool = False) -> None:
+        """사용이 끝난 연결 반납. broken 이면 폐기해 다음 checkout 에서 새로 만듦."""
+        if broken:
+            self._discard(conn)
+            return
+        with self._available:
+            self._idle.append((conn, created_at))
+            self._available.notify()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "size": self._size,
+                "open": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+            }
+
+    def close(self) -> None:
+        """유휴 연결 모두 종료 (프로세스 종료 시)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool = ConnectionPool(
+    _conn, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, recycle=DB_POOL_RECYCLE, pre_ping=DB_POOL_PRE_PING
+)
+
+
+def get_pool_stats() -> dict:
+    """커넥션 풀 통계 (checkouts, waits, creations, open, idle, in_use 등)."""
+    return _pool.stats()
+
+
 @contextmanager
 def get_db():
-    """with get_db() as cur: 로 사용. 끝나면 자동으로 연결 종료."""
-    conn = _conn()
+    """with get_db() as cur: 로 사용. 끝나면 커밋 후 연결을 풀에 반납 (오류 시 롤백)."""
+    conn, created_at = _pool.checkout()
+    broken = False
     try:
         with conn.cursor() as cur:
             yield cur
         conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        if isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError)):
+            broken = True
+        raise
     finally:
-        conn.close()
+        _pool.checkin(conn, created_at, broken=broken)
+
+
+# SQL 문은 동기(db.py)·비동기(db_async.py) 경로가 함께 사용
+_SQL_TRAINING_SELECT = "SELECT id, created_at, feature1, feature2, target FROM training_data"
+SQL_INSERT_TRAINING = "INSERT INTO training_data (feature1, feature2, target) VALUES (%s, %s, %s)"
+# training_data 저장 전 온라인 학습 통계 행 잠금 (online_model.py, docs/10). 저장이 모두 이 잠금 순서대로 커밋되므로
+# 통계를 반영하는 쪽이 last_training_id 를 올린 뒤 그 아래 id 가 늦게 커밋되는 일이 없음 (빈 테이블이면 갭 잠금)
+SQL_LOCK_ONLINE_STATS = "SELECT model_name FROM model_online_stats FOR UPDATE"
+_SQL_PREDICTIONS_SELECT = """SELECT id, created_at, model_name, input_summary, prediction_value, meta
+               FROM predictions"""
+SQL_INSERT_PREDICTION = """INSERT INTO predictions (model_name, input_summary, prediction_value, meta)
+               VALUES (%s, %s, %s, %s)"""
+# uid: write-behind 저장 시 클라이언트(서버)에서 미리 발급하는 UUID (docs/06_predictions_uid.sql)
+SQL_INSERT_PREDICTION_UID = """INSERT INTO predictions (uid, model_name, input_summary, prediction_value, meta)
+               VALUES (%s, %s, %s, %s, %s)"""
+_SQL_TELEMETRY_COLUMNS = """t.id, t.sensor_id, t.recorded_at, t.value, t.label, t.meta,
+                          s.equipment_id, s.sensor_name, s.sensor_type, s.unit, s.normal_min, s.normal_max"""
+_SQL_TELEMETRY_SELECT = f"""SELECT {_SQL_TELEMETRY_COLUMNS}
+                   FROM telemetry t
+                   JOIN sensors s ON t.sensor_id = s.id"""
+
+
+def keyset_query(
+    select_sql: str, limit: int | None = None, before_id: int | None = None, after_id: int | None = None
+) -> tuple[str, tuple]:
+    """
+    id(PK) 기준 키셋 페이지 조회 (SQL, 파라미터).
+    - before_id: id < before_id 를 최신순(DESC)으로 → 이전(과거) 페이지
+    - after_id 만: id > after_id 를 오래된 순(ASC)으로 → 이후(새로 들어온) 행 따라가기
+    - 둘 다 없으면 최신순. limit=None 이면 제한 없음 (스트리밍용)
+    """
+    where, params = [], []
+    if after_id is not None:
+        where.append("id > %s")
+        params.append(after_id)
+    if before_id is not None:
+        where.append("id < %s")
+        params.append(before_id)
+    order = "ASC" if after_id is not None and before_id is None else "DESC"
+    sql = select_sql + (" WHERE " + " AND ".join(where) if where else "") + f" ORDER BY id {order}"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, tuple(params)
+
+
+def training_data_query(limit: int | None = 100, before_id: int | None = None, after_id: int | None = None):
+    return keyset_query(_SQL_TRAINING_SELECT, limit, before_id, after_id)
+
+
+def predictions_query(limit: int | None = 100, before_id: int | None = None, after_id: int | None = None):
+    return keyset_query(_SQL_PREDICTIONS_SELECT, limit, before_id, after_id)
+
+
+def prediction_params(model_name: str, input_summary: dict, prediction_value: float, meta: dict = None) -> tuple:
+    """predictions INSERT 파라미터 (JSON 컬럼 직렬화 포함)"""
+    return (model_name, json.dumps(input_summary), prediction_value, json.dumps(meta or {}))
+
+
+def _time_range(since=None, until=None) -> tuple[list[str], tuple]:
+    """recorded_at 범위 [since, until) 조건·파라미터. 파티션 테이블(docs/09)이면 해당 일자 파티션만 읽음."""
+    conds, params = [], ()
+    if since is not None:
+        conds.append("t.recorded_at >= %s")
+        params += (since,)
+    if until is not None:
+        conds.append("t.recorded_at < %s")
+        params += (until,)
+    return conds, params
+
+
+def telemetry_query(
+    equipment_id: str | None = None,
+    sensor_id: int | None = None,
+    limit: int = 200,
+    since=None,
+    until=None,
+    per_sensor_limit: int | None = None,
+) -> tuple[str, tuple]:
+    """
+    get_telemetry 용 (SQL, 파라미터). equipment_id > sensor_id > 전체 순으로 필터.
+    since/until: recorded_at 범위 [since, until).
+    per_sensor_limit: 전체 최근 limit 건 대신 센서마다 최근 per_sensor_limit 건 (ROW_NUMBER, limit 무시).
+    결과는 항상 recorded_at 최신순.
+    """
+    conds, params = [], ()
+    if equipment_id:
+        conds, params = ["s.equipment_id = %s"], (equipment_id,)
+    elif sensor_id:
+        conds, params = ["t.sensor_id = %s"], (sensor_id,)
+        if per_sensor_limit:
+            limit, per_sensor_limit = per_sensor_limit, None  # 센서 1개면 일반 LIMIT 과 같음
+    range_conds, range_params = _time_range(since, until)
+    conds, params = conds + range_conds, params + range_params
+    where = "WHERE " + " AND ".join(conds) if conds else ""
+    if per_sensor_limit:
+        sql = f"""SELECT * FROM (
+                    SELECT {_SQL_TELEMETRY_COLUMNS},
+                           ROW_NUMBER() OVER (PARTITION BY t.sensor_id ORDER BY t.recorded_at DESC, t.id DESC) AS rn
+                    FROM telemetry t
+                    JOIN sensors s ON t.sensor_id = s.id
+                    {where}
+                  ) w
+                  WHERE rn <= %s
+                  ORDER BY recorded_at DESC"""
+        return sql, params + (per_sensor_limit,)
+    sql = f"""{_SQL_TELEMETRY_SELECT}
+                   {where}
+                   ORDER BY t.recorded_at DESC
+                   LIMIT %s"""
+    return sql, params + (limit,)
+
+
+SQL_EQUIPMENT_SENSOR_IDS = "SELECT id FROM sensors WHERE equipment_id = %s ORDER BY id"
+
+
+def per_sensor_telemetry_query(
+    sensor_ids: list[int], per_sensor_limit: int, since=None, until=None
+) -> tuple[str, tuple]:
+    """
+    센서마다 최근 per_sensor_limit 건을 센서별 (SELECT ... ORDER BY recorded_at DESC LIMIT n) 의 UNION ALL 로 조회.
+    각 조각이 idx_sensor_recorded 를 역순으로 n 건만 읽으므로 이력이 길어도 읽는 행 수 = 센서 수 × n.
+    (설비 1대처럼 센서 수가 적을 때용. 센서가 많으면 telemetry_query(per_sensor_limit=...) 의 ROW_NUMBER)
+    """
+    range_conds, range_params = _time_range(since, until)
+    where = " AND ".join(["t.sensor_id = %s"] + range_conds)
+    part = f"({_SQL_TELEMETRY_SELECT} WHERE {where} ORDER BY t.recorded_at DESC LIMIT %s)"
+    sql = "\nUNION ALL\n".join([part] * len(sensor_ids)) + "\nORDER BY recorded_at DESC"
+    params = ()
+    for sid in sensor_ids:
+        params += (sid,) + range_params + (per_sensor_limit,)
+    return sql, params
+
+
+def fleet_telemetry_query(
+    limit: int = 200, since=None, until=None, per_sensor_limit: int | None = None
+) -> tuple[str, tuple]:
+    """
+    get_fleet_telemetry 용 (SQL, 파라미터). 설비마다 최근 limit 건 (= 설비별 get_telemetry 와 같은 구간)을
+    ROW_NUMBER() 로 한 번에 조회. 필요한 컬럼만 읽음. since/until: recorded_at 범위 [since, until).
+    per_sensor_limit: 설비 대신 센서마다 최근 per_sensor_limit 건 (rn 은 센서 안 최신순 번호).
+    """
+    range_conds, params = _time_range(since, until)
+    where = "WHERE " + " AND ".join(range_conds) if range_conds else ""
+    partition = "t.sensor_id" if per_sensor_limit else "s.equipment_id"
+    sql = f"""SELECT equipment_id, sensor_id, value, rn FROM (
+                SELECT s.equipment_id, t.sensor_id, t.value,
+                       ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY t.recorded_at DESC, t.id DESC) AS rn
+                FROM telemetry t
+                JOIN sensors s ON t.sensor_id = s.id
+                {where}
+              ) w
+              WHERE rn <= %s"""
+    return sql, params + (per_sensor_limit or limit,)
 
 
-def get_training_data(limit: int = 100):
-    """훈련 데이터 최근 limit 건 조회 → 대시보드/학습용"""
+_SQL_SENSOR_STATS_SELECT = """SELECT st.sensor_id, st.sample_count, st.mean, st.m2, st.ewma_mean, st.ewma_var,
+                              st.last_value, st.last_recorded_at, st.last_telemetry_id, st.updated_at,
+                              s.equipment_id, s.sensor_name, s.sensor_type
+                       FROM sensor_stats st
+                       JOIN sensors s ON st.sensor_id = s.id"""
+
+
+def sensor_stats_query(equipment_id: str | None = None, sensor_id: int | None = None) -> tuple[str, tuple]:
+    """get_sensor_stats 용 (SQL, 파라미터). get_telemetry 와 같은 필터 (equipment_id > sensor_id > 전체)."""
+    if equipment_id:
+        where, params = "WHERE s.equipment_id = %s", (equipment_id,)
+    elif sensor_id:
+        where, params = "WHERE st.sensor_id = %s", (sensor_id,)
+    else:
+        where, params = "", ()
+    return f"{_SQL_SENSOR_STATS_SELECT} {where} ORDER BY st.sensor_id", params
+
+
+def rollup_series_query(sensor_id: int, resolution: str, start, end) -> tuple[str, tuple]:
+    """get_telemetry_rollups 용 (SQL, 파라미터). bucket_start 가 [start, end) 인 구간, 시간순."""
+    sql = """SELECT bucket_start, sample_count, min_value, max_value, sum_value, sum_sq, anomaly_count
+             FROM telemetry_rollups
+             WHERE sensor_id = %s AND resolution = %s AND bucket_start >= %s AND bucket_start < %s
+             ORDER BY bucket_start"""
+    return sql, (sensor_id, resolution, start, end)
+
+
+def get_training_data(limit: int = 100, before_id: int | None = None, after_id: int | None = None):
+    """훈련 데이터 최근 limit 건 조회 → 대시보드/학습용 (before_id/after_id 로 키셋 페이지)"""
     with get_db() as cur:
-        cur.execute(
-            "SELECT id, created_at, feature1, feature2, target FROM training_data ORDER BY id DESC LIMIT %s",
-            (limit,),
-        )
+        cur.execute(*training_data_query(limit, before_id, after_id))
         return cur.fetchall()
 
 
+_online_stats_table = True  # model_online_stats 가 없으면(1146) 이후 잠금 생략
+
+
+def lock_online_stats(cur) -> None:
+    """
+    training_data INSERT 전에 호출 (같은 트랜잭션). 온라인 학습 통계 행을 잠가 저장 순서를 반영 순서와 맞춤.
+    training_data 를 직접 저장하는 코드는 모두 이 함수를 먼저 부를 것 (online_model 은 자체 잠금으로 같은 행을 잠금).
+    """
+    global _online_stats_table
+    if not _online_stats_table:
+        return
+    try:
+        cur.execute(SQL_LOCK_ONLINE_STATS)
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] != 1146:  # 1146: 테이블 없음 (model_online_stats 미생성)
+            raise
+        _online_stats_table = False
+
+
 def insert_training_data(feature1: float, feature2: float, target: float):
-    """훈련 데이터 1건 저장"""
+    """훈련 데이터 1건 저장 (온라인 학습 통계 잠금 후)"""
     with get_db() as cur:
-        cur.execute(
-            "INSERT INTO training_data (feature1, feature2, target) VALUES (%s, %s, %s)",
-            (feature1, feature2, target),
-        )
+        lock_online_stats(cur)
+        cur.execute(SQL_INSERT_TRAINING, (feature1, feature2, target))
         return cur.lastrowid
 
 
-def get_predictions(limit: int = 100):
-    """예측 결과 최근 limit 건 조회 → 대시보드용"""
+def insert_training_rows(rows: list[tuple]) -> int:
+    """
+    훈련 데이터 여러 건을 한 트랜잭션으로 저장 (executemany → 다중 행 INSERT, 온라인 학습 통계 잠금 후).
+    rows: (feature1, feature2, target) 튜플 리스트. 저장 건수 반환.
+    """
+    if not rows:
+        return 0
     with get_db() as cur:
-        cur.execute(
-            """SELECT id, created_at, model_name, input_summary, prediction_value, meta
-               FROM predictions ORDER BY id DESC LIMIT %s""",
-            (limit,),
-        )
+        lock_online_stats(cur)
+        cur.executemany(SQL_INSERT_TRAINING, rows)
+        return cur.rowcount
+
+
+def get_predictions(limit: int = 100, before_id: int | None = None, after_id: int | None = None):
+    """예측 결과 최근 limit 건 조회 → 대시보드용 (before_id/after_id 로 키셋 페이지)"""
+    with get_db() as cur:
+        cur.execute(*predictions_query(limit, before_id, after_id))
         return cur.fetchall()
 
 
+def iter_rows(sql: str, params: tuple = ()):
+    """
+    서버 측 커서(SSDictCursor, 비버퍼)로 행을 하나씩 yield → 큰 결과도 메모리에 모으지 않고 스트리밍.
+    끝까지 읽지 않고 중단되면 (클라이언트 연결 끊김 등) 연결은 풀에 돌려주지 않고 폐기.
+    """
+    conn, created_at = _pool.checkout()
+    done = False
+    try:
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cur:
+            cur.execute(sql, params)
+            for row in cur:
+                yield row
+        conn.commit()
+        done = True
+    finally:
+        _pool.checkin(conn, created_at, broken=not done)
+
+
+def get_max_prediction_id() -> int:
+    """predictions 최대 id (없으면 0). 워커 간 링 버퍼 동기화 확인용."""
+    with get_db() as cur:
+        cur.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM predictions")
+        return int(cur.fetchone()["max_id"])
+
+
 def insert_prediction(model_name: str, input_summary: dict, prediction_value: float, meta: dict = None):
     """예측 결과 1건 저장 (가이드 ③에서 모델 호출 후 사용)"""
-    import json
     with get_db() as cur:
-        cur.execute(
-            """INSERT INTO predictions (model_name, input_summary, prediction_value, meta)
-               VALUES (%s, %s, %s, %s)""",
-            (model_name, json.dumps(input_summary), prediction_value, json.dumps(meta or {})),
-        )
+        cur.execute(SQL_INSERT_PREDICTION, prediction_params(model_name, input_summary, prediction_value, meta))
         return cur.lastrowid
 
 
-def get_telemetry(equipment_id: str | None = None, sensor_id: int | None = None, limit: int = 200):
+def insert_predictions(rows: list[tuple], with_uid: bool = False) -> int:
+    """
+    예측 결과 여러 건을 한 번에 저장 (executemany → 다중 행 INSERT 1회).
+    rows: prediction_params() 형태의 튜플 리스트 (with_uid 면 맨 앞에 uid 추가). 저장 건수 반환.
+    """
+    if not rows:
+        return 0
+    with get_db() as cur:
+        cur.executemany(SQL_INSERT_PREDICTION_UID if with_uid else SQL_INSERT_PREDICTION, rows)
+        return cur.rowcount
+
+
+def get_prediction_ids_by_uid(uids: list[str]) -> dict[str, int]:
+    """uid 목록 → {uid: predictions.id} (write-behind 저장 후 id 확인용)"""
+    if not uids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(uids))
+    with get_db() as cur:
+        cur.execute(f"SELECT id, uid FROM predictions WHERE uid IN ({placeholders})", tuple(uids))
+        return {r["uid"]: r["id"] for r in cur.fetchall()}
+
+
+def get_telemetry(
+    equipment_id: str | None = None,
+    sensor_id: int | None = None,
+    limit: int = 200,
+    since=None,
+    until=None,
+    per_sensor_limit: int | None = None,
+):
     """
     텔레메트리 시계열 조회 (설비 예지 보전용).
-    equipment_id 또는 sensor_id로 필터. 둘 다 없으면 전체 최근 건.
+    equipment_id 또는 sensor_id로 필터. 둘 다 없으면 전체 최근 건. since/until 로 recorded_at 범위 제한.
+    per_sensor_limit: 센서마다 최근 N건 (고빈도 센서가 limit 을 다 채워 저빈도 센서가 빠지는 문제 방지).
+    설비 지정 시 센서별 인덱스 범위 조회(UNION ALL), 그 외에는 ROW_NUMBER.
     """
     with get_db() as cur:
-        if equipment_id:
-            cur.execute(
-                """SELECT t.id, t.sensor_id, t.recorded_at, t.value, t.label, t.meta,
-                          s.equipment_id, s.sensor_name, s.sensor_type, s.unit, s.normal_min, s.normal_max
-                   FROM telemetry t
-                   JOIN sensors s ON t.sensor_id = s.id
-                   WHERE s.equipment_id = %s
-                   ORDER BY t.recorded_at DESC
-                   LIMIT %s""",
-                (equipment_id, limit),
-            )
-        elif sensor_id:
-            cur.execute(
-                """SELECT t.id, t.sensor_id, t.recorded_at, t.value, t.label, t.meta,
-                          s.equipment_id, s.sensor_name, s.sensor_type, s.unit, s.normal_min, s.normal_max
-                   FROM telemetry t
-                   JOIN sensors s ON t.sensor_id = s.id
-                   WHERE t.sensor_id = %s
-                   ORDER BY t.recorded_at DESC
-                   LIMIT %s""",
-                (sensor_id, limit),
-            )
+        if per_sensor_limit and equipment_id:
+            cur.execute(SQL_EQUIPMENT_SENSOR_IDS, (equipment_id,))
+            sensor_ids = [r["id"] for r in cur.fetchall()]
+            if not sensor_ids:
+                return []
+            cur.execute(*per_sensor_telemetry_query(sensor_ids, per_sensor_limit, since, until))
         else:
-            cur.execute(
-                """SELECT t.id, t.sensor_id, t.recorded_at, t.value, t.label, t.meta,
-                          s.equipment_id, s.sensor_name, s.sensor_type, s.unit, s.normal_min, s.normal_max
-                   FROM telemetry t
-                   JOIN sensors s ON t.sensor_id = s.id
-                   ORDER BY t.recorded_at DESC
-                   LIMIT %s""",
-                (limit,),
-            )
+            cur.execute(*telemetry_query(equipment_id, sensor_id, limit, since, until, per_sensor_limit))
+        return cur.fetchall()
+
+
+def get_fleet_telemetry(limit: int = 200, since=None, until=None, per_sensor_limit: int | None = None):
+    """전체 설비의 설비별(또는 센서별) 최근 건 (equipment_id, sensor_id, value, rn: 최신순 번호)"""
+    with get_db() as cur:
+        cur.execute(*fleet_telemetry_query(limit, since, until, per_sensor_limit))
+        return cur.fetchall()
+
+
+def get_sensor_stats(equipment_id: str | None = None, sensor_id: int | None = None):
+    """센서별 누적 통계 (sensor_stats, docs/07_sensor_stats.sql) + 센서 정보"""
+    with get_db() as cur:
+        cur.execute(*sensor_stats_query(equipment_id, sensor_id))
+        return cur.fetchall()
+
+
+def get_sensor_ids() -> list[int]:
+    """sensors 마스터의 id 목록 (텔레메트리 적재 검증용)"""
+    with get_db() as cur:
+        cur.execute("SELECT id FROM sensors")
+        return [r["id"] for r in cur.fetchall()]
+
+
+def get_telemetry_rollups(sensor_id: int, resolution: str, start, end):
+    """센서 1개의 구간 집계 시계열 (telemetry_rollups, docs/08_telemetry_rollups.sql)"""
+    with get_db() as cur:
+        cur.execute(*rollup_series_query(sensor_id, resolution, start, end))
         return cur.fetchall()
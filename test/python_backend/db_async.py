@@ -0,0 +1,178 @@
+# 비동기(asyncio) MariaDB 연결과 조회/저장 함수
+# db.py 와 같은 함수 이름·반환 형태(dict 행)를 제공하며 aiomysql 전용 풀을 사용합니다.
+# FastAPI 를 DB_ASYNC=true 로 실행할 때만 사용 (스크립트는 기존 db.py 동기 함수 그대로 사용)
+# 풀 연결은 autocommit: 조회는 트랜잭션을 열어 두지 않음 (aiomysql 은 트랜잭션 중인 연결을 반납 시 닫아 버리고,
+# 살아남아도 REPEATABLE READ 스냅샷이 고정됨). 저장만 begin()/commit() 으로 명시적 트랜잭션
+
+import asyncio
+import os
+import ssl as _ssl
+
+import aiomysql
+import pymysql
+
+from db import (
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    SQL_EQUIPMENT_SENSOR_IDS,
+    SQL_INSERT_PREDICTION,
+    SQL_INSERT_TRAINING,
+    SQL_LOCK_ONLINE_STATS,
+    _ssl_option,
+    fleet_telemetry_query,
+    per_sensor_telemetry_query,
+    prediction_params,
+    predictions_query,
+    rollup_series_query,
+    sensor_stats_query,
+    telemetry_query,
+    training_data_query,
+)
+
+DB_ASYNC_POOL_MIN = int(os.getenv("DB_ASYNC_POOL_MIN", "1"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", str(DB_POOL_SIZE)))
+
+_pool: aiomysql.Pool | None = None
+_online_stats_table = True  # model_online_stats 가 없으면(1146) 이후 잠금 생략 (db.lock_online_stats 와 같음)
+_pool_lock = asyncio.Lock()
+
+
+def _ssl_context():
+    """db._ssl_option() 설정을 aiomysql 용 SSLContext 로 변환."""
+    opt = _ssl_option()
+    if opt is None:
+        return None
+    if isinstance(opt, dict):
+        return _ssl.create_default_context(cafile=opt["ca"])
+    return _ssl.create_default_context()
+
+
+async def get_pool() -> aiomysql.Pool:
+    """aiomysql 풀 (첫 호출 시 생성)."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await aiomysql.create_pool(
+                host=os.getenv("DB_HOST", "localhost"),
+                port=int(os.getenv("DB_PORT", "3306")),
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD"),
+                db=os.getenv("DB_NAME"),
+                charset="utf8mb4",
+                cursorclass=aiomysql.DictCursor,
+                minsize=min(DB_ASYNC_POOL_MIN, DB_ASYNC_POOL_SIZE),
+                maxsize=DB_ASYNC_POOL_SIZE,
+                pool_recycle=DB_POOL_RECYCLE,
+                ssl=_ssl_context(),
+                autocommit=True,
+            )
+    return _pool
+
+
+async def close_pool() -> None:
+    """풀의 모든 연결 종료 (앱 종료 시)."""
+    global _pool
+    if _pool is None:
+        return
+    _pool.close()
+    await _pool.wait_closed()
+    _pool = None
+
+
+def get_pool_stats() -> dict:
+    """비동기 풀 통계 (size/freesize/maxsize)."""
+    if _pool is None:
+        return {"size": 0, "free": 0, "maxsize": DB_ASYNC_POOL_SIZE}
+    return {"size": _pool.size, "free": _pool.freesize, "maxsize": _pool.maxsize}
+
+
+async def _fetchall(sql: str, params: tuple):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchall()
+
+
+async def _lock_online_stats(cur) -> None:
+    """training_data INSERT 전 온라인 학습 통계 행 잠금 (db.lock_online_stats 참고)"""
+    global _online_stats_table
+    if not _online_stats_table:
+        return
+    try:
+        await cur.execute(SQL_LOCK_ONLINE_STATS)
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] != 1146:  # 1146: 테이블 없음 (model_online_stats 미생성)
+            raise
+        _online_stats_table = False
+
+
+async def _insert(sql: str, params: tuple, lock_online_stats: bool = False):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cur:
+                if lock_online_stats:
+                    await _lock_online_stats(cur)
+                await cur.execute(sql, params)
+                rid = cur.lastrowid
+            await conn.commit()
+            return rid
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def get_training_data(limit: int = 100, before_id: int | None = None, after_id: int | None = None):
+    """훈련 데이터 최근 limit 건 조회 (before_id/after_id 키셋 페이지)"""
+    return await _fetchall(*training_data_query(limit, before_id, after_id))
+
+
+async def insert_training_data(feature1: float, feature2: float, target: float):
+    """훈련 데이터 1건 저장 (온라인 학습 통계 잠금 후)"""
+    return await _insert(SQL_INSERT_TRAINING, (feature1, feature2, target), lock_online_stats=True)
+
+
+async def get_predictions(limit: int = 100, before_id: int | None = None, after_id: int | None = None):
+    """예측 결과 최근 limit 건 조회 (before_id/after_id 키셋 페이지)"""
+    return await _fetchall(*predictions_query(limit, before_id, after_id))
+
+
+async def insert_prediction(model_name: str, input_summary: dict, prediction_value: float, meta: dict = None):
+    """예측 결과 1건 저장"""
+    return await _insert(SQL_INSERT_PREDICTION, prediction_params(model_name, input_summary, prediction_value, meta))
+
+
+async def get_telemetry(
+    equipment_id: str | None = None,
+    sensor_id: int | None = None,
+    limit: int = 200,
+    since=None,
+    until=None,
+    per_sensor_limit: int | None = None,
+):
+    """텔레메트리 시계열 조회 (db.get_telemetry 와 동일한 필터·per_sensor_limit 조회 방식)"""
+    if per_sensor_limit and equipment_id:
+        sensor_ids = [r["id"] for r in await _fetchall(SQL_EQUIPMENT_SENSOR_IDS, (equipment_id,))]
+        if not sensor_ids:
+            return []
+        return await _fetchall(*per_sensor_telemetry_query(sensor_ids, per_sensor_limit, since, until))
+    return await _fetchall(*telemetry_query(equipment_id, sensor_id, limit, since, until, per_sensor_limit))
+
+
+async def get_fleet_telemetry(limit: int = 200, since=None, until=None, per_sensor_limit: int | None = None):
+    """전체 설비의 설비별(또는 센서별) 최근 건 (db.get_fleet_telemetry 와 동일)"""
+    return await _fetchall(*fleet_telemetry_query(limit, since, until, per_sensor_limit))
+
+
+async def get_sensor_stats(equipment_id: str | None = None, sensor_id: int | None = None):
+    """센서별 누적 통계 (db.get_sensor_stats 와 동일한 필터)"""
+    return await _fetchall(*sensor_stats_query(equipment_id, sensor_id))
+
+
+async def get_telemetry_rollups(sensor_id: int, resolution: str, start, end):
+    """센서 1개의 구간 집계 시계열 (db.get_telemetry_rollups 와 동일)"""
+    return await _fetchall(*rollup_series_query(sensor_id, resolution, start, end))
@@ -0,0 +1,277 @@
+# 고장 확률 계산 엔진 (NumPy 벡터화)
+# 텔레메트리 행을 한 번에 타입 배열(sensor_id, value, recorded_at)로 바꾼 뒤,
+# 센서별 평균·표준편차·최신값 Z-score 를 그룹 연산(bincount / lexsort)으로 한꺼번에 계산합니다.
+# 수백만 행·수천 센서에서도 Python 루프 없이 동작하며, 반환 구조는 기존 _compute_failure_probability 와 같습니다.
+
+from operator import itemgetter
+from typing import Optional
+
+import numpy as np
+
+
+def rows_to_arrays(
+    rows: list[dict], newest_first: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[int, dict]]:
+    """
+    db.get_telemetry 행 목록 → (sensor_id int64, value float64, recorded_at int64, sensor_info).
+    sensor_id·value 가 없거나 숫자가 아닌 행은 sensor_id=-1 / value=nan 으로 표시 (계산에서 제외).
+    recorded_at: 클수록 최신인 정렬 키 (µs). newest_first=True 면 행이 이미 최신순(ORDER BY recorded_at DESC)이라고 보고
+    datetime 변환 없이 행 순서로 대신함 (행 단위 datetime 변환이 전체 비용의 대부분).
+    sensor_info: 센서별 첫 등장 행의 이름·유형·설비 ID.
+    """
+    n = len(rows)
+    # 빠른 경로: map(itemgetter) + fromiter (행 dict 를 C 수준에서 한 번씩만 순회, 중간 리스트·튜플 없음)
+    # 키가 없거나 None·문자열 등이 섞이면 행별 변환으로 다시 계산
+    try:
+        sensor_id = np.fromiter(map(itemgetter("sensor_id"), rows), dtype=np.int64, count=n)
+        value = np.fromiter(map(itemgetter("value"), rows), dtype=np.float64, count=n)
+        sensor_id[sensor_id == 0] = -1
+    except (KeyError, TypeError, ValueError):
+        sensor_id = np.fromiter((r.get("sensor_id") or -1 for r in rows), dtype=np.int64, count=n)
+        value = np.fromiter((_to_float(r.get("value")) for r in rows), dtype=np.float64, count=n)
+    if newest_first:
+        recorded_at = np.arange(n - 1, -1, -1, dtype=np.int64)
+    else:
+        recorded_at = np.array([r.get("recorded_at") for r in rows], dtype="datetime64[us]").view(np.int64)
+
+    sids, first_idx, _ = group_ids(sensor_id)
+    sensor_info: dict[int, dict] = {}
+    for sid, i in zip(sids.tolist(), first_idx.tolist()):
+        if sid > 0:
+            r = rows[i]
+            sensor_info[sid] = {
+                "sensor_id": r.get("sensor_id"),
+                "sensor_name": r.get("sensor_name"),
+                "sensor_type": r.get("sensor_type"),
+                "equipment_id": r.get("equipment_id"),
+            }
+    return sensor_id, value, recorded_at, sensor_info
+
+
+def _to_float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def group_ids(ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    np.unique(ids, return_index=True, return_inverse=True) 와 같은 (고유값, 첫 등장 위치, 그룹 번호).
+    센서 ID 처럼 조밀한 정수(PK)면 정렬 없이 bincount 로 계산 (수백만 행에서 np.unique 대비 약 10배 빠름).
+    """
+    if ids.size == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return ids[:0], empty, empty
+    lo, hi = int(ids.min()), int(ids.max())
+    if lo < 0 or hi > max(4 * ids.size, 1 << 16):
+        return np.unique(ids, return_index=True, return_inverse=True)
+    uniq = np.flatnonzero(np.bincount(ids, minlength=hi + 1))
+    remap = np.empty(hi + 1, dtype=np.intp)
+    remap[uniq] = np.arange(uniq.size)
+    inv = remap[ids]
+    first_idx = np.full(uniq.size, ids.size, dtype=np.intp)
+    np.minimum.at(first_idx, inv, np.arange(ids.size))
+    return uniq.astype(ids.dtype, copy=False), first_idx, inv
+
+
+def sensor_stats(sensor_id: np.ndarray, value: np.ndarray, recorded_at: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    센서별 그룹 통계 (유효 행만). 반환 배열은 모두 센서 순서(첫 등장 순) 기준:
+    sensor_id, count, mean, std(모표준편차, ddof=0), value_last(최신 recorded_at 값), z_last
+    """
+    valid = (sensor_id >= 0) & ~np.isnan(value)
+    if valid.all():
+        sid, val, ts = sensor_id, value, recorded_at  # 대부분의 경우: 복사 생략
+    else:
+        sid, val, ts = sensor_id[valid], value[valid], recorded_at[valid]
+    if sid.size == 0:
+        empty_f = np.empty(0, dtype=np.float64)
+        return {"sensor_id": np.empty(0, dtype=np.int64), "count": np.empty(0, dtype=np.int64),
+                "mean": empty_f, "std": empty_f, "value_last": empty_f, "z_last": empty_f}
+
+    uniq, first_idx, inv = group_ids(sid)
+    k = uniq.size
+    count = np.bincount(inv, minlength=k)
+    mean = np.bincount(inv, weights=val, minlength=k) / count
+    dev = val - mean[inv]
+    std = np.sqrt(np.bincount(inv, weights=dev * dev, minlength=k) / count)
+
+    # 센서별 최신값. 같은 시각이면 먼저 나온 행(최신순 조회 결과의 앞쪽)을 최신으로 봄
+    if sid.size < 2 or np.all(ts[:-1] >= ts[1:]):
+        last = first_idx  # 이미 최신순: 센서별 첫 등장 행이 최신 (정렬 불필요)
+    else:
+        # (센서, 시각, 원래 순서 역순) 으로 정렬 후 각 그룹의 마지막 원소
+        order = np.lexsort((-np.arange(sid.size), ts, inv))
+        last = order[np.cumsum(count) - 1]
+    value_last = val[last]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_last = np.where((count >= 2) & (std > 0), (value_last - mean) / std, 0.0)
+
+    # 첫 등장 순서로 재배열 (기존 구현의 details 순서와 동일)
+    pos = np.argsort(first_idx, kind="stable")
+    return {
+        "sensor_id": uniq[pos],
+        "count": count[pos],
+        "mean": mean[pos],
+        "std": std[pos],
+        "value_last": value_last[pos],
+        "z_last": z_last[pos],
+    }
+
+
+def probability_from_z(max_abs_z: float) -> float:
+    """|z| → 확률: min(1, |z|/3) (3-sigma 초과 시 1)"""
+    return min(1.0, max(0.0, max_abs_z / 3.0))
+
+
+def compute_failure_probability_arrays(
+    sensor_id: np.ndarray,
+    value: np.ndarray,
+    recorded_at: np.ndarray,
+    sensor_info: Optional[dict[int, dict]] = None,
+) -> tuple[float, dict]:
+    """배열 입력 버전: (확률, details). details 구조는 기존 API 응답과 동일."""
+    st = sensor_stats(sensor_id, value, recorded_at)
+    if st["sensor_id"].size == 0:
+        return 0.0, {"method": "zscore", "max_abs_z": 0.0, "sensors": []}
+    abs_z = np.abs(st["z_last"])
+    max_abs_z = float(abs_z.max())
+    sensor_info = sensor_info or {}
+    details = [
+        {
+            **sensor_info.get(sid, {"sensor_id": sid}),
+            "value_last": v_last,
+            "z_score": round(z, 4),
+            "sample_count": cnt,
+        }
+        for sid, v_last, z, cnt in zip(
+            st["sensor_id"].tolist(), st["value_last"].tolist(), st["z_last"].tolist(), st["count"].tolist()
+        )
+    ]
+    prob = probability_from_z(max_abs_z)
+    return round(prob, 4), {"method": "zscore", "max_abs_z": round(max_abs_z, 4), "sensors": details}
+
+
+def stats_zscores(stats_rows: list[dict], mode: str = "ewma") -> tuple[np.ndarray, np.ndarray]:
+    """sensor_stats 행별 최신값 Z-score 와 표본 수 (mode: ewma | cumulative). 계산 불가(표본<2, 분산 0)는 z=0."""
+    count = np.array([r["sample_count"] or 0 for r in stats_rows], dtype=np.int64)
+    value_last = np.array([r["last_value"] for r in stats_rows], dtype=np.float64)
+    if mode == "ewma":
+        mean = np.array([r["ewma_mean"] for r in stats_rows], dtype=np.float64)
+        var = np.array([r["ewma_var"] for r in stats_rows], dtype=np.float64)
+    else:
+        mean = np.array([r["mean"] for r in stats_rows], dtype=np.float64)
+        var = np.array([r["m2"] for r in stats_rows], dtype=np.float64) / np.maximum(count, 1)
+    std = np.sqrt(np.maximum(np.nan_to_num(var), 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where((count >= 2) & (std > 0), (value_last - mean) / std, 0.0)
+    return np.nan_to_num(z), count
+
+
+def compute_failure_probability_stats(stats_rows: list[dict], mode: str = "ewma") -> tuple[float, dict]:
+    """
+    sensor_stats 누적 통계(db.get_sensor_stats 행)로 고장 확률 계산 → 원본 텔레메트리 조회 없이 O(센서 수).
+    - mode="ewma": 최신값 vs 지수가중 평균·분산 (최근 추세 반영)
+    - mode="cumulative": 최신값 vs 전체 누적 평균·분산 (Welford)
+    반환 구조는 compute_failure_probability 와 동일 (method 만 zscore-ewma / zscore-cumulative).
+    """
+    method = f"zscore-{mode}"
+    if not stats_rows:
+        return 0.0, {"message": "데이터 없음", "method": method, "sensors": []}
+    z, _ = stats_zscores(stats_rows, mode)
+    max_abs_z = float(np.abs(z).max())
+    details = [
+        {
+            "sensor_id": r["sensor_id"],
+            "sensor_name": r.get("sensor_name"),
+            "sensor_type": r.get("sensor_type"),
+            "equipment_id": r.get("equipment_id"),
+            "value_last": r["last_value"],
+            "z_score": round(zi, 4),
+            "sample_count": r["sample_count"],
+        }
+        for r, zi in zip(stats_rows, z.tolist())
+    ]
+    prob = probability_from_z(max_abs_z)
+    return round(prob, 4), {"method": method, "max_abs_z": round(max_abs_z, 4), "sensors": details}
+
+
+def compute_failure_probability(rows: list[dict], newest_first: bool = False) -> tuple[float, dict]:
+    """
+    Z-score 기반 통계적 이상 탐지로 고장 확률 0~1 계산.
+    - 센서별로 최신값의 Z-score 계산, 가장 이상 징후가 큰 센서 기준으로 확률 산출
+    - |z| >= 3 이면 고위험(확률 1에 근접), z≈0 이면 정상(확률 0에 근접)
+    - newest_first: rows 가 최신순이면 True (db.get_telemetry 결과)
+    """
+    if not rows:
+        return 0.0, {"message": "데이터 없음", "sensors": []}
+    return compute_failure_probability_arrays(*rows_to_arrays(rows, newest_first=newest_first))
+
+
+# ---------- 전체 설비 (fleet) ----------
+
+def rank_equipment(
+    equipment_id: list, sensor_id: np.ndarray, z: np.ndarray, count: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    센서별 (설비 ID, 센서 ID, 최신값 Z-score, 표본 수) → 설비별 결과를 위험도 순(max_abs_z 내림차순, 같으면 설비 ID 순)으로.
+    설비 확률은 단일 설비 API 와 같이 가장 |z| 가 큰 센서 기준.
+    반환 배열: equipment_id, failure_probability, max_abs_z, top_sensor_id, top_z_score, sensor_count, sample_count
+    """
+    if len(equipment_id) == 0:
+        empty_f = np.empty(0, dtype=np.float64)
+        empty_i = np.empty(0, dtype=np.int64)
+        return {"equipment_id": np.empty(0, dtype=object), "failure_probability": empty_f, "max_abs_z": empty_f,
+                "top_sensor_id": empty_i, "top_z_score": empty_f, "sensor_count": empty_i, "sample_count": empty_i}
+    eq_uniq, eq_inv = np.unique(np.asarray(equipment_id, dtype=str), return_inverse=True)
+    k = eq_uniq.size
+    abs_z = np.abs(z)
+    # (설비, |z|) 정렬 후 각 설비 그룹의 마지막 = 최대 |z| 센서
+    order = np.lexsort((abs_z, eq_inv))
+    inv_s = eq_inv[order]
+    top = order[np.r_[np.flatnonzero(inv_s[1:] != inv_s[:-1]), inv_s.size - 1]]
+    max_abs_z = abs_z[top]
+    rank = np.lexsort((np.arange(k), -max_abs_z))
+    return {
+        "equipment_id": eq_uniq[rank].astype(object),
+        "failure_probability": np.round(np.minimum(max_abs_z[rank] / 3.0, 1.0), 4),
+        "max_abs_z": np.round(max_abs_z[rank], 4),
+        "top_sensor_id": np.asarray(sensor_id, dtype=np.int64)[top][rank],
+        "top_z_score": np.round(z[top][rank], 4),
+        "sensor_count": np.bincount(eq_inv, minlength=k)[rank],
+        "sample_count": np.bincount(eq_inv, weights=count, minlength=k).astype(np.int64)[rank],
+    }
+
+
+def fleet_failure_probability_window(rows: list[dict]) -> dict[str, np.ndarray]:
+    """
+    설비별 최근 N건 텔레메트리(db.get_fleet_telemetry 행: equipment_id, sensor_id, value, rn)로 전체 설비 고장 확률.
+    rn 은 설비 안에서 최신순 번호(1 = 최신)라 행 순서와 무관하게 센서별 최신값을 고름.
+    """
+    if not rows:
+        return rank_equipment([], np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64))
+    # 행 dict → 컬럼: map(itemgetter) 는 C 수준 반복이라 생성식보다 빠름
+    n = len(rows)
+    sensor_id = np.fromiter(map(itemgetter("sensor_id"), rows), dtype=np.int64, count=n)
+    raw_values = list(map(itemgetter("value"), rows))
+    try:
+        value = np.array(raw_values, dtype=np.float64)
+    except (TypeError, ValueError):
+        value = np.fromiter((_to_float(v) for v in raw_values), dtype=np.float64, count=n)
+    rn = np.fromiter(map(itemgetter("rn"), rows), dtype=np.int64, count=n)
+    st = sensor_stats(sensor_id, value, -rn)
+
+    sids, first_idx, _ = group_ids(sensor_id)
+    equipment_of = {sid: rows[i]["equipment_id"] for sid, i in zip(sids.tolist(), first_idx.tolist())}
+    equipment_id = [equipment_of[sid] for sid in st["sensor_id"].tolist()]
+    return rank_equipment(equipment_id, st["sensor_id"], st["z_last"], st["count"])
+
+
+def fleet_failure_probability_stats(stats_rows: list[dict], mode: str = "ewma") -> dict[str, np.ndarray]:
+    """전체 센서의 sensor_stats 행(db.get_sensor_stats())으로 전체 설비 고장 확률 (원본 텔레메트리 조회 없음)."""
+    if not stats_rows:
+        return rank_equipment([], np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64))
+    z, count = stats_zscores(stats_rows, mode)
+    sensor_id = np.fromiter((r["sensor_id"] for r in stats_rows), dtype=np.int64, count=len(stats_rows))
+    return rank_equipment([r["equipment_id"] for r in stats_rows], sensor_id, z, count)
@@ -0,0 +1,84 @@
+# 빠른 JSON 직렬화 (orjson 이 있으면 사용, 없으면 표준 json 으로 대체)
+# db.py 가 반환하는 행 타입을 그대로 직렬화: datetime/date(ISO 8601), Decimal(float), numpy 배열·스칼라, JSON 텍스트 컬럼.
+# FastJSONResponse 를 직접 반환하면 FastAPI 의 jsonable_encoder 단계도 건너뜀 (대용량 목록 응답용).
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# JSON 타입 컬럼 (pymysql 은 문자열로 반환). decode_json_columns 로 객체로 바꿔 응답에 넣을 수 있음
+JSON_TEXT_COLUMNS = ("input_summary", "meta", "payload")
+
+
+def _default(o: Any):
+    """orjson·json 공통 fallback: 기본 지원하지 않는 타입 변환"""
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode("utf-8", errors="replace")
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if np is not None:
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+    raise TypeError(f"JSON 직렬화 불가 타입: {type(o).__name__}")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        """obj → JSON bytes (UTF-8)"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> bytes:
+        """obj → JSON bytes (UTF-8)"""
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+
+def decode_json_columns(rows: Iterable[dict], columns: Iterable[str] = JSON_TEXT_COLUMNS) -> list[dict]:
+    """행의 JSON 텍스트 컬럼을 파싱된 객체로 교체 (파싱 실패 시 원문 유지)."""
+    columns = tuple(columns)
+    out = []
+    for r in rows:
+        for c in columns:
+            v = r.get(c)
+            if isinstance(v, (str, bytes)):
+                try:
+                    r[c] = loads(v)
+                except ValueError:
+                    pass
+        out.append(r)
+    return out
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 JSONResponse. FastAPI(default_response_class=...) 또는 핸들러에서 직접 반환."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, headers: Optional[dict] = None, status_code: int = 200) -> FastJSONResponse:
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
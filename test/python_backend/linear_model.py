@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+다항 항을 포함한 선형 회귀 (train_model.py 학습, main.py 예측 공용).
+
+model.json 형식 (format = "poly-linear"):
+  features  입력 특징 이름 목록. API 의 feature1, feature2 는 앞의 두 특징에 순서대로 대응
+  terms     항 목록. 각 항은 특징 이름 목록의 곱 (["소성온도"], ["소성온도", "소성온도"], ["소성온도", "Li_Me_비율"] ...)
+  shift, scale   특징 정규화 z = (x - shift) / scale (학습 첫 청크 기준 고정값, 제곱 항의 수치 안정성용)
+  intercept, coef   예측 = intercept + Σ coef[i] * Π z[항 i 의 특징]
+  defaults  예측 입력에 없는 특징의 대입값 (학습 데이터 평균)
+  metrics   n, r2, rmse
+기존 형식 {"intercept", "coef": [c1, c2]} 도 그대로 예측 가능 (feature1, feature2 선형).
+
+학습은 XᵀX / Xᵀy 충분 통계량만 누적하므로 (NormalEquations) 행 수와 무관하게 메모리가 일정합니다.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+FORMAT = "poly-linear"
+
+
+def polynomial_terms(features: list[str], degree: int = 1, interactions: bool = False) -> list[list[str]]:
+    """특징별 1..degree 차 항 (+ interactions 면 서로 다른 두 특징의 곱)"""
+    terms = [[f] * d for d in range(1, degree + 1) for f in features]
+    if interactions:
+        terms += [[a, b] for i, a in enumerate(features) for b in features[i + 1:]]
+    return terms
+
+
+def parse_terms(spec: str, features: list[str]) -> list[list[str]]:
+    """'소성온도^2,소성온도*Li_Me_비율' → [['소성온도','소성온도'], ['소성온도','Li_Me_비율']]"""
+    terms = []
+    for token in filter(None, (t.strip() for t in spec.split(","))):
+        term = []
+        for factor in token.split("*"):
+            name, _, power = factor.strip().partition("^")
+            if name not in features:
+                raise ValueError(f"항 {token!r} 의 특징 {name!r} 이 features 에 없습니다.")
+            term += [name] * (int(power) if power else 1)
+        terms.append(term)
+    return terms
+
+
+def term_name(term: list[str]) -> str:
+    """['소성온도', '소성온도', 'Li_Me_비율'] → '소성온도^2*Li_Me_비율'"""
+    names = list(dict.fromkeys(term))
+    return "*".join(f"{n}^{term.count(n)}" if term.count(n) > 1 else n for n in names)
+
+
+def design_matrix(Z: np.ndarray, index: list[tuple[int, ...]]) -> np.ndarray:
+    """정규화된 특징 Z (n, k) → 항 행렬 (n, len(terms))"""
+    D = np.empty((Z.shape[0], len(index)), dtype=np.float64)
+    for j, idx in enumerate(index):
+        col = Z[:, idx[0]].copy()
+        for i in idx[1:]:
+            col *= Z[:, i]
+        D[:, j] = col
+    return D
+
+
+def term_index(model: dict) -> list[tuple[int, ...]]:
+    """model(또는 features·terms 를 가진 dict) 의 항 → 특징 위치 튜플 목록 (design_matrix 입력)"""
+    pos = {f: i for i, f in enumerate(model["features"])}
+    return [tuple(pos[f] for f in term) for term in model["terms"]]
+
+
+class NormalEquations:
+    """[1, 항] 설계 행렬의 XᵀX, Xᵀy, yᵀy 누적 (청크 단위 update → solve)"""
+
+    def __init__(self, n_terms: int):
+        p = n_terms + 1
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros(p)
+        self.yty = 0.0
+        self.ysum = 0.0
+        self.n = 0
+
+    def update(self, D: np.ndarray, y: np.ndarray, forget: float = 1.0) -> None:
+        """
+        청크 반영. forget < 1 이면 망각 계수: 기존 통계에 forget^m 을 곱하고 청크 안의 i 번째 행(0 부터)은
+        forget^(m-1-i) 가중 → 행을 하나씩 넣은 것과 같은 결과 (n 은 유효 표본 수).
+        """
+        X = np.column_stack((np.ones(D.shape[0]), D))
+        if forget < 1.0:
+            m = y.size
+            w = forget ** np.arange(m - 1, -1, -1, dtype=np.float64)
+            decay = forget ** m
+            Xw = X * w[:, None]
+            self.xtx = decay * self.xtx + Xw.T @ X
+            self.xty = decay * self.xty + Xw.T @ y
+            self.yty = decay * self.yty + float((w * y) @ y)
+            self.ysum = decay * self.ysum + float(w @ y)
+            self.n = decay * self.n + float(w.sum())
+            return
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.ysum += float(y.sum())
+        self.n += int(y.size)
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "xtx": self.xtx.tolist(), "xty": self.xty.tolist(), "yty": self.yty, "ysum": self.ysum}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "NormalEquations":
+        ne = cls(len(d["xty"]) - 1)
+        ne.xtx = np.asarray(d["xtx"], dtype=np.float64)
+        ne.xty = np.asarray(d["xty"], dtype=np.float64)
+        ne.yty, ne.ysum, ne.n = float(d["yty"]), float(d["ysum"]), d["n"]
+        return ne
+
+    def solve(self, ridge: float = 0.0) -> tuple[np.ndarray, dict]:
+        """(w = [intercept, coef...], {n, r2, rmse}). ridge > 0 이면 절편 제외 L2 정규화. 특이하면 최소 노름 해."""
+        A = self.xtx.copy()
+        if ridge > 0:
+            A[1:, 1:] += ridge * np.eye(A.shape[0] - 1)
+        try:
+            w = np.linalg.solve(A, self.xty)
+        except np.linalg.LinAlgError:
+            w = np.linalg.lstsq(A, self.xty, rcond=None)[0]
+        sse = max(self.yty - 2 * w @ self.xty + w @ self.xtx @ w, 0.0)
+        sst = self.yty - self.ysum * self.ysum / self.n if self.n else 0.0
+        metrics = {
+            "n": self.n if isinstance(self.n, int) else round(self.n, 3),
+            "r2": round(1.0 - sse / sst, 6) if sst > 0 else None,
+            "rmse": round(float(np.sqrt(sse / self.n)), 6) if self.n else None,
+        }
+        return w, metrics
+
+
+def fit_stream(
+    chunks: Iterable[tuple[np.ndarray, np.ndarray]],
+    features: list[str],
+    terms: list[list[str]],
+    ridge: float = 0.0,
+) -> Optional[dict]:
+    """
+    (X 청크 (n, len(features)), y 청크) 스트림으로 학습 → model.json dict (데이터 없으면 None).
+    정규화 shift/scale 은 첫 청크의 평균·표준편차로 고정 (이후 청크도 같은 값 사용 → 충분 통계량 누적 가능).
+    """
+    model = {"format": FORMAT, "features": list(features), "terms": [list(t) for t in terms]}
+    index = term_index(model)
+    ne = NormalEquations(len(terms))
+    x_sum = np.zeros(len(features))
+    shift = scale = None
+    for X, y in chunks:
+        if X.shape[0] == 0:
+            continue
+        if shift is None:
+            shift = X.mean(axis=0)
+            scale = X.std(axis=0)
+            scale[scale == 0] = 1.0
+        ne.update(design_matrix((X - shift) / scale, index), y)
+        x_sum += X.sum(axis=0)
+    if ne.n == 0:
+        return None
+    w, metrics = ne.solve(ridge)
+    return make_model(features, terms, shift, scale, w, x_sum / ne.n, metrics)
+
+
+def make_model(features, terms, shift, scale, w, defaults, metrics: dict) -> dict:
+    """풀이 결과 w = [intercept, coef...] → model.json dict"""
+    return {
+        "format": FORMAT,
+        "features": list(features),
+        "terms": [list(t) for t in terms],
+        "shift": np.asarray(shift, dtype=np.float64).tolist(),
+        "scale": np.asarray(scale, dtype=np.float64).tolist(),
+        "intercept": float(w[0]),
+        "coef": np.asarray(w[1:], dtype=np.float64).tolist(),
+        "defaults": np.asarray(defaults, dtype=np.float64).tolist(),
+        "metrics": metrics,
+    }
+
+
+def predict(model: dict, X: np.ndarray) -> np.ndarray:
+    """
+    X (n, m) → (n,) 예측. m < len(features) 이면 나머지 특징은 defaults 로 채움 (API 는 feature1, feature2 만 전달).
+    기존 형식(terms 없음)은 intercept + X @ coef.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if "terms" not in model:
+        return model["intercept"] + X @ np.asarray(model["coef"], dtype=np.float64)
+    k = len(model["features"])
+    if X.shape[1] < k:
+        fill = np.broadcast_to(np.asarray(model["defaults"][X.shape[1]:], dtype=np.float64), (X.shape[0], k - X.shape[1]))
+        X = np.hstack((X, fill))
+    Z = (X[:, :k] - np.asarray(model["shift"])) / np.asarray(model["scale"])
+    return model["intercept"] + design_matrix(Z, term_index(model)) @ np.asarray(model["coef"], dtype=np.float64)
+
+
+def predict_one(model: dict, values: list[float]) -> float:
+    """단건 예측 (NumPy 배열 생성 없이 순수 Python, 항 수가 적어 이쪽이 빠름)."""
+    if "terms" not in model:
+        return model["intercept"] + sum(c * v for c, v in zip(model["coef"], values))
+    values = list(values) + model["defaults"][len(values):]
+    z = {f: (values[i] - model["shift"][i]) / model["scale"][i] for i, f in enumerate(model["features"])}
+    pred = model["intercept"]
+    for c, term in zip(model["coef"], model["terms"]):
+        t = c
+        for f in term:
+            t *= z[f]
+        pred += t
+    return pred
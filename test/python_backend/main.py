@@ -1,29 +1,68 @@
 # 가이드 ②·③: FastAPI + MariaDB + 예측 모델
 # 실행: python main.py  또는  uvicorn main:app --host 0.0.0.0 --port 8000
 
-import json
-import math
 import os
-from pathlib import Path
-from typing import Any, Optional
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
+from datetime import datetime, timedelta
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 # 프로젝트 내 db 모듈 (같은 폴더에 db.py 가 있어야 함)
-from db import get_training_data, get_predictions, insert_training_data, insert_prediction, get_telemetry
-
-app = FastAPI(title="분석/예측 API (Python)")
+from db import (
+    get_training_data, get_predictions, insert_training_data, insert_prediction, get_telemetry, get_pool_stats,
+    get_sensor_stats, get_telemetry_rollups, get_fleet_telemetry,
+    insert_predictions, prediction_params, get_max_prediction_id,
+    iter_rows, predictions_query, training_data_query,
+)
+from alert_dispatcher import AlertDispatcher
+from failure_engine import (
+    compute_failure_probability, compute_failure_probability_arrays, compute_failure_probability_stats,
+    fleet_failure_probability_stats, fleet_failure_probability_window,
+)
+from fast_json import FastJSONResponse, decode_json_columns, dumps, json_response, loads
+import linear_model
+from model_registry import LoadedModel, ModelRegistry
+from online_model import (
+    get_state as get_online_model_state, insert_training_data as insert_training_data_online,
+    refit as refit_online_model,
+)
+from performance_tracker import PerformanceTracker
+from prediction_cache import PredictionCache
+from prediction_window import PredictionWindow
+from prediction_writer import PredictionWriter
+from sensor_stats import catch_up as catch_up_sensor_stats
+from telemetry_ingest import TELEMETRY_BULK_MAX_ROWS, IngestError, columns_from_json, columns_from_ndjson, ingest
+from telemetry_rollups import RESOLUTIONS, catch_up as catch_up_telemetry_rollups, choose_resolution, series_columns
+from telemetry_cache import TelemetryCache
+from watermark_jobs import CatchUpRunner
+
+# DB_ASYNC=true 이면 주요 엔드포인트를 aiomysql 기반 async 핸들러로 등록 (db_async.py)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("true", "1", "yes")
+if DB_ASYNC:
+    import db_async
+
+# 기본 응답 클래스: orjson 기반 (datetime·Decimal·numpy 직접 처리). 대용량 응답은 핸들러에서 json_response 로 바로 반환
+app = FastAPI(title="분석/예측 API (Python)", default_response_class=FastJSONResponse)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
-MODELS_DIR = Path(__file__).resolve().parent / "models"
-MODEL_JSON = MODELS_DIR / "model.json"
-MODEL_PKL = MODELS_DIR / "model.pkl"
-_predict_model: Any = None
-_model_kind: Optional[str] = None  # "json" | "pkl" | None
+# 모델 레지스트리: models/registry/<version>/ + CURRENT 포인터 (없으면 models/model.json·model.pkl)
+# MODEL_WATCH_INTERVAL 초마다 변경을 확인해 새 모델을 백그라운드에서 로드 후 교체 (0 이면 감시 안 함)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+_model_registry = ModelRegistry()
+
+# 예측값 캐시 (선택): PREDICT_CACHE_SIZE > 0 이면 (모델 버전, 양자화 입력) 기준 LRU/TTL 캐시 사용
+_prediction_cache = PredictionCache(
+    max_size=int(os.getenv("PREDICT_CACHE_SIZE", "0")),
+    ttl=float(os.getenv("PREDICT_CACHE_TTL", "0")),
+    quantum_f1=float(os.getenv("PREDICT_CACHE_QUANTUM_F1", "0.1")),
+    quantum_f2=float(os.getenv("PREDICT_CACHE_QUANTUM_F2", "0.1")),
+)
+_model_registry.add_listener(_prediction_cache.clear)
 
 # 위험(불량) 판정 기준: 예측값이 이 값 미만이면 위험 신호
 DANGER_THRESHOLD = float(os.getenv("DANGER_THRESHOLD", "190"))
@@ -33,6 +72,24 @@ ANOMALY_WINDOW = int(os.getenv("ANOMALY_WINDOW", "20"))  # 최근 N건으로 비
 ANOMALY_LOOKBACK = int(os.getenv("ANOMALY_LOOKBACK", "50"))  # 조회 건수
 ANOMALY_DEFECT_RATIO = float(os.getenv("ANOMALY_DEFECT_RATIO", "0.3"))  # 불량 비율 이 값 초과 시 이상
 ANOMALY_CONSECUTIVE = int(os.getenv("ANOMALY_CONSECUTIVE", "3"))  # 연속 불량 이 건수 이상 시 이상
+# 최근 예측값 링 버퍼: 여러 워커 실행 시 이 주기(초)마다 DB MAX(id) 와 비교해 필요하면 다시 seed (0 이면 시작 시 1회만)
+ANOMALY_RECONCILE_SEC = float(os.getenv("ANOMALY_RECONCILE_SEC", "30"))
+
+_prediction_window = PredictionWindow(ANOMALY_WINDOW, ANOMALY_LOOKBACK, DANGER_THRESHOLD)
+
+
+def _recent_prediction_values(limit: int) -> list[float]:
+    """DB 최근 예측값 limit 건 (시간순, 오래된 것 먼저) → 링 버퍼 seed 용"""
+    values = []
+    for r in reversed(get_predictions(limit=limit)):
+        v = r.get("prediction_value")
+        if v is not None:
+            try:
+                values.append(float(v))
+            except (TypeError, ValueError):
+                pass
+    return values
+
 
 # 입력 정상 범위 (이상 탐지용)
 INPUT_TEMP_MIN = float(os.getenv("INPUT_TEMP_MIN", "750"))
@@ -42,15 +99,76 @@ INPUT_TIME_MAX = float(os.getenv("INPUT_TIME_MAX", "24"))
 
 # 성능 하락 알림: 실제 vs 예측 MAE가 이 값 초과 시 "모델 재학습 필요"
 PERFORMANCE_MAE_THRESHOLD = float(os.getenv("PERFORMANCE_MAE_THRESHOLD", "15"))
+# 비교할 최근 훈련 데이터 수 (새 행만 증분 예측하므로 100000 처럼 크게 잡아도 폴링 부담이 작음)
 PERFORMANCE_SAMPLE_SIZE = int(os.getenv("PERFORMANCE_SAMPLE_SIZE", "20"))
+_performance_tracker = PerformanceTracker(PERFORMANCE_SAMPLE_SIZE)
+
+# 예측 결과 write-behind 저장: true 면 /api/predict 가 INSERT 를 기다리지 않고 큐에 넣은 뒤 백그라운드에서 일괄 저장
+# (predictions.uid 컬럼 필요: docs/06_predictions_uid.sql)
+PREDICTION_WRITE_BEHIND = os.getenv("PREDICTION_WRITE_BEHIND", "false").lower() in ("true", "1", "yes")
+_prediction_writer = PredictionWriter(
+    flush_rows=int(os.getenv("PREDICTION_FLUSH_ROWS", "200")),
+    flush_interval=float(os.getenv("PREDICTION_FLUSH_INTERVAL", "1.0")),
+    max_queue=int(os.getenv("PREDICTION_QUEUE_MAX", "10000")),
+    max_retries=int(os.getenv("PREDICTION_MAX_RETRIES", "3")),
+)
+
+# 목록 API(/api/training-data, /api/predictions) 비스트리밍 1페이지 최대 행 수 (stream=true 는 제한 없음)
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+# true 면 목록 응답의 JSON 컬럼(input_summary, meta)을 문자열 대신 객체로 내려줌 (기본: 기존처럼 문자열)
+API_DECODE_JSON_COLUMNS = os.getenv("API_DECODE_JSON_COLUMNS", "false").lower() in ("true", "1", "yes")
+
+# 일괄 예측(/api/predict-batch) 1회 요청 최대 행 수
+PREDICT_BATCH_MAX = int(os.getenv("PREDICT_BATCH_MAX", "100000"))
+
+# 고장 확률 계산 원천: auto(sensor_stats 누적 통계 우선, 없으면 원본 구간) | stats | window | cache(로컬 캐시)
+FAILURE_PROB_SOURCE = os.getenv("FAILURE_PROB_SOURCE", "auto")
+# sensor_stats 사용 시 Z-score 기준: ewma(지수가중 평균·분산) | cumulative(전체 누적)
+SENSOR_STATS_MODE = os.getenv("SENSOR_STATS_MODE", "ewma")
+# 원본 구간(window) 조회 시 recorded_at 하한(최근 N일). 파티션 테이블이면 해당 일자 파티션만 읽음. 0 이면 제한 없음
+TELEMETRY_QUERY_LOOKBACK_DAYS = float(os.getenv("TELEMETRY_QUERY_LOOKBACK_DAYS", "0"))
+# window 조회 per_sensor_limit(센서별 최근 N건) 최대값
+TELEMETRY_PER_SENSOR_MAX = int(os.getenv("TELEMETRY_PER_SENSOR_MAX", "5000"))
+# sensor_stats catch-up 주기(초, docs/07_sensor_stats.sql 필요). 0 이면 백그라운드 갱신 안 함
+_sensor_stats_refresher = CatchUpRunner(
+    "sensor-stats-refresher", catch_up_sensor_stats, float(os.getenv("SENSOR_STATS_REFRESH_SEC", "10"))
+)
+
+# telemetry_rollups(1분/1시간/1일 집계) catch-up 주기(초, docs/08_telemetry_rollups.sql 필요). 0 이면 안 함
+_telemetry_rollup_runner = CatchUpRunner(
+    "telemetry-rollups", catch_up_telemetry_rollups, float(os.getenv("TELEMETRY_ROLLUP_REFRESH_SEC", "30"))
+)
+# 로컬 컬럼형 텔레메트리 캐시(telemetry_cache.py) 동기화 주기(초). 0 이면 안 함 (CLI sync 로만 갱신)
+_telemetry_cache = TelemetryCache()
+_telemetry_cache_runner = CatchUpRunner(
+    "telemetry-cache", _telemetry_cache.sync, float(os.getenv("TELEMETRY_CACHE_SYNC_SEC", "0"))
+)
+# 훈련 데이터 온라인 학습(online_model.py, docs/10_online_model.sql): 저장 시 통계 갱신 여부, 계수 게시 주기(초, 0 이면 수동)
+ONLINE_MODEL_ENABLED = os.getenv("ONLINE_MODEL_ENABLED", "false").lower() in ("true", "1", "yes")
+_online_model_runner = CatchUpRunner(
+    "online-model-refit",
+    lambda: refit_online_model(_model_registry),
+    float(os.getenv("ONLINE_MODEL_REFIT_SEC", "0")) if ONLINE_MODEL_ENABLED else 0,
+)
+# /api/telemetry/series 기본·최대 포인트 수, 기본 조회 기간(일)
+SERIES_DEFAULT_POINTS = int(os.getenv("SERIES_DEFAULT_POINTS", "500"))
+SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "5000"))
+SERIES_DEFAULT_DAYS = float(os.getenv("SERIES_DEFAULT_DAYS", "7"))
+
+
+# Node 알림 웹훅 전송기: 요청 경로를 막지 않도록 큐에 넣고 백그라운드에서 전송 (연결 재사용·재시도·묶음 전송)
+_alert_dispatcher = AlertDispatcher(
+    os.getenv("NODE_ALERT_WEBHOOK_URL", ""),
+    coalesce_window=float(os.getenv("ALERT_COALESCE_WINDOW", "2.0")),
+    max_batch=int(os.getenv("ALERT_MAX_BATCH", "50")),
+    max_queue=int(os.getenv("ALERT_QUEUE_MAX", "1000")),
+    max_retries=int(os.getenv("ALERT_MAX_RETRIES", "3")),
+)
 
 
 def _notify_danger_to_node(prediction_id: int, prediction_value: float, input_summary: dict, model_name: str) -> None:
-    """위험 감지 시 Node.js 알림 웹훅 호출 (Slack 전송·DB 기록은 Node에서 수행)."""
-    url = os.getenv("NODE_ALERT_WEBHOOK_URL", "").strip()
-    if not url:
-        return
-    payload = {
+    """위험 감지 시 Node.js 알림 웹훅 전송 예약 (Slack 전송·DB 기록은 Node에서 수행)."""
+    _alert_dispatcher.submit({
         "eventType": "danger",
         "source": "fastapi-predict",
         "predictionId": prediction_id,
@@ -58,22 +176,12 @@ def _notify_danger_to_node(prediction_id: int, prediction_value: float, input_su
         "inputSummary": input_summary,
         "modelName": model_name,
         "message": f"위험 신호: 예측 방전용량 {prediction_value:.2f} mAh/g (기준 미만, 불량 가능)",
-    }
-    body = json.dumps(payload).encode("utf-8")
-    req = Request(url, data=body, method="POST", headers={"Content-Type": "application/json"})
-    try:
-        with urlopen(req, timeout=5) as _:
-            pass
-    except (URLError, HTTPError, OSError):
-        pass  # 알림 실패해도 예측 API는 성공으로 반환
+    })  # 알림 실패해도 예측 API는 성공으로 반환
 
 
 def _notify_anomaly_to_node(message: str, payload: dict) -> None:
-    """이상 징후 감지 시 Node.js 알림 웹훅 호출 (이상 징후 자동 알림 시스템)."""
-    url = os.getenv("NODE_ALERT_WEBHOOK_URL", "").strip()
-    if not url:
-        return
-    body_dict = {
+    """이상 징후 감지 시 Node.js 알림 웹훅 전송 예약 (이상 징후 자동 알림 시스템)."""
+    _alert_dispatcher.submit({
         "eventType": "anomaly",
         "source": "fastapi-anomaly-check",
         "predictionId": None,
@@ -82,117 +190,87 @@ def _notify_anomaly_to_node(message: str, payload: dict) -> None:
         "modelName": "",
         "message": message,
         "payload": payload,
-    }
-    body = json.dumps(body_dict).encode("utf-8")
-    req = Request(url, data=body, method="POST", headers={"Content-Type": "application/json"})
-    try:
-        with urlopen(req, timeout=5) as _:
-            pass
-    except (URLError, HTTPError, OSError):
-        pass
+    })
 
 
 def _check_anomalies() -> list[dict]:
     """
-    최근 예측 데이터를 분석해 이상 징후 여부 반환.
+    최근 예측 데이터를 분석해 이상 징후 여부 반환 (링 버퍼 통계 사용, DB 조회 없음).
     - 최근 ANOMALY_WINDOW 건 중 불량 비율 > ANOMALY_DEFECT_RATIO
     - 연속 불량 건수 >= ANOMALY_CONSECUTIVE
     """
-    try:
-        rows = get_predictions(limit=ANOMALY_LOOKBACK)
-    except Exception:
-        return []
-    if not rows or len(rows) < ANOMALY_CONSECUTIVE:
-        return []
-
-    # 예측값만 시간순(오래된 것 먼저)으로
-    values = []
-    for r in reversed(rows):
-        v = r.get("prediction_value")
-        if v is not None:
-            try:
-                values.append(float(v))
-            except (TypeError, ValueError):
-                pass
-    if len(values) < ANOMALY_CONSECUTIVE:
+    w = _prediction_window.snapshot()
+    if w["count"] == 0 or w["seen"] < ANOMALY_CONSECUTIVE:
         return []
 
     anomalies = []
-    window = values[-ANOMALY_WINDOW:] if len(values) >= ANOMALY_WINDOW else values
-    defect_count = sum(1 for v in window if v < DANGER_THRESHOLD)
-    defect_ratio = defect_count / len(window)
+    defect_ratio = w["defect_ratio"]
 
     # 규칙 1: 불량 비율 초과
     if defect_ratio >= ANOMALY_DEFECT_RATIO:
         anomalies.append({
             "rule": "defect_ratio",
-            "message": f"이상 징후: 최근 {len(window)}건 중 불량 비율 {defect_ratio:.1%} (기준 {ANOMALY_DEFECT_RATIO:.0%} 초과)",
+            "message": f"이상 징후: 최근 {w['count']}건 중 불량 비율 {defect_ratio:.1%} (기준 {ANOMALY_DEFECT_RATIO:.0%} 초과)",
             "defect_ratio": defect_ratio,
-            "defect_count": defect_count,
-            "window_size": len(window),
-            "recent_avg": sum(window) / len(window),
+            "defect_count": w["defect_count"],
+            "window_size": w["count"],
+            "recent_avg": w["mean"],
         })
 
     # 규칙 2: 연속 불량
-    consecutive = 0
-    for v in reversed(values):
-        if v < DANGER_THRESHOLD:
-            consecutive += 1
-        else:
-            break
+    consecutive = w["consecutive_defect"]
     if consecutive >= ANOMALY_CONSECUTIVE:
         anomalies.append({
             "rule": "consecutive_defect",
             "message": f"이상 징후: 연속 불량 {consecutive}건 (기준 {ANOMALY_CONSECUTIVE}건 이상)",
             "consecutive_defect": consecutive,
-            "recent_avg": sum(values[-ANOMALY_WINDOW:]) / len(values[-ANOMALY_WINDOW:]) if len(values) >= ANOMALY_WINDOW else sum(values) / len(values),
+            "recent_avg": w["mean"],
         })
 
     return anomalies
 
 
-def _load_json_model():
-    with open(MODEL_JSON, "r", encoding="utf-8") as f:
-        return json.load(f)
+def _predict_json(model: dict, f1: float, f2: float) -> float:
+    """model.json 단건 예측. feature1, feature2 → 모델의 앞 두 특징 (나머지 특징은 학습 평균, linear_model 참고)."""
+    return linear_model.predict_one(model, [f1, f2])
 
 
-def _predict_json(model: dict, f1: float, f2: float) -> float:
-    b = model["intercept"]
-    c1, c2 = model["coef"]
-    return b + c1 * f1 + c2 * f2
+def _predict_json_batch(model: dict, X: np.ndarray) -> np.ndarray:
+    """_predict_json 의 벡터화 버전. X: (n, 2) 행렬 → (n,) 예측값."""
+    return linear_model.predict(model, X)
 
 
 def get_model():
-    global _predict_model, _model_kind
-    if _model_kind is not None:
-        return _predict_model
-    if MODEL_JSON.exists():
-        try:
-            _predict_model = _load_json_model()
-            _model_kind = "json"
-            return _predict_model
-        except Exception:
-            pass
-    if MODEL_PKL.exists():
-        try:
-            import joblib
-            _predict_model = joblib.load(MODEL_PKL)
-            _model_kind = "pkl"
-            return _predict_model
-        except Exception:
-            pass
-    _model_kind = "none"
+    """현재 활성 모델 객체 (없으면 None). 종류·버전까지 필요하면 _model_registry.current() 사용."""
+    return _model_registry.current().model
+
+
+def _predict_uncached(h: LoadedModel, f1: float, f2: float) -> Optional[float]:
+    if h.kind == "json" and h.model is not None:
+        return _predict_json(h.model, f1, f2)
+    if h.kind == "pkl" and h.model is not None:
+        return float(h.model.predict([[f1, f2]])[0])
     return None
 
 
+def _predict_with(h: LoadedModel, f1: float, f2: float) -> Optional[float]:
+    """모델 h 로 예측 (캐시 사용 시 캐시 먼저 확인)."""
+    if not _prediction_cache.enabled or h.model is None:
+        return _predict_uncached(h, f1, f2)
+    key = _prediction_cache.key(h.version, f1, f2)
+    if key is None:
+        return _predict_uncached(h, f1, f2)
+    pred = _prediction_cache.get(key)
+    if pred is None:
+        pred = _predict_uncached(h, f1, f2)
+        if pred is not None:
+            _prediction_cache.put(key, pred)
+    return pred
+
+
 def _predict_value(f1: float, f2: float) -> Optional[float]:
     """현재 로드된 모델로 예측값 반환. 모델 없으면 None."""
-    model = get_model()
-    if _model_kind == "json" and model is not None:
-        return _predict_json(model, f1, f2)
-    if _model_kind == "pkl" and model is not None:
-        return float(model.predict([[f1, f2]])[0])
-    return None
+    return _predict_with(_model_registry.current(), f1, f2)
 
 
 def _check_input_anomaly(f1: float, f2: float) -> Optional[str]:
@@ -209,32 +287,26 @@ def _check_performance() -> dict:
     """
     최근 훈련 데이터(실제값)와 모델 예측값을 비교해 MAE 계산.
     MAE가 기준 초과 시 '모델 재학습 필요' 알림 반환.
+    최근 PERFORMANCE_SAMPLE_SIZE 건의 오차는 _performance_tracker 가 유지 (새 행·모델 교체분만 벡터화 예측).
     """
-    model = get_model()
-    if model is None or _model_kind == "none":
+    h = _model_registry.current()
+    if h.model is None or h.kind == "none":
         return {"alert": False, "message": "예측 모델이 없어 성능 검사를 건너뜁니다.", "mae": None, "sample_size": 0}
 
     try:
-        rows = get_training_data(limit=PERFORMANCE_SAMPLE_SIZE)
+        stats, cached = _performance_tracker.refresh(
+            h,
+            lambda X: _predict_matrix(h, X),
+            lambda limit: get_training_data(limit=limit),
+            lambda after_id, limit: get_training_data(limit=limit, after_id=after_id),
+        )
     except Exception:
         return {"alert": False, "message": "훈련 데이터 조회 실패", "mae": None, "sample_size": 0}
 
-    if not rows:
+    if not stats["count"]:
         return {"alert": False, "message": "훈련 데이터가 없어 성능 검사를 건너뜁니다.", "mae": None, "sample_size": 0}
 
-    errors = []
-    for r in rows:
-        f1 = float(r.get("feature1", 0))
-        f2 = float(r.get("feature2", 0))
-        actual = float(r.get("target", 0))
-        pred = _predict_value(f1, f2)
-        if pred is not None:
-            errors.append(abs(actual - pred))
-
-    if not errors:
-        return {"alert": False, "message": "비교할 예측값이 없습니다.", "mae": None, "sample_size": 0}
-
-    mae = sum(errors) / len(errors)
+    mae = stats["mae"]
     alert = mae > PERFORMANCE_MAE_THRESHOLD
     message = (
         f"모델 재학습이 필요합니다. 최근 실제값 대비 평균 오차(MAE) {mae:.2f} mAh/g (기준: {PERFORMANCE_MAE_THRESHOLD})"
@@ -245,8 +317,13 @@ def _check_performance() -> dict:
         "alert": alert,
         "message": message,
         "mae": round(mae, 2),
-        "sample_size": len(errors),
+        "rmse": round(stats["rmse"], 2),
+        "bias": round(stats["bias"], 2),
+        "sample_size": stats["count"],
         "threshold": PERFORMANCE_MAE_THRESHOLD,
+        "model_version": h.version,
+        "last_training_id": stats["last_training_id"],
+        "cached": cached,
     }
 
 
@@ -257,25 +334,249 @@ def health():
     return {"status": "ok", "service": "python-backend"}
 
 
-@app.get("/api/training-data")
-def api_training_data(limit: int = 100):
-    """훈련 데이터 조회 (대시보드/학습용)"""
+@app.get("/api/db/pool-stats")
+def api_db_pool_stats():
+    """DB 커넥션 풀 통계 (checkouts, waits, creations, open/idle/in_use). DB_ASYNC 면 async 풀 통계도 포함."""
+    stats = get_pool_stats()
+    if DB_ASYNC:
+        stats["async"] = db_async.get_pool_stats()
+    return stats
+
+
+@app.get("/api/predictions/writer-stats")
+def api_prediction_writer_stats():
+    """write-behind 저장기 통계 (queue_depth, enqueued, flushed, dropped, failed 등)"""
+    return {"enabled": PREDICTION_WRITE_BEHIND, **_prediction_writer.stats()}
+
+
+@app.get("/api/predict/cache-stats")
+def api_prediction_cache_stats():
+    """예측값 캐시 통계 (hits, misses, hit_rate, size, evictions, invalidations)"""
+    return _prediction_cache.stats()
+
+
+@app.get("/api/alerts/stats")
+def api_alert_stats():
+    """알림 웹훅 전송기 통계 (queued, sent, dropped, failed, retries, coalesced, queue_depth)"""
+    return _alert_dispatcher.stats()
+
+
+@app.get("/api/sensor-stats/refresher-stats")
+def api_sensor_stats_refresher_stats():
+    """sensor_stats catch-up 작업 통계 (runs, rows, failures, watermark, last_run_ms)"""
+    return _sensor_stats_refresher.stats()
+
+
+@app.get("/api/telemetry/rollup-stats")
+def api_telemetry_rollup_stats():
+    """telemetry_rollups catch-up 작업 통계 (runs, rows, failures, watermark, last_run_ms)"""
+    return _telemetry_rollup_runner.stats()
+
+
+@app.get("/api/telemetry/cache-stats")
+def api_telemetry_cache_stats():
+    """로컬 텔레메트리 캐시 상태 (last_id, sensors, rows, bytes, unsorted_sensors) + 동기화 작업 통계"""
+    return {**_telemetry_cache.stats(), "sync": _telemetry_cache_runner.stats()}
+
+
+@app.on_event("startup")
+def _start_model_watcher():
+    _model_registry.current()
+    _model_registry.start_watcher(MODEL_WATCH_INTERVAL)
+
+
+@app.on_event("shutdown")
+def _stop_model_watcher():
+    _model_registry.stop_watcher()
+
+
+@app.on_event("startup")
+def _start_prediction_writer():
+    if PREDICTION_WRITE_BEHIND:
+        _prediction_writer.start()
+
+
+@app.on_event("startup")
+def _seed_prediction_window():
+    # DB 최근 예측값으로 링 버퍼 seed 후 주기적으로 다른 워커와 동기화
+    try:
+        _prediction_window.reconcile(get_max_prediction_id, _recent_prediction_values)
+    except Exception:
+        pass  # DB 연결 실패 시 reconciler 가 다음 주기에 재시도
+    _prediction_window.start_reconciler(get_max_prediction_id, _recent_prediction_values, ANOMALY_RECONCILE_SEC)
+
+
+@app.on_event("shutdown")
+def _stop_prediction_window():
+    _prediction_window.stop_reconciler()
+
+
+@app.on_event("shutdown")
+def _drain_prediction_writer():
+    # 큐에 남은 예측 결과를 모두 저장한 뒤 종료
+    _prediction_writer.stop()
+
+
+@app.on_event("startup")
+def _start_alert_dispatcher():
+    _alert_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def _drain_alert_dispatcher():
+    # write-behind 저장 후 보내는 위험 알림까지 전송되도록 저장기 다음에 종료
+    _alert_dispatcher.stop()
+
+
+@app.on_event("startup")
+def _start_sensor_stats_refresher():
+    _sensor_stats_refresher.start()
+
+
+@app.on_event("shutdown")
+def _stop_sensor_stats_refresher():
+    _sensor_stats_refresher.stop()
+
+
+@app.on_event("startup")
+def _start_telemetry_rollups():
+    _telemetry_rollup_runner.start()
+
+
+@app.on_event("shutdown")
+def _stop_telemetry_rollups():
+    _telemetry_rollup_runner.stop()
+
+
+@app.on_event("startup")
+def _start_telemetry_cache_sync():
+    _telemetry_cache_runner.start()
+
+
+@app.on_event("shutdown")
+def _stop_telemetry_cache_sync():
+    _telemetry_cache_runner.stop()
+
+
+@app.on_event("startup")
+def _start_online_model_refit():
+    _online_model_runner.start()
+
+
+@app.on_event("shutdown")
+def _stop_online_model_refit():
+    _online_model_runner.stop()
+
+
+@app.on_event("shutdown")
+async def _close_async_pool():
+    if DB_ASYNC:
+        await db_async.close_pool()
+
+
+def _ndjson_response(rows) -> StreamingResponse:
+    """행 iterator → NDJSON (한 줄에 JSON 1개) 스트리밍 응답. 읽는 대로 바로 전송."""
+    def lines():
+        for r in rows:
+            if API_DECODE_JSON_COLUMNS:
+                decode_json_columns((r,))
+            yield dumps(r) + b"\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _page_limit(limit: int) -> int:
+    """비스트리밍 페이지 크기를 API_MAX_PAGE_SIZE 로 제한"""
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def _page_response(rows: list, limit: int) -> FastJSONResponse:
+    """행 목록 응답 (jsonable_encoder 생략). 다음 페이지 커서는 헤더로 안내 (본문은 기존과 같은 배열 유지)"""
+    headers = {"X-Page-Limit": str(limit)}
+    if rows:
+        ids = [r["id"] for r in rows]
+        headers["X-Next-Before-Id"] = str(min(ids))
+        headers["X-Next-After-Id"] = str(max(ids))
+    if API_DECODE_JSON_COLUMNS:
+        rows = decode_json_columns(rows)
+    return json_response(rows, headers=headers)
+
+
+def api_training_data(
+    limit: int = 100,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    stream: bool = False,
+):
+    """
+    훈련 데이터 조회 (대시보드/학습용).
+    - before_id / after_id: id 기준 키셋 페이지 (before_id → 최신순, after_id → 오래된 순)
+    - stream=true: 서버 측 커서로 읽는 대로 NDJSON 스트리밍 (limit 은 API_MAX_PAGE_SIZE 제한 없음)
+    """
+    if stream:
+        return _ndjson_response(iter_rows(*training_data_query(limit, before_id, after_id)))
+    limit = _page_limit(limit)
     try:
-        rows = get_training_data(limit=limit)
-        # datetime 등은 JSON 호환 형태로
-        return [dict(r) for r in rows]
+        rows = get_training_data(limit=limit, before_id=before_id, after_id=after_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return _page_response(rows, limit)
+
+
+async def api_training_data_async(
+    limit: int = 100,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    stream: bool = False,
+):
+    """훈련 데이터 조회 (async, DB_ASYNC=true). 스트리밍은 동기 서버 측 커서를 스레드풀에서 사용."""
+    if stream:
+        return _ndjson_response(iter_rows(*training_data_query(limit, before_id, after_id)))
+    limit = _page_limit(limit)
+    try:
+        rows = await db_async.get_training_data(limit=limit, before_id=before_id, after_id=after_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _page_response(rows, limit)
+
+
+app.add_api_route("/api/training-data", api_training_data_async if DB_ASYNC else api_training_data, methods=["GET"])
 
 
-@app.get("/api/predictions")
-def api_predictions(limit: int = 100):
-    """예측 결과 조회 (대시보드용)"""
+def api_predictions(
+    limit: int = 100,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    stream: bool = False,
+):
+    """예측 결과 조회 (대시보드용). 페이지·스트리밍 파라미터는 /api/training-data 와 동일."""
+    if stream:
+        return _ndjson_response(iter_rows(*predictions_query(limit, before_id, after_id)))
+    limit = _page_limit(limit)
     try:
-        rows = get_predictions(limit=limit)
-        return [dict(r) for r in rows]
+        rows = get_predictions(limit=limit, before_id=before_id, after_id=after_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return _page_response(rows, limit)
+
+
+async def api_predictions_async(
+    limit: int = 100,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    stream: bool = False,
+):
+    """예측 결과 조회 (async, DB_ASYNC=true)"""
+    if stream:
+        return _ndjson_response(iter_rows(*predictions_query(limit, before_id, after_id)))
+    limit = _page_limit(limit)
+    try:
+        rows = await db_async.get_predictions(limit=limit, before_id=before_id, after_id=after_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _page_response(rows, limit)
+
+
+app.add_api_route("/api/predictions", api_predictions_async if DB_ASYNC else api_predictions, methods=["GET"])
 
 
 class TrainingRow(BaseModel):
@@ -288,7 +589,8 @@ class TrainingRow(BaseModel):
 def api_insert_training(row: TrainingRow):
     """훈련 데이터 1건 저장"""
     try:
-        rid = insert_training_data(row.feature1, row.feature2, row.target)
+        insert = insert_training_data_online if ONLINE_MODEL_ENABLED else insert_training_data
+        rid = insert(row.feature1, row.feature2, row.target)
         return {"id": rid, "message": "저장됨"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -301,57 +603,271 @@ class PredictRequest(BaseModel):
     feature2: float
 
 
-@app.post("/api/predict")
+_MODEL_NAMES = {"json": "capacity_linear", "pkl": "capacity_pkl"}
+
+
+def _run_model(f1: float, f2: float) -> tuple[float, str, dict]:
+    """현재 모델로 예측 → (예측값, model_name, meta). meta 에 모델 버전 기록. 모델 없으면 더미 (평균값)."""
+    h = _model_registry.current()
+    pred = _predict_with(h, f1, f2)
+    if pred is None:
+        return (f1 + f2) / 2.0, "dummy_model", {"note": "더미"}
+    return pred, _MODEL_NAMES[h.kind], {"note": "모델 예측", "model_version": h.version}
+
+
+def _check_value_anomaly(pred: float) -> Optional[str]:
+    """예측값 이상 탐지: 최근 ANOMALY_WINDOW 건 평균 대비 2σ 이상 벗어나면 경고 메시지 반환 (링 버퍼, O(1))."""
+    w = _prediction_window.snapshot()
+    if w["count"] < 5:
+        return None
+    mean_v, std_v = w["mean"], w["std"]
+    if std_v > 0 and abs(pred - mean_v) > 2 * std_v:
+        return f"예측값 {pred:.1f} mAh/g가 최근 평균({mean_v:.1f}) 대비 크게 벗어납니다."
+    return None
+
+
+def _predict_result(pred: float, input_summary: dict, input_anomaly: Optional[str], value_anomaly: Optional[str]) -> dict:
+    result = {"prediction": pred, "input": input_summary}
+    if input_anomaly:
+        result["input_anomaly"] = input_anomaly
+    if value_anomaly:
+        result["value_anomaly"] = value_anomaly
+    return result
+
+
+def _submit_prediction(pred: float, input_summary: dict, model_name: str, meta: dict) -> Optional[str]:
+    """write-behind 큐에 예측 1건 등록 → uid. 위험이면 저장 후 받은 id 로 웹훅 알림."""
+    def notify(prediction_id: int) -> None:
+        _notify_danger_to_node(prediction_id, pred, input_summary, model_name)
+
+    on_persisted = notify if pred < DANGER_THRESHOLD else None
+    uid = _prediction_writer.submit(model_name, input_summary, pred, meta, on_persisted=on_persisted)
+    if uid is not None:
+        _prediction_window.append(pred)
+    return uid
+
+
 def api_predict(req: PredictRequest):
     """
     예측 수행. models/model.json 또는 model.pkl 이 있으면 해당 모델 사용, 없으면 더미.
     입력/예측값 이상 시 input_anomaly, value_anomaly 필드로 경고 반환.
     """
-    model = get_model()
-    if _model_kind == "json" and model is not None:
-        pred = _predict_json(model, req.feature1, req.feature2)
-        model_name = "capacity_linear"
-    elif _model_kind == "pkl" and model is not None:
-        pred = float(model.predict([[req.feature1, req.feature2]])[0])
-        model_name = "capacity_pkl"
-    else:
-        pred = (req.feature1 + req.feature2) / 2.0
-        model_name = "dummy_model"
+    pred, model_name, meta = _run_model(req.feature1, req.feature2)
     input_summary = {"feature1": req.feature1, "feature2": req.feature2}
 
     # 입력 이상 탐지: 권장 범위 벗어나면 경고
     input_anomaly = _check_input_anomaly(req.feature1, req.feature2)
 
     # 예측값 이상 탐지: 최근 예측 평균 대비 크게 벗어나면 경고
-    value_anomaly = None
+    value_anomaly = _check_value_anomaly(pred)
+
+    if PREDICTION_WRITE_BEHIND:
+        uid = _submit_prediction(pred, input_summary, model_name, meta)
+        return {**_predict_result(pred, input_summary, input_anomaly, value_anomaly), "prediction_uid": uid}
+
+    prediction_id = None
     try:
-        recent = get_predictions(limit=ANOMALY_WINDOW)
-        if len(recent) >= 5:
-            vals = [float(r.get("prediction_value", 0)) for r in recent if r.get("prediction_value") is not None]
-            if vals:
-                mean_v = sum(vals) / len(vals)
-                import math
-                std_v = math.sqrt(sum((x - mean_v) ** 2 for x in vals) / len(vals)) if len(vals) > 1 else 0
-                if std_v > 0 and abs(pred - mean_v) > 2 * std_v:
-                    value_anomaly = f"예측값 {pred:.1f} mAh/g가 최근 평균({mean_v:.1f}) 대비 크게 벗어납니다."
+        prediction_id = insert_prediction(model_name, input_summary, pred, meta)
+        _prediction_window.append(pred)
     except Exception:
         pass
+    # 위험(불량) 감지 시 Node 웹훅으로 알림 → Node가 Slack 전송 + DB 기록
+    if pred < DANGER_THRESHOLD and prediction_id is not None:
+        _notify_danger_to_node(prediction_id, pred, input_summary, model_name)
+
+    return _predict_result(pred, input_summary, input_anomaly, value_anomaly)
+
+
+async def api_predict_async(req: PredictRequest):
+    """예측 수행 (async, DB_ASYNC=true). 동작은 api_predict 와 동일."""
+    pred, model_name, meta = _run_model(req.feature1, req.feature2)
+    input_summary = {"feature1": req.feature1, "feature2": req.feature2}
+    input_anomaly = _check_input_anomaly(req.feature1, req.feature2)
+
+    value_anomaly = _check_value_anomaly(pred)
+
+    if PREDICTION_WRITE_BEHIND:
+        uid = _submit_prediction(pred, input_summary, model_name, meta)
+        return {**_predict_result(pred, input_summary, input_anomaly, value_anomaly), "prediction_uid": uid}
 
     prediction_id = None
     try:
-        prediction_id = insert_prediction(model_name, input_summary, pred, {"note": "모델 예측" if model else "더미"})
+        prediction_id = await db_async.insert_prediction(model_name, input_summary, pred, meta)
+        _prediction_window.append(pred)
     except Exception:
         pass
-    # 위험(불량) 감지 시 Node 웹훅으로 알림 → Node가 Slack 전송 + DB 기록
     if pred < DANGER_THRESHOLD and prediction_id is not None:
         _notify_danger_to_node(prediction_id, pred, input_summary, model_name)
 
-    result = {"prediction": pred, "input": input_summary}
-    if input_anomaly:
-        result["input_anomaly"] = input_anomaly
-    if value_anomaly:
-        result["value_anomaly"] = value_anomaly
-    return result
+    return _predict_result(pred, input_summary, input_anomaly, value_anomaly)
+
+
+app.add_api_route("/api/predict", api_predict_async if DB_ASYNC else api_predict, methods=["POST"])
+
+
+class PredictBatchRequest(BaseModel):
+    feature1: list[float]
+    feature2: list[float]
+    persist: bool = False  # true 면 predictions 테이블에 일괄 저장 (기본: 저장 없이 what-if 계산만)
+
+
+def _run_model_batch(X: np.ndarray) -> tuple[np.ndarray, str, dict]:
+    """_run_model 의 일괄 버전: (n, 2) 행렬을 모델에 한 번만 통과시킴."""
+    h = _model_registry.current()
+    if h.model is None or h.kind not in _MODEL_NAMES:
+        return X.mean(axis=1), "dummy_model", {"note": "더미"}
+    meta = {"note": "모델 예측", "model_version": h.version}
+    if not _prediction_cache.enabled:
+        return _predict_matrix(h, X), _MODEL_NAMES[h.kind], meta
+
+    # 캐시 사용 시: 캐시에 없는 행만 모아 모델 1회 호출 후 캐시에 채움
+    keys = [_prediction_cache.key(h.version, f1, f2) for f1, f2 in X.tolist()]
+    preds = np.empty(len(keys), dtype=float)
+    miss = []
+    for i, k in enumerate(keys):
+        v = _prediction_cache.get(k) if k is not None else None
+        if v is None:
+            miss.append(i)
+        else:
+            preds[i] = v
+    if miss:
+        miss_preds = _predict_matrix(h, X[miss])
+        preds[miss] = miss_preds
+        for i, v in zip(miss, miss_preds.tolist()):
+            if keys[i] is not None:
+                _prediction_cache.put(keys[i], v)
+    return preds, _MODEL_NAMES[h.kind], meta
+
+
+def _predict_matrix(h: LoadedModel, X: np.ndarray) -> np.ndarray:
+    if h.kind == "json":
+        return _predict_json_batch(h.model, X)
+    return np.asarray(h.model.predict(X), dtype=float)
+
+
+@app.post("/api/predict-batch")
+def api_predict_batch(req: PredictBatchRequest):
+    """
+    일괄 예측 (공정 조건 후보 다수를 한 번에 평가).
+    feature1/feature2 배열을 (n, 2) 행렬로 만들어 모델을 1회 호출하고, 행별 위험·입력 이상 여부를 반환합니다.
+    persist=true 이면 predictions 에 executemany 로 일괄 저장 (단건 웹훅 알림은 보내지 않음).
+    """
+    n = len(req.feature1)
+    if n != len(req.feature2):
+        raise HTTPException(status_code=400, detail="feature1 과 feature2 의 길이가 다릅니다.")
+    if n > PREDICT_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {PREDICT_BATCH_MAX}건까지 예측할 수 있습니다.")
+    if n == 0:
+        return {"count": 0, "model_name": None, "predictions": [], "danger": [], "input_anomaly": []}
+
+    X = np.column_stack((np.asarray(req.feature1, dtype=float), np.asarray(req.feature2, dtype=float)))
+    preds, model_name, meta = _run_model_batch(X)
+    danger = preds < DANGER_THRESHOLD
+
+    # 입력 이상: 범위 검사는 벡터화, 메시지는 벗어난 행만 생성
+    out_of_range = (
+        (X[:, 0] < INPUT_TEMP_MIN) | (X[:, 0] > INPUT_TEMP_MAX)
+        | (X[:, 1] < INPUT_TIME_MIN) | (X[:, 1] > INPUT_TIME_MAX)
+    )
+    input_anomaly: list[Optional[str]] = [None] * n
+    for i in np.flatnonzero(out_of_range):
+        input_anomaly[i] = _check_input_anomaly(float(X[i, 0]), float(X[i, 1]))
+
+    result = {
+        "count": n,
+        "model_name": model_name,
+        "predictions": preds.tolist(),
+        "danger": danger.tolist(),
+        "input_anomaly": input_anomaly,
+        "danger_count": int(danger.sum()),
+        "input_anomaly_count": int(out_of_range.sum()),
+    }
+    if req.persist:
+        meta = {**meta, "batch": True}
+        rows = [
+            prediction_params(model_name, {"feature1": f1, "feature2": f2}, p, meta)
+            for f1, f2, p in zip(X[:, 0].tolist(), X[:, 1].tolist(), preds.tolist())
+        ]
+        try:
+            result["persisted"] = insert_predictions(rows)
+            _prediction_window.extend(preds.tolist())
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"예측 결과 저장 실패: {e}")
+    return json_response(result)
+
+
+# ---------- 모델 레지스트리 (버전 조회·활성화·롤백) ----------
+
+class ModelActivateRequest(BaseModel):
+    version: str
+
+
+def _model_info() -> dict:
+    h = _model_registry.current()
+    return {
+        "version": h.version,
+        "kind": h.kind,
+        "registry_current": _model_registry.current_version_name(),
+        "versions": _model_registry.versions(),
+        "history": _model_registry.history(),
+        "last_error": _model_registry.last_error,
+    }
+
+
+@app.get("/api/model")
+def api_model():
+    """현재 모델 버전·종류와 레지스트리 버전 목록"""
+    return _model_info()
+
+
+@app.post("/api/model/activate")
+def api_model_activate(req: ModelActivateRequest):
+    """레지스트리 버전 활성화 (CURRENT 포인터 교체, 다른 워커는 워처가 감지해 교체)"""
+    try:
+        _model_registry.activate(req.version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:  # 잘못된 버전 이름 (경로 조작 등)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"모델 활성화 실패: {e}")
+    return _model_info()
+
+
+@app.post("/api/model/rollback")
+def api_model_rollback():
+    """직전 활성화 버전으로 롤백"""
+    try:
+        _model_registry.rollback()
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _model_info()
+
+
+class ModelRefitRequest(BaseModel):
+    force: bool = False
+
+
+@app.post("/api/model/refit")
+def api_model_refit(req: ModelRefitRequest = ModelRefitRequest()):
+    """온라인 학습 통계로 계수를 다시 풀어 새 버전 게시·활성화 (새 행이 없으면 force 일 때만)"""
+    if not ONLINE_MODEL_ENABLED:
+        raise HTTPException(status_code=400, detail="온라인 학습이 꺼져 있습니다 (ONLINE_MODEL_ENABLED).")
+    try:
+        res = refit_online_model(_model_registry, force=req.force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"모델 재계산 실패: {e}")
+    return {**res, "model": _model_info()}
+
+
+@app.get("/api/model/online-stats")
+def api_model_online_stats():
+    """온라인 학습 통계 요약 (항 구성, 유효 표본 수, 반영·게시 위치)과 주기 게시 작업 상태"""
+    try:
+        state = get_online_model_state()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"enabled": ONLINE_MODEL_ENABLED, "state": state, "refit": _online_model_runner.stats()}
 
 
 # ---------- 중고차 가격 예측 API (Node 연동용) ----------
@@ -446,83 +962,401 @@ def api_anomaly_check():
 
 def _compute_failure_probability(rows: list[dict]) -> tuple[float, dict]:
     """
-    scipy Z-score 기반 통계적 이상 탐지로 고장 확률 0~1 계산.
-    - 센서별로 Z-score 계산, 가장 이상 징후가 큰 센서 기준으로 확률 산출
+    Z-score 기반 통계적 이상 탐지로 고장 확률 0~1 계산 (failure_engine 벡터화 구현).
+    - 센서별로 최신값의 Z-score 계산, 가장 이상 징후가 큰 센서 기준으로 확률 산출
     - |z| >= 3 이면 고위험(확률 1에 근접), z≈0 이면 정상(확률 0에 근접)
     """
-    from collections import defaultdict
-    from scipy import stats
-    import numpy as np
-
-    if not rows:
-        return 0.0, {"message": "데이터 없음", "sensors": []}
-
-    # 센서별 value 시계열 (최신순이므로 시간순으로 쓰려면 reverse)
-    by_sensor: dict[int, list[float]] = defaultdict(list)
-    sensor_info: dict[int, dict] = {}
-    for r in rows:
-        sid = r.get("sensor_id")
-        val = r.get("value")
-        if sid is not None and val is not None:
-            try:
-                by_sensor[sid].append(float(val))
-            except (TypeError, ValueError):
-                pass
-        if sid and sid not in sensor_info:
-            sensor_info[sid] = {
-                "sensor_id": sid,
-                "sensor_name": r.get("sensor_name"),
-                "sensor_type": r.get("sensor_type"),
-                "equipment_id": r.get("equipment_id"),
-            }
-
-    details = []
-    max_abs_z = 0.0
-    for sid, vals in by_sensor.items():
-        if len(vals) < 2:
-            z_last = 0.0
-        else:
-            arr = np.array(vals)
-            zs = stats.zscore(arr, nan_policy="omit")
-            z_last = float(zs[-1]) if not np.isnan(zs[-1]) else 0.0
-        abs_z = abs(z_last)
-        max_abs_z = max(max_abs_z, abs_z)
-        info = sensor_info.get(sid, {})
-        details.append({
-            **info,
-            "value_last": vals[-1] if vals else None,
-            "z_score": round(z_last, 4),
-            "sample_count": len(vals),
-        })
+    return compute_failure_probability(rows, newest_first=True)  # get_telemetry: ORDER BY recorded_at DESC
+
+
+def _failure_probability_response(
+    equipment_id: str | None, sensor_id: int | None, source: str, prob: float, details: dict
+):
+    return json_response({
+        "equipment_id": equipment_id,
+        "sensor_id": sensor_id,
+        "source": source,
+        "failure_probability": prob,
+        "details": details,
+    })
 
-    # |z| -> 확률: min(1, |z|/3) 로 단순 매핑 (3-sigma 초과 시 1)
-    prob = min(1.0, max(0.0, max_abs_z / 3.0))
 
-    return round(prob, 4), {"method": "zscore", "max_abs_z": round(max_abs_z, 4), "sensors": details}
+def _telemetry_window(since: datetime | None, until: datetime | None) -> tuple[datetime | None, datetime | None]:
+    """window 조회 recorded_at 범위. since 미지정 시 TELEMETRY_QUERY_LOOKBACK_DAYS 적용."""
+    if since is None and TELEMETRY_QUERY_LOOKBACK_DAYS > 0:
+        since = (until or datetime.now()) - timedelta(days=TELEMETRY_QUERY_LOOKBACK_DAYS)
+    return since, until
 
 
-@app.get("/api/equipment/failure-probability")
-def api_failure_probability(equipment_id: str | None = None, sensor_id: int | None = None, limit: int = 200):
+def _check_per_sensor_limit(per_sensor_limit: int | None) -> int | None:
+    if per_sensor_limit is not None and not 1 <= per_sensor_limit <= TELEMETRY_PER_SENSOR_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"per_sensor_limit 는 1~{TELEMETRY_PER_SENSOR_MAX} 이어야 합니다."
+        )
+    return per_sensor_limit
+
+
+def _check_failure_source(source: str | None, allow_cache: bool = True) -> str:
+    if not source:
+        # 기본값이 cache 여도 캐시 미지원 엔드포인트(/all)는 auto 로
+        source = FAILURE_PROB_SOURCE if allow_cache or FAILURE_PROB_SOURCE != "cache" else "auto"
+    allowed = ("auto", "stats", "window", "cache") if allow_cache else ("auto", "stats", "window")
+    if source not in allowed:
+        raise HTTPException(status_code=400, detail=f"source 는 {', '.join(allowed)} 중 하나여야 합니다.")
+    return source
+
+
+def _failure_probability_from_cache(
+    equipment_id: str | None,
+    sensor_id: int | None,
+    limit: int,
+    since: datetime | None,
+    until: datetime | None,
+    per_sensor_limit: int | None,
+) -> tuple[float, dict]:
+    """로컬 텔레메트리 캐시로 window 와 같은 구간 계산 (DB 왕복 없음, 캐시 동기화 시점까지의 데이터)"""
+    sensor_ids = _telemetry_cache.sensor_ids(equipment_id, sensor_id)
+    arrays = _telemetry_cache.window(sensor_ids, limit, per_sensor_limit, since, until)
+    prob, details = compute_failure_probability_arrays(*arrays)
+    return prob, {**details, "cache_last_id": _telemetry_cache.meta()["last_id"]}
+
+
+def api_failure_probability(
+    equipment_id: str | None = None,
+    sensor_id: int | None = None,
+    limit: int = 200,
+    source: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    per_sensor_limit: int | None = None,
+):
     """
-    telemetry 테이블 데이터를 조회해 현재 장비의 고장 확률(0~1)을 반환합니다.
-    scipy Z-score 기반 통계적 이상 탐지 사용 (실제 모델 대체용).
+    현재 장비의 고장 확률(0~1)을 반환합니다.
+    Z-score 기반 통계적 이상 탐지 사용 (실제 모델 대체용).
 
     - equipment_id: 설비 ID로 필터 (예: EQ-DUMMY-01)
     - sensor_id: 특정 센서만 조회 시
-    - limit: 조회할 텔레메트리 건수 (기본 200)
+    - limit: 조회할 텔레메트리 건수 (기본 200, source=window 일 때)
+    - source: stats(sensor_stats 누적 통계, O(센서 수)) | window(최근 limit 건 재계산) | auto(stats 없으면 window)
+              | cache(window 와 같은 구간을 로컬 텔레메트리 캐시에서, telemetry_cache.py)
+    - since/until: window 조회 recorded_at 범위 [since, until) (기본: TELEMETRY_QUERY_LOOKBACK_DAYS)
+    - per_sensor_limit: window 를 전체 최근 limit 건 대신 센서마다 최근 N건으로
+      (고빈도 센서가 구간을 다 채워 저빈도 센서 Z-score 가 1~2개 표본으로 계산되는 문제 방지)
     """
+    source = _check_failure_source(source)
+    per_sensor_limit = _check_per_sensor_limit(per_sensor_limit)
+    if source == "cache":
+        prob, details = _failure_probability_from_cache(equipment_id, sensor_id, limit, since, until, per_sensor_limit)
+        return _failure_probability_response(equipment_id, sensor_id, "cache", prob, details)
+    if source != "window":
+        try:
+            stats_rows = get_sensor_stats(equipment_id=equipment_id, sensor_id=sensor_id)
+        except Exception as e:
+            if source == "stats":
+                raise HTTPException(status_code=500, detail=f"센서 통계 조회 실패: {e}")
+            stats_rows = []  # sensor_stats 테이블 없음 등 → 원본 구간으로 계산
+        if stats_rows or source == "stats":
+            prob, details = compute_failure_probability_stats(stats_rows, SENSOR_STATS_MODE)
+            return _failure_probability_response(equipment_id, sensor_id, "stats", prob, details)
+
+    since, until = _telemetry_window(since, until)
     try:
-        rows = get_telemetry(equipment_id=equipment_id, sensor_id=sensor_id, limit=limit)
+        rows = get_telemetry(
+            equipment_id=equipment_id, sensor_id=sensor_id, limit=limit, since=since, until=until,
+            per_sensor_limit=per_sensor_limit,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"텔레메트리 조회 실패: {e}")
 
     prob, details = _compute_failure_probability(rows)
-    return {
-        "equipment_id": equipment_id,
+    return _failure_probability_response(equipment_id, sensor_id, "window", prob, details)
+
+
+async def api_failure_probability_async(
+    equipment_id: str | None = None,
+    sensor_id: int | None = None,
+    limit: int = 200,
+    source: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    per_sensor_limit: int | None = None,
+):
+    """고장 확률 조회 (async, DB_ASYNC=true). 파라미터·응답은 api_failure_probability 와 동일."""
+    source = _check_failure_source(source)
+    per_sensor_limit = _check_per_sensor_limit(per_sensor_limit)
+    if source == "cache":
+        prob, details = await run_in_threadpool(
+            _failure_probability_from_cache, equipment_id, sensor_id, limit, since, until, per_sensor_limit
+        )
+        return _failure_probability_response(equipment_id, sensor_id, "cache", prob, details)
+    if source != "window":
+        try:
+            stats_rows = await db_async.get_sensor_stats(equipment_id=equipment_id, sensor_id=sensor_id)
+        except Exception as e:
+            if source == "stats":
+                raise HTTPException(status_code=500, detail=f"센서 통계 조회 실패: {e}")
+            stats_rows = []
+        if stats_rows or source == "stats":
+            prob, details = compute_failure_probability_stats(stats_rows, SENSOR_STATS_MODE)
+            return _failure_probability_response(equipment_id, sensor_id, "stats", prob, details)
+
+    since, until = _telemetry_window(since, until)
+    try:
+        rows = await db_async.get_telemetry(
+            equipment_id=equipment_id, sensor_id=sensor_id, limit=limit, since=since, until=until,
+            per_sensor_limit=per_sensor_limit,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"텔레메트리 조회 실패: {e}")
+
+    prob, details = _compute_failure_probability(rows)
+    return _failure_probability_response(equipment_id, sensor_id, "window", prob, details)
+
+
+app.add_api_route(
+    "/api/equipment/failure-probability",
+    api_failure_probability_async if DB_ASYNC else api_failure_probability,
+    methods=["GET"],
+)
+
+
+def _fleet_response(
+    fleet: dict, source: str, method: str, min_probability: float, offset: int, page_size: int
+) -> FastJSONResponse:
+    """위험도 순 설비 배열 → min_probability 필터 + offset/page_size 페이지"""
+    keep = np.flatnonzero(fleet["failure_probability"] >= min_probability)
+    page = keep[offset:offset + page_size]
+    items = [
+        {
+            "equipment_id": eq,
+            "failure_probability": prob,
+            "max_abs_z": z_max,
+            "top_sensor_id": top_sid,
+            "top_z_score": top_z,
+            "sensor_count": n_sensors,
+            "sample_count": n_samples,
+        }
+        for eq, prob, z_max, top_sid, top_z, n_sensors, n_samples in zip(
+            fleet["equipment_id"][page].tolist(),
+            fleet["failure_probability"][page].tolist(),
+            fleet["max_abs_z"][page].tolist(),
+            fleet["top_sensor_id"][page].tolist(),
+            fleet["top_z_score"][page].tolist(),
+            fleet["sensor_count"][page].tolist(),
+            fleet["sample_count"][page].tolist(),
+        )
+    ]
+    return json_response({
+        "source": source,
+        "method": method,
+        "total": int(keep.size),
+        "equipment_count": int(fleet["equipment_id"].size),
+        "offset": offset,
+        "page_size": page_size,
+        "items": items,
+    })
+
+
+def _fleet_params(min_probability: float, offset: int, page_size: int) -> tuple[int, int]:
+    if not 0.0 <= min_probability <= 1.0:
+        raise HTTPException(status_code=400, detail="min_probability 는 0~1 이어야 합니다.")
+    return max(0, offset), _page_limit(page_size)
+
+
+def api_failure_probability_all(
+    limit: int = 200,
+    source: str | None = None,
+    min_probability: float = 0.0,
+    offset: int = 0,
+    page_size: int = 100,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    per_sensor_limit: int | None = None,
+):
+    """
+    전체 설비 고장 확률을 한 번에 계산해 위험도 높은 순으로 반환 (설비별 /api/equipment/failure-probability 반복 호출 대체).
+
+    - source: stats(sensor_stats 전체 1회 조회) | window(설비별 최근 limit 건을 ROW_NUMBER 로 1회 조회) | auto
+    - limit, since/until, per_sensor_limit: window 계산 구간 (단일 설비 API 와 동일한 의미)
+    - min_probability: 이 값 이상인 설비만 / offset, page_size: 페이지 (page_size 최대 API_MAX_PAGE_SIZE)
+    - 텔레메트리(또는 sensor_stats)가 없는 설비는 결과에 포함되지 않음
+    """
+    source = _check_failure_source(source, allow_cache=False)
+    offset, page_size = _fleet_params(min_probability, offset, page_size)
+    per_sensor_limit = _check_per_sensor_limit(per_sensor_limit)
+    if source != "window":
+        try:
+            stats_rows = get_sensor_stats()
+        except Exception as e:
+            if source == "stats":
+                raise HTTPException(status_code=500, detail=f"센서 통계 조회 실패: {e}")
+            stats_rows = []
+        if stats_rows or source == "stats":
+            fleet = fleet_failure_probability_stats(stats_rows, SENSOR_STATS_MODE)
+            return _fleet_response(fleet, "stats", f"zscore-{SENSOR_STATS_MODE}", min_probability, offset, page_size)
+
+    since, until = _telemetry_window(since, until)
+    try:
+        rows = get_fleet_telemetry(limit=limit, since=since, until=until, per_sensor_limit=per_sensor_limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"텔레메트리 조회 실패: {e}")
+    fleet = fleet_failure_probability_window(rows)
+    return _fleet_response(fleet, "window", "zscore", min_probability, offset, page_size)
+
+
+async def api_failure_probability_all_async(
+    limit: int = 200,
+    source: str | None = None,
+    min_probability: float = 0.0,
+    offset: int = 0,
+    page_size: int = 100,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    per_sensor_limit: int | None = None,
+):
+    """전체 설비 고장 확률 (async, DB_ASYNC=true). 파라미터·응답은 api_failure_probability_all 과 동일."""
+    source = _check_failure_source(source, allow_cache=False)
+    offset, page_size = _fleet_params(min_probability, offset, page_size)
+    per_sensor_limit = _check_per_sensor_limit(per_sensor_limit)
+    if source != "window":
+        try:
+            stats_rows = await db_async.get_sensor_stats()
+        except Exception as e:
+            if source == "stats":
+                raise HTTPException(status_code=500, detail=f"센서 통계 조회 실패: {e}")
+            stats_rows = []
+        if stats_rows or source == "stats":
+            fleet = await run_in_threadpool(fleet_failure_probability_stats, stats_rows, SENSOR_STATS_MODE)
+            return _fleet_response(fleet, "stats", f"zscore-{SENSOR_STATS_MODE}", min_probability, offset, page_size)
+
+    since, until = _telemetry_window(since, until)
+    try:
+        rows = await db_async.get_fleet_telemetry(limit=limit, since=since, until=until, per_sensor_limit=per_sensor_limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"텔레메트리 조회 실패: {e}")
+    fleet = await run_in_threadpool(fleet_failure_probability_window, rows)
+    return _fleet_response(fleet, "window", "zscore", min_probability, offset, page_size)
+
+
+app.add_api_route(
+    "/api/equipment/failure-probability/all",
+    api_failure_probability_all_async if DB_ASYNC else api_failure_probability_all,
+    methods=["GET"],
+)
+
+
+# ---------- 텔레메트리 대량 적재 ----------
+
+def _ingest_telemetry_body(raw: bytes, content_type: str, all_or_nothing: bool) -> dict:
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            cols = columns_from_ndjson(raw)
+        else:
+            cols = columns_from_json(loads(raw))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"JSON 파싱 실패: {e}")
+    n = len(cols["sensor_id"])
+    if n > TELEMETRY_BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {TELEMETRY_BULK_MAX_ROWS}건까지 적재할 수 있습니다.")
+    try:
+        return ingest(cols, all_or_nothing=all_or_nothing)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"텔레메트리 적재 실패: {e}")
+
+
+@app.post("/api/telemetry/bulk")
+async def api_telemetry_bulk(request: Request, all_or_nothing: bool = False):
+    """
+    텔레메트리 대량 적재 (sensor_id, recorded_at, value, label, meta).
+    - Content-Type: application/json → 컬럼형 {"sensor_id": [...], "recorded_at": [...], "value": [...]} 또는 행 객체 배열
+    - Content-Type: application/x-ndjson → 한 줄에 행 객체 1개
+    - recorded_at: ISO 8601 문자열(DB 와 같은 로컬 시각) 또는 epoch 초. label 기본 normal
+    - 센서 마스터에 없는 sensor_id·잘못된 값은 거부하고 나머지만 저장 (all_or_nothing=true 면 하나라도 거부 시 저장 안 함)
+    응답: received, accepted, rejected, rejected_by_reason, rejected_rows(최대 100건), failed, chunks, rows_per_sec
+    """
+    raw = await request.body()
+    # 파싱·검증·저장은 CPU/DB 작업이라 이벤트 루프 밖(스레드풀)에서 실행
+    result = await run_in_threadpool(
+        _ingest_telemetry_body, raw, request.headers.get("content-type", ""), all_or_nothing
+    )
+    return json_response(result)
+
+
+# ---------- 텔레메트리 장기 시계열 (구간 집계) ----------
+
+def _series_params(
+    start: datetime | None, end: datetime | None, max_points: int | None, resolution: str
+) -> tuple[datetime, datetime, int, str]:
+    end = end or datetime.now()
+    start = start or end - timedelta(days=SERIES_DEFAULT_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start 는 end 보다 이전이어야 합니다.")
+    max_points = min(max(1, max_points or SERIES_DEFAULT_POINTS), SERIES_MAX_POINTS)
+    if resolution == "auto":
+        resolution = choose_resolution(start, end, max_points)
+    elif resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution 은 auto, {', '.join(RESOLUTIONS)} 중 하나여야 합니다.")
+    return start, end, max_points, resolution
+
+
+def _series_response(sensor_id: int, start: datetime, end: datetime, max_points: int, resolution: str, rows: list):
+    return json_response({
         "sensor_id": sensor_id,
-        "failure_probability": prob,
-        "details": details,
-    }
+        "start": start,
+        "end": end,
+        "resolution": resolution,
+        "bucket_seconds": RESOLUTIONS[resolution],
+        "max_points": max_points,
+        "points": len(rows),
+        "series": series_columns(rows),
+    })
+
+
+def api_telemetry_series(
+    sensor_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int | None = None,
+    resolution: str = "auto",
+):
+    """
+    센서 장기 시계열 (telemetry_rollups 구간 집계, 원본 telemetry 조회 없음).
+    - start/end: 조회 기간 (기본: 최근 SERIES_DEFAULT_DAYS 일)
+    - max_points: 포인트 예산 (기본 SERIES_DEFAULT_POINTS)
+    - resolution: auto(예산 안에 드는 가장 세밀한 단위) | 1m | 1h | 1d
+    응답 series: 컬럼형 bucket_start, count, min, max, mean, std, anomaly_count
+    """
+    start, end, max_points, resolution = _series_params(start, end, max_points, resolution)
+    try:
+        rows = get_telemetry_rollups(sensor_id, resolution, start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"집계 조회 실패: {e}")
+    return _series_response(sensor_id, start, end, max_points, resolution, rows)
+
+
+async def api_telemetry_series_async(
+    sensor_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int | None = None,
+    resolution: str = "auto",
+):
+    """장기 시계열 조회 (async, DB_ASYNC=true). 파라미터·응답은 api_telemetry_series 와 동일."""
+    start, end, max_points, resolution = _series_params(start, end, max_points, resolution)
+    try:
+        rows = await db_async.get_telemetry_rollups(sensor_id, resolution, start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"집계 조회 실패: {e}")
+    return _series_response(sensor_id, start, end, max_points, resolution, rows)
+
+
+app.add_api_route(
+    "/api/telemetry/series",
+    api_telemetry_series_async if DB_ASYNC else api_telemetry_series,
+    methods=["GET"],
+)
 
 
 # ---------- 성능 하락 알림 (모델 재학습 필요) ----------
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+버전 관리 모델 레지스트리 (재시작 없는 모델 교체).
+
+디렉터리 구조 (models/registry):
+  <version>/model.json 또는 <version>/model.pkl   버전별 모델 파일
+  CURRENT                                         현재 버전 이름 (임시 파일 + os.replace 로 원자적 교체)
+  HISTORY                                         활성화 이력 (한 줄에 한 버전, 롤백용)
+
+레지스트리에 버전이 없으면 기존 models/model.json → model.pkl 순으로 사용 (버전명 legacy-json-<mtime> / legacy-pkl-<mtime>).
+워처 스레드가 CURRENT 와 기존 모델 파일의 mtime 을 주기적으로 확인해, 바뀌면 새 모델을 먼저 로드한 뒤 참조만 교체합니다.
+(처리 중인 요청은 교체 전 모델 객체를 그대로 사용하므로 중단되지 않음)
+
+CLI:
+  python model_registry.py list
+  python model_registry.py publish models/model.json [--version v2] [--no-activate]
+  python model_registry.py activate v2
+  python model_registry.py rollback
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+MODEL_FILES = ("model.json", "model.pkl")
+_VERSION_RE = re.compile(r"^[A-Za-z0-9_.-]+$")  # 버전 이름 = registry 바로 아래 디렉터리 이름
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """로드된 모델 1개 (교체 시 객체째로 바뀜)."""
+    model: Any
+    kind: str  # "json" | "pkl" | "none"
+    version: Optional[str]
+
+
+NO_MODEL = LoadedModel(None, "none", None)
+
+
+def load_model_file(path: Path) -> LoadedModel:
+    """model.json / model.pkl 파일 1개 로드 (버전명은 호출 측에서 지정)."""
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return LoadedModel(json.load(f), "json", None)
+    import joblib
+    return LoadedModel(joblib.load(path), "pkl", None)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    def __init__(self, models_dir: Path = MODELS_DIR):
+        self.models_dir = Path(models_dir)
+        self.registry_dir = self.models_dir / "registry"
+        self._current: Optional[LoadedModel] = None
+        self._signature: Optional[tuple] = None
+        self._swap_lock = threading.Lock()
+        self._listeners: list[Callable[[LoadedModel], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_error: Optional[str] = None
+
+    # ---------- 조회 ----------
+
+    def current(self) -> LoadedModel:
+        """현재 모델 (첫 호출 시 로드). 락 없이 참조만 읽으므로 예측 경로에 부담 없음."""
+        cur = self._current
+        if cur is None:
+            self.reload()
+            cur = self._current
+        return cur
+
+    def versions(self) -> list[str]:
+        if not self.registry_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.registry_dir.iterdir()
+            if p.is_dir() and _VERSION_RE.match(p.name) and not p.name.startswith(".") and self._model_file(p.name)
+        )
+
+    def current_version_name(self) -> Optional[str]:
+        pointer = self.registry_dir / "CURRENT"
+        if pointer.exists():
+            name = pointer.read_text(encoding="utf-8").strip()
+            return name or None
+        return None
+
+    def history(self) -> list[str]:
+        path = self.registry_dir / "HISTORY"
+        if not path.exists():
+            return []
+        return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def add_listener(self, fn: Callable[[LoadedModel], None]) -> None:
+        """모델 교체 시 호출할 콜백 등록 (예: 예측 캐시 비우기)."""
+        self._listeners.append(fn)
+
+    # ---------- 로드·교체 ----------
+
+    def _version_dir(self, version: str) -> Path:
+        """
+        버전 디렉터리 (registry 바로 아래). 영문·숫자·_.- 이외 문자, "."/"..", 바깥을 가리키는 이름은 ValueError
+        (요청으로 받은 버전 이름으로 임의 경로의 model.pkl 을 로드하지 않도록 — pickle 은 코드 실행).
+        """
+        if not _VERSION_RE.match(version) or version in (".", ".."):
+            raise ValueError(f"잘못된 버전 이름입니다: {version!r}")
+        path = self.registry_dir / version
+        if path.resolve().parent != self.registry_dir.resolve():
+            raise ValueError(f"잘못된 버전 이름입니다: {version!r}")
+        return path
+
+    def _model_file(self, version: str) -> Optional[Path]:
+        version_dir = self._version_dir(version)
+        for name in MODEL_FILES:
+            p = version_dir / name
+            if p.exists():
+                return p
+        return None
+
+    def _compute_signature(self) -> tuple:
+        """변경 감지용: CURRENT 내용/mtime + 기존 모델 파일 mtime."""
+        sig = []
+        pointer = self.registry_dir / "CURRENT"
+        for p in (pointer, *(self.models_dir / n for n in MODEL_FILES)):
+            try:
+                sig.append(p.stat().st_mtime_ns)
+            except OSError:
+                sig.append(None)
+        sig.append(self.current_version_name())
+        return tuple(sig)
+
+    def _resolve(self) -> LoadedModel:
+        """CURRENT 가 가리키는 버전, 없으면 기존 models/model.json·model.pkl 로드."""
+        version = self.current_version_name()
+        if version:
+            path = self._model_file(version)
+            if path is None:
+                raise FileNotFoundError(f"레지스트리에 버전 {version} 모델 파일이 없습니다.")
+            loaded = load_model_file(path)
+            return LoadedModel(loaded.model, loaded.kind, version)
+        for name in MODEL_FILES:
+            path = self.models_dir / name
+            if path.exists():
+                # 로드 실패(쓰는 중인 파일 등)는 그대로 올려 reload() 가 기존 모델을 유지하게 함
+                st = path.stat()
+                loaded = load_model_file(path)
+                # 같은 초에 다시 써도 버전이 바뀌도록 ns 단위 mtime + 크기
+                stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(st.st_mtime_ns // 10**9))
+                version = f"legacy-{loaded.kind}-{stamp}.{st.st_mtime_ns % 10**9:09d}-{st.st_size}"
+                return LoadedModel(loaded.model, loaded.kind, version)
+        return NO_MODEL
+
+    def reload(self) -> LoadedModel:
+        """모델을 새로 로드한 뒤 원자적으로 교체. 로드 실패 시 기존 모델 유지."""
+        with self._swap_lock:
+            signature = self._compute_signature()
+            try:
+                new = self._resolve()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                if self._current is None:
+                    self._current = NO_MODEL
+                return self._current
+            old = self._current
+            self._current = new
+            self._signature = signature
+        if old is not None and old.version != new.version:
+            for fn in self._listeners:
+                try:
+                    fn(new)
+                except Exception:
+                    pass
+        return new
+
+    def check_for_update(self) -> bool:
+        """CURRENT·모델 파일이 바뀌었으면 다시 로드. 교체했으면 True."""
+        if self._compute_signature() == self._signature:
+            return False
+        before = self._current
+        return self.reload() is not before
+
+    def start_watcher(self, interval: float) -> None:
+        """백그라운드에서 interval 초마다 변경 확인 (mtime 폴링)."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_for_update()
+                except Exception:
+                    pass
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=loop, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    # ---------- 게시·활성화·롤백 ----------
+
+    def publish(self, src: Path, version: Optional[str] = None, activate: bool = True) -> str:
+        """모델 파일을 새 버전으로 레지스트리에 복사. activate 면 바로 CURRENT 로 지정."""
+        src = Path(src)
+        if src.name not in MODEL_FILES:
+            raise ValueError(f"모델 파일 이름은 {', '.join(MODEL_FILES)} 중 하나여야 합니다: {src.name}")
+        version = version or time.strftime("v%Y%m%d-%H%M%S")
+        target_dir = self._version_dir(version)
+        if target_dir.exists():
+            raise FileExistsError(f"이미 존재하는 버전입니다: {version}")
+        # 임시 디렉터리에 복사 후 이름 변경 → 워처가 반쯤 복사된 파일을 읽지 않도록
+        tmp_dir = self.registry_dir / f".{version}.tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, tmp_dir / src.name)
+        os.replace(tmp_dir, target_dir)
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> LoadedModel:
+        """버전을 CURRENT 로 지정 (로드 검증 후 포인터 교체) 하고 이 프로세스의 모델도 교체."""
+        path = self._model_file(version)
+        if path is None:
+            raise FileNotFoundError(f"레지스트리에 버전 {version} 이 없습니다.")
+        load_model_file(path)  # 깨진 모델이면 여기서 실패 → 포인터는 그대로
+        self.registry_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.registry_dir / "CURRENT", version + "\n")
+        history = self.history()
+        if not history or history[-1] != version:
+            _write_atomic(self.registry_dir / "HISTORY", "\n".join(history + [version]) + "\n")
+        return self.reload()
+
+    def rollback(self) -> LoadedModel:
+        """직전에 활성화했던 버전으로 되돌림."""
+        history = self.history()
+        if len(history) < 2:
+            raise ValueError("되돌릴 이전 버전이 없습니다.")
+        history.pop()
+        previous = history[-1]
+        if self._model_file(previous) is None:
+            raise FileNotFoundError(f"이전 버전 {previous} 모델 파일이 없습니다.")
+        _write_atomic(self.registry_dir / "HISTORY", "\n".join(history) + "\n")
+        _write_atomic(self.registry_dir / "CURRENT", previous + "\n")
+        return self.reload()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 레지스트리 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="버전 목록")
+    p_pub = sub.add_parser("publish", help="모델 파일을 새 버전으로 등록")
+    p_pub.add_argument("path")
+    p_pub.add_argument("--version")
+    p_pub.add_argument("--no-activate", action="store_true")
+    p_act = sub.add_parser("activate", help="버전 활성화")
+    p_act.add_argument("version")
+    sub.add_parser("rollback", help="직전 버전으로 되돌림")
+    args = parser.parse_args()
+
+    reg = ModelRegistry()
+    if args.cmd == "list":
+        current = reg.current_version_name()
+        for v in reg.versions():
+            print(f"{'*' if v == current else ' '} {v}")
+        if current is None:
+            print(f"(레지스트리 미사용: {reg.current().version or '모델 없음'})")
+    elif args.cmd == "publish":
+        version = reg.publish(Path(args.path), version=args.version, activate=not args.no_activate)
+        print(f"등록: {version}{' (활성화)' if not args.no_activate else ''}")
+    elif args.cmd == "activate":
+        print(f"활성화: {reg.activate(args.version).version}")
+    elif args.cmd == "rollback":
+        print(f"롤백: {reg.rollback().version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# 훈련 데이터 온라인 학습 (정규방정식 충분 통계량 증분 갱신)
+# train_model.py 전체 재학습 없이 POST /api/training-data 로 들어오는 행을 바로 반영해 공정 변화(드리프트)를 따라갑니다.
+# - model_online_stats 테이블에 n, XᵀX, Xᵀy, yᵀy, Σy 와 항 구성·정규화 값을 저장 (행당 갱신 O(d²), d = 항 수 + 1)
+# - insert_training_data() / insert_training_rows(): 훈련 데이터 저장과 통계 반영을 한 트랜잭션으로 (통계 행 잠금 후 저장).
+#   다른 경로의 training_data 저장(db.insert_training_data·insert_training_rows, db_async)도 모두 db.lock_online_stats 로
+#   같은 행을 먼저 잠그므로 저장이 잠금 순서대로 커밋됨 → last_training_id 를 올린 뒤 그 아래 id 가 늦게 커밋되는 일이 없음
+#   catch_up(): 통계 반영 없이 저장된 행(온라인 학습을 끈 API 저장, upload 스크립트 등)을 last_training_id 이후부터 반영.
+#   잠금을 거치지 않는 외부 저장(직접 SQL)에 대비해 WATERMARK_LAG_SEC 이상 지난 행까지만 (watermark_jobs 와 같은 안전 지연)
+# - ONLINE_MODEL_FORGET < 1 이면 행마다 기존 통계에 곱해 오래된 데이터 비중을 줄임 (유효 표본 수 ≈ 1 / (1 - forget))
+# - refit(): 계수를 풀어 모델 레지스트리에 online-... 버전으로 게시·활성화 (주기 실행 또는 POST /api/model/refit)
+# 특징은 training_data 의 feature1, feature2 (API 입력과 같음). 정규화 값은 처음 반영한 묶음 기준으로 고정
+# 테이블: docs/10_online_model.sql
+#
+# 실행: python online_model.py catchup
+#       python online_model.py refit [--force]
+#       python online_model.py rebuild   (통계 초기화 후 training_data 전체 재반영 — 차수·망각 계수 변경 시)
+#       python online_model.py show
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pymysql
+
+import db
+from db import SQL_INSERT_TRAINING, get_db, training_data_query
+from linear_model import NormalEquations, design_matrix, make_model, polynomial_terms, term_index, term_name
+from watermark_jobs import settled_cutoff, settled_prefix
+
+ONLINE_MODEL_NAME = "capacity_online"
+FEATURES = ["feature1", "feature2"]
+ONLINE_MODEL_DEGREE = int(os.getenv("ONLINE_MODEL_DEGREE", "2"))  # 특징별 최고 차수 (rebuild 시 적용)
+ONLINE_MODEL_INTERACTIONS = os.getenv("ONLINE_MODEL_INTERACTIONS", "false").lower() in ("true", "1", "yes")
+ONLINE_MODEL_FORGET = float(os.getenv("ONLINE_MODEL_FORGET", "1.0"))  # 망각 계수 (1 이면 전체 누적)
+ONLINE_MODEL_RIDGE = float(os.getenv("ONLINE_MODEL_RIDGE", "0"))  # 풀이 시 L2 정규화 (정규화된 특징 기준)
+ONLINE_MODEL_MIN_ROWS = int(os.getenv("ONLINE_MODEL_MIN_ROWS", "20"))  # 이보다 적으면 refit 게시 안 함
+ONLINE_MODEL_BATCH = int(os.getenv("ONLINE_MODEL_BATCH", "10000"))  # catch-up 1회 조회 행 수
+
+_SQL_ENSURE = "INSERT IGNORE INTO model_online_stats (model_name) VALUES (%s)"
+_SQL_SELECT = """SELECT spec, stats, last_training_id, published_training_id, published_version, updated_at
+                 FROM model_online_stats WHERE model_name = %s"""
+_SQL_UPDATE_STATS = """UPDATE model_online_stats SET spec = %s, stats = %s, last_training_id = %s
+                       WHERE model_name = %s"""
+_SQL_UPDATE_PUBLISHED = """UPDATE model_online_stats SET published_training_id = %s, published_version = %s
+                           WHERE model_name = %s"""
+
+
+def _lock_state(cur) -> dict:
+    """
+    통계 행 잠금 (없으면 빈 행 생성) 후 반환. spec/stats 는 아직 반영한 행이 없으면 None.
+    있는 행은 바로 FOR UPDATE (INSERT IGNORE 를 먼저 하면 중복 행 공유 잠금끼리 교착될 수 있음).
+    """
+    cur.execute(_SQL_SELECT + " FOR UPDATE", (ONLINE_MODEL_NAME,))
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(_SQL_ENSURE, (ONLINE_MODEL_NAME,))
+        cur.execute(_SQL_SELECT + " FOR UPDATE", (ONLINE_MODEL_NAME,))
+        row = cur.fetchone()
+    for key in ("spec", "stats"):
+        if isinstance(row[key], (str, bytes)):
+            row[key] = json.loads(row[key])
+    return row
+
+
+def _new_spec(X: np.ndarray) -> dict:
+    """처음 반영하는 묶음으로 항 구성·정규화 값 결정 (1건이면 scale 1)."""
+    scale = X.std(axis=0) if X.shape[0] > 1 else np.ones(X.shape[1])
+    scale[scale == 0] = 1.0
+    return {
+        "features": FEATURES,
+        "terms": polynomial_terms(FEATURES, ONLINE_MODEL_DEGREE, ONLINE_MODEL_INTERACTIONS),
+        "shift": X.mean(axis=0).tolist(),
+        "scale": scale.tolist(),
+        "forget": ONLINE_MODEL_FORGET,
+    }
+
+
+def apply_rows(cur, rows: list[dict], state: Optional[dict] = None) -> int:
+    """
+    training_data 행(id 오름차순)을 통계에 반영 (호출자의 트랜잭션 안에서, cur: get_db() 커서).
+    last_training_id 이하 행은 이미 반영된 것으로 보고 건너뜀. 반영한 행 수 반환.
+    """
+    state = state or _lock_state(cur)
+    rows = [r for r in rows if r["id"] > state["last_training_id"]]
+    if not rows:
+        return 0
+    data = np.array([(r["feature1"], r["feature2"], r["target"]) for r in rows], dtype=np.float64)
+    ok = np.isfinite(data).all(axis=1)
+    X, y = data[ok, :2], data[ok, 2]
+    spec = state["spec"]
+    if X.shape[0]:
+        if spec is None:
+            spec = _new_spec(X)
+        ne = NormalEquations.from_dict(state["stats"]) if state["stats"] else NormalEquations(len(spec["terms"]))
+        Z = (X - np.asarray(spec["shift"])) / np.asarray(spec["scale"])
+        ne.update(design_matrix(Z, term_index(spec)), y, spec["forget"])
+        state["stats"] = ne.to_dict()
+    state["spec"] = spec
+    state["last_training_id"] = rows[-1]["id"]
+    cur.execute(
+        _SQL_UPDATE_STATS,
+        (
+            json.dumps(spec, ensure_ascii=False) if spec else None,
+            json.dumps(state["stats"]) if state["stats"] else None,
+            state["last_training_id"],
+            ONLINE_MODEL_NAME,
+        ),
+    )
+    return int(X.shape[0])
+
+
+def insert_training_data(feature1: float, feature2: float, target: float) -> int:
+    """
+    훈련 데이터 1건 저장 + 통계 반영 (한 트랜잭션). 통계 행을 먼저 잠가 동시 저장도 id 순서대로 반영되게 함.
+    저장 전 다른 경로로 들어온 행이 있으면 함께 반영.
+    """
+    with get_db() as cur:
+        state = _lock_state(cur)
+        cur.execute(SQL_INSERT_TRAINING, (feature1, feature2, target))
+        rid = cur.lastrowid
+        cur.execute(*training_data_query(None, rid + 1, state["last_training_id"]))
+        apply_rows(cur, sorted(cur.fetchall(), key=lambda r: r["id"]), state)
+        return rid
+
+
+def insert_training_rows(rows: list[tuple]) -> int:
+    """
+    훈련 데이터 여러 건 저장 + 통계 반영 (한 트랜잭션, rows: (feature1, feature2, target) 튜플 리스트). 저장 건수 반환.
+    insert_training_data 와 같이 통계 행을 먼저 잠가, 동시에 저장하는 청크가 반영 위치 아래로 늦게 커밋되지 않게 함
+    (동시 저장은 잠금 순서대로 직렬화됨). 통계 테이블이 없으면 (docs/10 미적용) 저장만.
+    """
+    if not rows:
+        return 0
+    try:
+        with get_db() as cur:
+            state = _lock_state(cur)
+            cur.executemany(SQL_INSERT_TRAINING, rows)
+            n = cur.rowcount
+            cur.execute(*training_data_query(None, None, state["last_training_id"]))
+            apply_rows(cur, cur.fetchall(), state)
+            return n
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] != 1146:  # 1146: 테이블 없음 (model_online_stats 미생성)
+            raise
+    return db.insert_training_rows(rows)
+
+
+def catch_up(batch: int = ONLINE_MODEL_BATCH, max_batches: Optional[int] = None) -> dict:
+    """
+    last_training_id 이후 training_data 를 batch 건씩 반영 (삽입된 지 WATERMARK_LAG_SEC 이 지난 행까지만).
+    반환: {"rows", "applied", "watermark"}
+    """
+    total = applied = batches = 0
+    watermark = 0
+    while max_batches is None or batches < max_batches:
+        with get_db() as cur:
+            state = _lock_state(cur)
+            watermark = state["last_training_id"]
+            cutoff = settled_cutoff(cur)  # 조회 전에 정함 (조회 시점에 이미 lag 이상 지난 행만)
+            cur.execute(*training_data_query(batch, None, watermark))
+            fetched = cur.fetchall()
+            rows = settled_prefix(fetched, cutoff)
+            if not rows:
+                break
+            applied += apply_rows(cur, rows, state)
+            watermark = state["last_training_id"]
+        total += len(rows)
+        batches += 1
+        if len(fetched) < batch or len(rows) < len(fetched):
+            break
+    return {"rows": total, "applied": applied, "watermark": watermark}
+
+
+def refit(registry=None, force: bool = False, ridge: float = ONLINE_MODEL_RIDGE) -> dict:
+    """
+    catch-up 후 계수를 풀어 레지스트리에 새 버전으로 게시·활성화 (CatchUpRunner 작업 형태 dict 반환).
+    마지막 게시 이후 반영된 행이 없거나 유효 표본이 ONLINE_MODEL_MIN_ROWS 미만이면 건너뜀 (force 는 전자만 무시).
+    """
+    from model_registry import ModelRegistry
+
+    res = catch_up()
+    res["version"] = None
+    with get_db() as cur:
+        state = _lock_state(cur)
+        stats = state["stats"]
+        if not stats or stats["n"] < ONLINE_MODEL_MIN_ROWS:
+            return res
+        if not force and state["published_training_id"] == state["last_training_id"]:
+            return res
+        spec = state["spec"]
+        w, metrics = NormalEquations.from_dict(stats).solve(ridge)
+        model = make_model(spec["features"], spec["terms"], spec["shift"], spec["scale"], w, spec["shift"], metrics)
+        model.update({"target": "target", "source": "online", "training_id": state["last_training_id"]})
+        now = time.time()  # 같은 초에 force 로 다시 게시해도 버전이 겹치지 않도록 밀리초까지
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        version = f"online-{stamp}-{state['last_training_id']}"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.json"
+            path.write_text(json.dumps(model, ensure_ascii=False, indent=2), encoding="utf-8")
+            (registry or ModelRegistry()).publish(path, version=version)
+        cur.execute(_SQL_UPDATE_PUBLISHED, (state["last_training_id"], version, ONLINE_MODEL_NAME))
+    res["version"] = version
+    return res
+
+
+def rebuild() -> dict:
+    """통계 초기화 후 training_data 전체 재반영 (현재 환경 변수의 차수·망각 계수로 새로 시작)."""
+    with get_db() as cur:
+        cur.execute("DELETE FROM model_online_stats WHERE model_name = %s", (ONLINE_MODEL_NAME,))
+    return catch_up()
+
+
+def get_state() -> Optional[dict]:
+    """현재 통계 요약 (항 구성, 유효 표본 수, 반영·게시 위치). 테이블·행이 없으면 None."""
+    with get_db() as cur:
+        cur.execute(_SQL_SELECT, (ONLINE_MODEL_NAME,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    spec = json.loads(row["spec"]) if isinstance(row["spec"], (str, bytes)) else row["spec"]
+    stats = json.loads(row["stats"]) if isinstance(row["stats"], (str, bytes)) else row["stats"]
+    return {
+        "terms": [term_name(t) for t in spec["terms"]] if spec else None,
+        "forget": spec["forget"] if spec else None,
+        "n": stats["n"] if stats else 0,
+        "last_training_id": row["last_training_id"],
+        "published_training_id": row["published_training_id"],
+        "published_version": row["published_version"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="훈련 데이터 온라인 학습 통계 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("catchup", help="last_training_id 이후 훈련 데이터 반영")
+    p_refit = sub.add_parser("refit", help="계수 풀이 후 레지스트리에 게시·활성화")
+    p_refit.add_argument("--force", action="store_true", help="새로 반영된 행이 없어도 게시")
+    sub.add_parser("rebuild", help="통계 초기화 후 전체 재반영")
+    sub.add_parser("show", help="현재 통계 요약")
+    args = parser.parse_args()
+
+    if args.cmd == "catchup":
+        print(catch_up())
+    elif args.cmd == "refit":
+        res = refit(force=args.force)
+        print(f"게시: {res['version']}" if res["version"] else f"게시 안 함 (반영 {res['rows']}건)")
+    elif args.cmd == "rebuild":
+        print(rebuild())
+    elif args.cmd == "show":
+        print(get_state())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 모델 성능 검사용 최근 훈련 데이터 오차 추적 (/api/performance/check)
+# 대시보드가 주기적으로 호출해도 같은 행을 매번 다시 조회·예측하지 않도록
+# 최근 size 건의 (id, feature1, feature2, target, 오차) 를 NumPy 링 버퍼에 유지하고 오차 합·절대값 합·제곱합을 누적 갱신합니다.
+# - 처음: DB 최근 size 건을 읽어 모델 1회 호출(벡터화)로 오차 계산
+# - 이후: 마지막 id 이후 새 행만 읽어 예측 → 밀려나는 행의 오차는 합계에서 빼고 새 행을 더함
+#   (새 행이 size 건 이상이면 최근 size 건으로 다시 적재)
+# - feature1/feature2/target 이 NULL·비유한값인 행은 버퍼에 넣지 않음 (NaN 이 누적 합을 오염시키지 않도록, online_model.apply_rows 와 같음)
+# - 모델이 교체되면 버퍼 전체를 새 모델로 1회 재예측
+# - 결과는 (마지막 훈련 데이터 id, 모델) 기준으로 캐시 → 둘 다 그대로면 예측 없이 그대로 반환
+
+import math
+import threading
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+class PerformanceTracker:
+    def __init__(self, size: int):
+        self._size = max(1, size)
+        self._ids = np.zeros(self._size, dtype=np.int64)
+        self._X = np.zeros((self._size, 2))
+        self._y = np.zeros(self._size)
+        self._err = np.zeros(self._size)  # 예측 - 실제
+        self._lock = threading.Lock()
+        self._model: Any = None  # 오차를 계산한 모델 (교체 감지는 객체 동일성으로)
+        self._loaded = False
+        self._reset()
+        self._key: Optional[tuple] = None
+        self._result: Optional[dict] = None
+
+    def _reset(self) -> None:
+        self._head = 0  # 다음에 쓸 위치
+        self._count = 0
+        self._last_id = 0
+        self._sum = 0.0
+        self._abs = 0.0
+        self._sq = 0.0
+
+    @staticmethod
+    def _columns(rows: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """행 → (id, X, y). NULL(→ NaN)·inf 가 있는 행은 제외."""
+        ids = np.fromiter((r["id"] for r in rows), dtype=np.int64, count=len(rows))
+        data = np.array([(r["feature1"], r["feature2"], r["target"]) for r in rows], dtype=np.float64).reshape(-1, 3)
+        ok = np.isfinite(data).all(axis=1)
+        if not ok.all():
+            ids, data = ids[ok], data[ok]
+        return ids, data[:, :2], data[:, 2]
+
+    def _load(self, rows: list[dict], predict: Callable[[np.ndarray], np.ndarray]) -> None:
+        """시간순(id 오름차순) 행으로 버퍼를 다시 채우고 전체 예측."""
+        self._reset()
+        rows = rows[-self._size:]
+        if rows:
+            ids, X, y = self._columns(rows)
+            n = len(ids)
+            self._ids[:n], self._X[:n], self._y[:n] = ids, X, y
+            self._count, self._head, self._last_id = n, n % self._size, int(rows[-1]["id"])
+        self._rescore(predict)
+
+    def _rescore(self, predict: Callable[[np.ndarray], np.ndarray]) -> None:
+        """버퍼 전체 재예측 (모델 교체 시). 누적 합도 새로 계산해 부동소수 오차 초기화."""
+        n = self._count
+        if n:
+            self._err[:n] = predict(self._X[:n]) - self._y[:n]
+        err = self._err[:n]
+        self._sum, self._abs, self._sq = float(err.sum()), float(np.abs(err).sum()), float(err @ err)
+
+    def _push(self, rows: list[dict], predict: Callable[[np.ndarray], np.ndarray]) -> None:
+        """새 행(id 오름차순, size 건 미만) 예측 후 추가. 꽉 찬 버퍼면 가장 오래된 행부터 밀어냄."""
+        self._last_id = int(rows[-1]["id"])  # 제외된 행도 다시 읽지 않도록
+        ids, X, y = self._columns(rows)
+        n = len(ids)
+        if not n:
+            return
+        err = predict(X) - y
+        pos = (self._head + np.arange(n)) % self._size
+        evicted = max(0, self._count + n - self._size)
+        if evicted:
+            old = self._err[pos[:evicted]] if self._count == self._size else self._err[pos[-evicted:]]
+            self._sum -= float(old.sum())
+            self._abs -= float(np.abs(old).sum())
+            self._sq -= float(old @ old)
+        self._ids[pos], self._X[pos], self._y[pos], self._err[pos] = ids, X, y, err
+        self._sum += float(err.sum())
+        self._abs += float(np.abs(err).sum())
+        self._sq += float(err @ err)
+        self._head = int(pos[-1] + 1) % self._size
+        self._count = min(self._size, self._count + n)
+
+    def refresh(
+        self,
+        model: Any,
+        predict: Callable[[np.ndarray], np.ndarray],
+        fetch_latest: Callable[[int], list[dict]],
+        fetch_after: Callable[[int, int], list[dict]],
+    ) -> tuple[dict, bool]:
+        """
+        새 훈련 데이터·모델 교체를 반영한 오차 통계와 캐시 사용 여부.
+        predict: (n, 2) → (n,) 예측 (model 로 계산), fetch_latest(limit): 최근 limit 건 (최신순),
+        fetch_after(after_id, limit): after_id 이후 limit 건 (오래된 순).
+        반환 통계: count, mae, rmse, bias(평균 예측 - 실제), last_training_id
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load(fetch_latest(self._size)[::-1], predict)
+                self._model, self._loaded = model, True
+            else:
+                rows = fetch_after(self._last_id, self._size)
+                if len(rows) >= self._size:
+                    self._load(fetch_latest(self._size)[::-1], predict)
+                    self._model = model
+                elif model is not self._model:
+                    self._rescore(predict)
+                    self._model = model
+                    if rows:
+                        self._push(rows, predict)
+                elif rows:
+                    self._push(rows, predict)
+            key = (self._last_id, id(self._model))
+            if key == self._key and self._result is not None:
+                return self._result, True
+            n = self._count
+            self._result = {
+                "count": n,
+                "mae": self._abs / n if n else None,
+                "rmse": math.sqrt(max(self._sq, 0.0) / n) if n else None,
+                "bias": self._sum / n if n else None,
+                "last_training_id": self._last_id,
+            }
+            self._key = key
+            return self._result, False
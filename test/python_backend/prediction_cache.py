@@ -0,0 +1,80 @@
+# 예측값 LRU/TTL 캐시
+# 라인 제어기가 같은 설정값(온도 0.1°C, 시간 0.1h 단위)을 반복 전송하므로,
+# (모델 버전, 양자화된 feature1, 양자화된 feature2) 를 키로 예측값을 재사용합니다.
+# - max_size 초과 시 가장 오래 안 쓴 항목부터 제거, ttl 초 지난 항목은 miss 처리
+# - 모델 교체 시 clear() (키에 모델 버전도 포함되어 이전 모델 값은 재사용되지 않음)
+# - NaN·inf 입력은 양자화할 수 없으므로 key() 가 None → 캐시를 거치지 않고 바로 예측
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class PredictionCache:
+    def __init__(self, max_size: int, ttl: float = 0.0, quantum_f1: float = 0.1, quantum_f2: float = 0.1):
+        self.max_size = max(0, max_size)
+        self._ttl = ttl
+        self._q1 = quantum_f1
+        self._q2 = quantum_f2
+        self._data: OrderedDict = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expired = self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def key(self, version: Optional[str], f1: float, f2: float) -> Optional[tuple]:
+        """캐시 키. 양자화 값이 유한하지 않으면 (NaN, inf, 아주 큰 값) None."""
+        a, b = f1 / self._q1, f2 / self._q2
+        if not (math.isfinite(a) and math.isfinite(b)):
+            return None
+        return (version, round(a), round(b))
+
+    def get(self, key: tuple) -> Optional[float]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            value, stored_at = item
+            if self._ttl > 0 and time.monotonic() - stored_at > self._ttl:
+                del self._data[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: tuple, value: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self, *_args) -> None:
+        """전체 비우기 (모델 교체 리스너로도 사용)."""
+        with self._lock:
+            self._data.clear()
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "invalidations": self._invalidations,
+            }
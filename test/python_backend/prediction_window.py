@@ -0,0 +1,136 @@
+# 최근 예측값 링 버퍼 (이상 징후·예측값 이상 판정용)
+# /api/predict, /api/anomaly/check 가 매번 predictions 를 다시 조회하지 않도록
+# array('d') 고정 크기 버퍼에 최근 예측값을 유지하고 합계·제곱합·불량 수·연속 불량 수를 누적 갱신합니다 (조회 O(1)).
+# - 시작 시 DB 최근 lookback 건으로 seed
+# - 예측할 때마다 append
+# - 여러 워커(프로세스) 환경: reconcile() 이 주기적으로 MAX(id) 를 확인해 다른 워커가 저장한 건이 있으면 DB 에서 다시 seed
+
+import math
+import threading
+from array import array
+from typing import Callable, Iterable, Optional
+
+
+class PredictionWindow:
+    def __init__(self, window: int, lookback: int, threshold: float):
+        self._window = max(1, window)
+        self._lookback = max(self._window, lookback)
+        self._threshold = threshold
+        self._buf = array("d", [0.0] * self._window)
+        self._lock = threading.Lock()
+        self._reset()
+        self._seeded = False
+        self._seed_max_id = 0  # seed 시점 DB MAX(id)
+        self._local_appends = 0  # seed 이후 이 프로세스에서 append 한 건수
+        self._reconciler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _reset(self) -> None:
+        self._head = 0  # 다음에 쓸 위치
+        self._size = 0  # 버퍼에 든 값 수 (<= window)
+        self._seen = 0  # lookback 범위 내 누적 건수 (<= lookback)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._defects = 0
+        self._streak = 0
+
+    def _push(self, v: float) -> None:
+        if self._size == self._window:
+            old = self._buf[self._head]
+            self._sum -= old
+            self._sumsq -= old * old
+            if old < self._threshold:
+                self._defects -= 1
+        else:
+            self._size += 1
+        self._buf[self._head] = v
+        self._head = (self._head + 1) % self._window
+        self._sum += v
+        self._sumsq += v * v
+        if v < self._threshold:
+            self._defects += 1
+            self._streak = min(self._streak + 1, self._lookback)
+        else:
+            self._streak = 0
+        self._seen = min(self._seen + 1, self._lookback)
+
+    def append(self, value: float) -> None:
+        """예측값 1건 추가 (O(1))."""
+        with self._lock:
+            self._push(float(value))
+            self._local_appends += 1
+
+    def extend(self, values: Iterable[float]) -> None:
+        with self._lock:
+            for v in values:
+                self._push(float(v))
+                self._local_appends += 1
+
+    def seed(self, values: list[float], max_id: int) -> None:
+        """시간순(오래된 것 먼저) 값 목록으로 버퍼를 다시 채움. 누적 합은 새로 계산 (부동소수 오차 초기화)."""
+        with self._lock:
+            self._reset()
+            for v in values[-self._lookback:]:
+                self._push(float(v))
+            self._seed_max_id = max_id
+            self._local_appends = 0
+            self._seeded = True
+
+    def snapshot(self) -> dict:
+        """현재 창 통계: count, mean, std(모표준편차), defect_count, defect_ratio, consecutive_defect, seen."""
+        with self._lock:
+            n = self._size
+            mean = self._sum / n if n else 0.0
+            var = max(0.0, self._sumsq / n - mean * mean) if n > 1 else 0.0
+            return {
+                "count": n,
+                "seen": self._seen,
+                "mean": mean,
+                "std": math.sqrt(var),
+                "defect_count": self._defects,
+                "defect_ratio": self._defects / n if n else 0.0,
+                "consecutive_defect": self._streak,
+                "seeded": self._seeded,
+            }
+
+    def reconcile(self, fetch_max_id: Callable[[], int], fetch_values: Callable[[int], list[float]]) -> bool:
+        """
+        DB 와 일치 여부 확인 후 필요 시 다시 seed. 다시 seed 했으면 True.
+        - seed 전이면 무조건 seed
+        - DB 에서 늘어난 건수가 이 프로세스의 append 수보다 많으면 (다른 워커가 저장) 다시 seed
+        - write-behind 로 아직 저장되지 않은 건이 있으면 (늘어난 건수 < append 수) 그대로 유지
+        """
+        max_id = fetch_max_id() or 0
+        with self._lock:
+            if self._seeded and max_id - self._seed_max_id <= self._local_appends:
+                return False
+        self.seed(fetch_values(self._lookback), max_id)
+        return True
+
+    def start_reconciler(
+        self,
+        fetch_max_id: Callable[[], int],
+        fetch_values: Callable[[int], list[float]],
+        interval: float,
+    ) -> None:
+        """백그라운드에서 interval 초마다 reconcile (DB 오류는 무시하고 다음 주기에 재시도)."""
+        if self._reconciler is not None or interval <= 0:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.reconcile(fetch_max_id, fetch_values)
+                except Exception:
+                    pass
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._reconciler = threading.Thread(target=loop, name="prediction-window-reconciler", daemon=True)
+        self._reconciler.start()
+
+    def stop_reconciler(self) -> None:
+        self._stop.set()
+        if self._reconciler is not None:
+            self._reconciler.join(timeout=5)
+            self._reconciler = None
@@ -0,0 +1,177 @@
+# 예측 결과 write-behind 저장기
+# /api/predict 응답 경로에서 DB INSERT 를 빼고, 메모리 큐에 쌓았다가 백그라운드 스레드가 다중 행 INSERT 로 저장합니다.
+# - 건수(flush_rows) 또는 시간(flush_interval) 기준으로 flush
+# - 큐가 가득 차면 새 건은 버리고 dropped 로 집계 (요청은 막지 않음)
+# - 종료 시 stop() 으로 남은 건 모두 저장
+# - 저장 실패 시 지수 백오프로 재시도 (재시도 전 uid 로 이미 저장된 건은 제외). 끝내 실패한 건은 failed 로 집계하고 경고 로그
+# - id 는 저장 전 발급한 uid(UUID) 로 식별, 저장 후 on_persisted(id) 콜백으로 실제 predictions.id 전달
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from db import get_prediction_ids_by_uid, insert_predictions, prediction_params
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriter:
+    def __init__(
+        self,
+        flush_rows: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        insert_many: Callable[..., int] = insert_predictions,
+        resolve_ids: Callable[[list[str]], dict[str, int]] = get_prediction_ids_by_uid,
+    ):
+        self._flush_rows = max(1, flush_rows)
+        self._flush_interval = flush_interval
+        self._max_retries = max(0, max_retries)
+        self._backoff_base = backoff_base
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._insert_many = insert_many
+        self._resolve_ids = resolve_ids
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "flushed": 0, "dropped": 0, "failed": 0, "retries": 0, "flushes": 0,
+                       "last_flush_ms": None, "last_error": None}
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """백그라운드 스레드 종료. 큐에 남은 건은 모두 flush 후 종료."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(
+        self,
+        model_name: str,
+        input_summary: dict,
+        prediction_value: float,
+        meta: dict = None,
+        on_persisted: Optional[Callable[[int], None]] = None,
+    ) -> Optional[str]:
+        """
+        예측 1건을 저장 큐에 넣고 uid 반환 (큐가 가득 차면 None).
+        on_persisted: 저장 후 predictions.id 로 호출할 콜백 (예: 위험 알림 웹훅).
+        """
+        uid = str(uuid.uuid4())
+        record = (uid, prediction_params(model_name, input_summary, prediction_value, meta), on_persisted)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return None
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return uid
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "queue_depth": self._queue.qsize(), "running": self._thread is not None}
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self) -> list[tuple]:
+        """첫 건을 기다린 뒤, flush_rows 가 차거나 flush_interval 이 지날 때까지 모음."""
+        try:
+            first = self._queue.get(timeout=self._flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                # 종료 중이면 기다리지 않고 남은 것만 바로 모음
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[tuple]) -> None:
+        t0 = time.perf_counter()
+        pending = batch
+        ids: dict[str, int] = {}
+        error = None
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                if self._stop.is_set() and attempt > 1:
+                    break  # 종료 중에는 재시도 1회까지만
+                with self._lock:
+                    self._stats["retries"] += 1
+                self._stop.wait(min(30.0, self._backoff_base * 2 ** (attempt - 1)))
+                # 앞선 시도가 커밋은 됐는데 오류로 보였을 수 있으므로 저장된 uid 는 제외 (uid UNIQUE)
+                try:
+                    ids.update(self._resolve_ids([uid for uid, _, _ in pending]))
+                except Exception as e:
+                    error = e
+                    continue
+                pending = [r for r in pending if r[0] not in ids]
+                if not pending:
+                    break
+            try:
+                self._insert_many([(uid, *params) for uid, params, _ in pending], with_uid=True)
+                pending = []
+                break
+            except Exception as e:
+                error = e
+
+        failed_uids = {uid for uid, _, _ in pending}
+        saved = [r for r in batch if r[0] not in failed_uids]
+        with self._lock:
+            if pending:
+                self._stats["failed"] += len(pending)
+                self._stats["last_error"] = str(error)
+            if saved:
+                self._stats["flushed"] += len(saved)
+                self._stats["flushes"] += 1
+                self._stats["last_flush_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        if pending:
+            alerts = sum(1 for _, _, cb in pending if cb is not None)
+            logger.warning(
+                "예측 %d건 저장 실패로 버림 (위험 알림 %d건 포함, 재시도 %d회): %s",
+                len(pending), alerts, self._max_retries, error,
+            )
+
+        callbacks = {uid: cb for uid, _, cb in saved if cb is not None}
+        missing = [uid for uid in callbacks if uid not in ids]
+        if missing:
+            try:
+                ids.update(self._resolve_ids(missing))
+            except Exception as e:
+                logger.warning("저장된 예측 id 조회 실패로 위험 알림 %d건을 보내지 못함: %s", len(missing), e)
+                return
+        for uid, cb in callbacks.items():
+            pid = ids.get(uid)
+            if pid is None:
+                continue
+            try:
+                cb(pid)
+            except Exception:
+                pass
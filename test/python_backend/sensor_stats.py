@@ -0,0 +1,201 @@
+# 센서별 누적 통계(sensor_stats) 증분 갱신
+# 고장 확률 API 가 매 호출마다 원본 텔레메트리를 다시 읽지 않도록, 센서별 통계를 테이블에 유지합니다.
+# - 누적: sample_count, mean, m2 (Welford / Chan 병합), EWMA: ewma_mean, ewma_var
+# - 텔레메트리 적재 시 apply_telemetry() 로 바로 반영하거나, catch_up() 이 job_watermarks 의 telemetry.id 이후 행을 반영
+# - 센서별 last_telemetry_id 이하 행은 건너뛰므로 두 경로가 같은 행을 중복 반영하지 않음
+# - 적재 경로는 텔레메트리 INSERT 전에 lock_sensor_stats() 로 센서 행을 잠가, 같은 센서의 적재가 id 순서대로 커밋되게 함
+#   (나중에 커밋된 낮은 id 가 last_telemetry_id 보다 작아 누락되는 일 방지)
+# 테이블: docs/07_sensor_stats.sql
+#
+# 실행: python sensor_stats.py catchup   (워터마크 이후 반영)
+#       python sensor_stats.py rebuild   (통계·워터마크 초기화 후 전체 재계산)
+#       python sensor_stats.py show [--equipment-id EQ-SF-01]
+
+import argparse
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+from db import get_db, get_sensor_stats
+from failure_engine import group_ids
+from watermark_jobs import catch_up_telemetry, reset_watermark
+
+SENSOR_STATS_EWMA_ALPHA = float(os.getenv("SENSOR_STATS_EWMA_ALPHA", "0.05"))  # EWMA 가중치 (클수록 최근값 비중 큼)
+SENSOR_STATS_BATCH = int(os.getenv("SENSOR_STATS_BATCH", "50000"))  # catch-up 1회 조회 행 수
+WATERMARK_JOB = "sensor_stats"
+
+_SQL_SELECT_FOR_UPDATE = """SELECT sensor_id, sample_count, mean, m2, ewma_mean, ewma_var, last_telemetry_id
+                            FROM sensor_stats WHERE sensor_id IN ({}) FOR UPDATE"""
+_SQL_ENSURE = "INSERT IGNORE INTO sensor_stats (sensor_id) VALUES {}"
+_SQL_UPSERT = """INSERT INTO sensor_stats
+                   (sensor_id, sample_count, mean, m2, ewma_mean, ewma_var, last_value, last_recorded_at, last_telemetry_id)
+                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                 ON DUPLICATE KEY UPDATE
+                   sample_count = VALUES(sample_count), mean = VALUES(mean), m2 = VALUES(m2),
+                   ewma_mean = VALUES(ewma_mean), ewma_var = VALUES(ewma_var),
+                   last_value = VALUES(last_value), last_recorded_at = VALUES(last_recorded_at),
+                   last_telemetry_id = VALUES(last_telemetry_id)"""
+
+
+def _batch_stats(inv: np.ndarray, k: int, val: np.ndarray, alpha: float) -> dict[str, np.ndarray]:
+    """
+    배치(id 오름차순) 의 그룹별 count, mean, m2 와 EWMA 계수.
+    EWMA 는 선형 점화식이라 닫힌 형태로 계산: 그룹 끝에서 j 번째 전 값의 가중치 = alpha·(1-alpha)^j
+    """
+    count = np.bincount(inv, minlength=k)
+    mean = np.bincount(inv, weights=val, minlength=k) / count
+    dev = val - mean[inv]
+    m2 = np.bincount(inv, weights=dev * dev, minlength=k)
+
+    # 그룹 안에서의 순번 (id 순) → 그룹 끝까지 남은 개수
+    order = np.argsort(inv, kind="stable")
+    starts = np.cumsum(count) - count
+    rank = np.empty(inv.size, dtype=np.int64)
+    rank[order] = np.arange(inv.size) - starts[inv[order]]
+    w = alpha * (1.0 - alpha) ** (count[inv] - 1 - rank)
+    return {
+        "count": count,
+        "mean": mean,
+        "m2": m2,
+        "decay": (1.0 - alpha) ** count,  # 이전 EWMA 에 곱할 계수
+        "ew_sum": np.bincount(inv, weights=w * val, minlength=k),
+        "ew_sq": np.bincount(inv, weights=w * val * val, minlength=k),
+        "first": np.bincount(inv, weights=(rank == 0) * val, minlength=k),  # 그룹 첫 값 (신규 센서 EWMA 초기값)
+    }
+
+
+def ensure_sensor_rows(cur, sensor_ids: Sequence[int]) -> None:
+    """
+    센서별 통계 행이 없으면 빈 행(sample_count 0) 생성. 적재 트랜잭션 전에 별도 트랜잭션으로 호출해,
+    lock_sensor_stats() 가 갭 잠금 없이 실제 행만 잠그게 함 (신규 센서 동시 적재 시 교착 방지).
+    """
+    ids = sorted({int(s) for s in sensor_ids})
+    if ids:
+        cur.execute(_SQL_ENSURE.format(", ".join(["(%s)"] * len(ids))), tuple(ids))
+
+
+def lock_sensor_stats(cur, sensor_ids: Sequence[int]) -> dict[int, dict]:
+    """센서별 통계 행 잠금 (SELECT … FOR UPDATE, sensor_id 순) → {sensor_id: 행}. 트랜잭션 끝까지 유지."""
+    ids = sorted({int(s) for s in sensor_ids})
+    if not ids:
+        return {}
+    cur.execute(_SQL_SELECT_FOR_UPDATE.format(", ".join(["%s"] * len(ids))), tuple(ids))
+    return {r["sensor_id"]: r for r in cur.fetchall()}
+
+
+def apply_telemetry(
+    cur,
+    telemetry_ids: Sequence[int],
+    sensor_ids: Sequence[int],
+    values: Sequence[float],
+    recorded_at: Sequence,
+    alpha: float = SENSOR_STATS_EWMA_ALPHA,
+    locked: Optional[dict[int, dict]] = None,
+) -> int:
+    """
+    저장된 텔레메트리 행을 sensor_stats 에 반영 (호출자의 트랜잭션 안에서, cur: get_db() 커서).
+    센서별 last_telemetry_id 이하 행은 이미 반영된 것으로 보고 건너뜀. 반영한 행 수 반환.
+    locked: 이미 lock_sensor_stats() 로 잠근 결과 (없으면 여기서 잠금).
+    """
+    if len(telemetry_ids) == 0:
+        return 0
+    tid = np.asarray(telemetry_ids, dtype=np.int64)
+    sid = np.asarray(sensor_ids, dtype=np.int64)
+    val = np.asarray(values, dtype=np.float64)
+    src = np.argsort(tid, kind="stable")  # id 순 → 원래 입력 위치 (recorded_at 조회용)
+    tid, sid, val = tid[src], sid[src], val[src]
+
+    uniq, _, inv = group_ids(sid)
+    prev = locked if locked is not None else lock_sensor_stats(cur, uniq.tolist())
+
+    # 이미 반영된 행 제외 (센서별 last_telemetry_id 이하)
+    last_applied = np.array([prev[s]["last_telemetry_id"] if s in prev else 0 for s in uniq.tolist()], dtype=np.int64)
+    keep = (tid > last_applied[inv]) & ~np.isnan(val)
+    if not keep.any():
+        return 0
+    if not keep.all():
+        tid, sid, val, src = tid[keep], sid[keep], val[keep], src[keep]
+        uniq, _, inv = group_ids(sid)
+
+    k = uniq.size
+    b = _batch_stats(inv, k, val, alpha)
+    last_row = np.argsort(inv, kind="stable")[np.cumsum(b["count"]) - 1]  # 그룹별 마지막(최대 id) 행
+
+    params = []
+    for g, s in enumerate(uniq.tolist()):
+        nb, mb, m2b = int(b["count"][g]), float(b["mean"][g]), float(b["m2"][g])
+        p = prev.get(s)
+        if p is None or not p["sample_count"] or p["ewma_mean"] is None:
+            # 신규 센서: 배치 통계 그대로, EWMA 는 첫 값에서 시작
+            n, mean, m2 = nb, mb, m2b
+            first = float(b["first"][g])
+            ew_mean0, ew_sq0 = first, first * first
+        else:
+            # Chan 병합: 기존 (na, ma, M2a) + 배치 (nb, mb, M2b)
+            na, ma = int(p["sample_count"]), float(p["mean"])
+            n = na + nb
+            delta = mb - ma
+            mean = ma + delta * nb / n
+            m2 = float(p["m2"]) + m2b + delta * delta * na * nb / n
+            ew_mean0 = float(p["ewma_mean"])
+            ew_sq0 = float(p["ewma_var"] or 0.0) + ew_mean0 * ew_mean0
+        decay = float(b["decay"][g])
+        ew_mean = decay * ew_mean0 + float(b["ew_sum"][g])
+        ew_var = max(decay * ew_sq0 + float(b["ew_sq"][g]) - ew_mean * ew_mean, 0.0)
+        i = int(last_row[g])
+        params.append((s, n, mean, m2, ew_mean, ew_var, float(val[i]), recorded_at[int(src[i])], int(tid[i])))
+    cur.executemany(_SQL_UPSERT, params)
+    return int(tid.size)
+
+
+def _apply_rows(cur, rows: list[dict]) -> int:
+    return apply_telemetry(
+        cur,
+        [r["id"] for r in rows],
+        [r["sensor_id"] for r in rows],
+        [r["value"] for r in rows],
+        [r["recorded_at"] for r in rows],
+    )
+
+
+def catch_up(batch: int = SENSOR_STATS_BATCH, max_batches: Optional[int] = None) -> dict:
+    """
+    워터마크(telemetry.id) 이후 행을 batch 건씩 sensor_stats 에 반영. 배치마다 한 트랜잭션 (통계 + 워터마크).
+    반환: {"rows": 읽은 행, "applied": 반영 행, "watermark": 마지막 id}
+    """
+    return catch_up_telemetry(WATERMARK_JOB, _apply_rows, batch, max_batches)
+
+
+def rebuild() -> dict:
+    """통계·워터마크 초기화 후 전체 재계산."""
+    with get_db() as cur:
+        cur.execute("DELETE FROM sensor_stats")
+        reset_watermark(cur, WATERMARK_JOB)
+    return catch_up()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sensor_stats 증분 갱신")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("catchup", help="워터마크 이후 텔레메트리 반영")
+    sub.add_parser("rebuild", help="전체 재계산")
+    p_show = sub.add_parser("show", help="센서별 통계 출력")
+    p_show.add_argument("--equipment-id")
+    p_show.add_argument("--sensor-id", type=int)
+    args = parser.parse_args()
+
+    if args.cmd == "catchup":
+        print(catch_up())
+    elif args.cmd == "rebuild":
+        print(rebuild())
+    else:
+        for r in get_sensor_stats(args.equipment_id, args.sensor_id):
+            n = r["sample_count"] or 0
+            std = (r["m2"] / n) ** 0.5 if n else 0.0
+            print(f"{r['sensor_id']:>6} {r['equipment_id']:<12} n={n:<10} mean={r['mean']:.3f} std={std:.3f} "
+                  f"ewma={r['ewma_mean'] or 0:.3f} last={r['last_value']} (id {r['last_telemetry_id']})")
+
+
+if __name__ == "__main__":
+    main()
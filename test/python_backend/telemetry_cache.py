@@ -0,0 +1,428 @@
+# 로컬 텔레메트리 컬럼형 캐시 (센서별 메모리 맵 NumPy 배열)
+# - telemetry.id 워터마크 이후 행만 DB 에서 받아 센서별 컬럼 파일 끝에 덧붙임 (증분 동기화)
+# - 조회는 np.memmap 으로 파일을 그대로 매핑 → 시각순으로 쌓인 센서는 시간 범위 조회가 복사 없는 슬라이스
+#   (늦게 도착한 과거 시각 행이 섞인 센서는 sorted=false 로 표시, 조회 시 정렬 복사. compact 로 다시 정렬)
+# - 디스크 한도(TELEMETRY_CACHE_MAX_MB) 초과 시 센서마다 오래된 행부터 같은 비율로 잘라 한도의 90% 로
+# - meta.json(워터마크·센서별 행 수)을 마지막에 원자적으로 교체: 동기화 중 중단돼도 다음 동기화 때 파일을 meta 기준으로 되돌림
+#
+# 디렉터리 구조 (TELEMETRY_CACHE_DIR, 기본 python_backend/telemetry_cache):
+#   meta.json                 last_id, 센서별 {dir, rows, sorted, trimmed, last_ts, 설비 정보}
+#   <dir>/id.bin              int64          telemetry.id
+#   <dir>/ts.bin              datetime64[s]  recorded_at
+#   <dir>/value.bin           float64        value
+#   <dir>/anomaly.bin         bool           label == 'anomaly'
+#   (<dir> = s<sensor_id> 또는 잘라내기·정렬 후 s<sensor_id>.<세대>. 참조 안 되는 디렉터리는 다음 동기화 때 삭제하되,
+#    다른 프로세스가 직전 meta 로 아직 매핑 중일 수 있으므로 현재보다 2세대 이상 오래된 것만. Windows 에서 매핑 중이라
+#    지울 수 없으면 다음 동기화 때 다시 시도)
+# - 동기화 워터마크는 watermark_jobs 의 안전 지연(WATERMARK_LAG_SEC)을 따름 (늦게 커밋된 낮은 id 누락 방지)
+#
+# 실행: python telemetry_cache.py sync | stats | verify | compact | rebuild
+
+import argparse
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from db import get_db
+from watermark_jobs import fetch_telemetry_after
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없음 (동기화는 한 프로세스에서만 실행)
+    fcntl = None
+
+TELEMETRY_CACHE_DIR = os.getenv("TELEMETRY_CACHE_DIR", str(Path(__file__).resolve().parent / "telemetry_cache"))
+TELEMETRY_CACHE_MAX_MB = float(os.getenv("TELEMETRY_CACHE_MAX_MB", "1024"))  # 0 이면 한도 없음
+TELEMETRY_CACHE_BATCH = int(os.getenv("TELEMETRY_CACHE_BATCH", "100000"))  # 동기화 1회 조회 행 수
+
+COLUMNS = {
+    "id": np.dtype(np.int64),
+    "ts": np.dtype("datetime64[s]"),
+    "value": np.dtype(np.float64),
+    "anomaly": np.dtype(np.bool_),
+}
+ROW_BYTES = sum(dt.itemsize for dt in COLUMNS.values())
+TRIM_TARGET = 0.9  # 한도 초과 시 이 비율까지 줄임
+
+
+def _empty_columns() -> dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=dt) for name, dt in COLUMNS.items()}
+
+
+class TelemetryCache:
+    """센서별 컬럼 파일 캐시. 동기화(sync/compact/rebuild)는 한 번에 한 곳만, 조회는 어느 프로세스에서나."""
+
+    def __init__(self, path: str | Path = TELEMETRY_CACHE_DIR, max_bytes: int = int(TELEMETRY_CACHE_MAX_MB * 2**20)):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sync_mutex = threading.Lock()
+        self._meta: dict = {"last_id": 0, "sensors": {}}
+        self._meta_mtime: Optional[int] = None
+
+    # ---------- meta ----------
+
+    def meta(self) -> dict:
+        """현재 meta (다른 프로세스가 동기화해 meta.json 이 바뀌었으면 다시 읽음). 반환값은 수정하지 말 것."""
+        p = self.path / "meta.json"
+        try:
+            mtime = p.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"last_id": 0, "sensors": {}}
+        with self._lock:
+            if mtime != self._meta_mtime:
+                self._meta = json.loads(p.read_text(encoding="utf-8"))
+                self._meta_mtime = mtime
+            return self._meta
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path / "meta.json")
+
+    @contextmanager
+    def _sync_lock(self):
+        """동기화 작업 잠금 (스레드 + 프로세스 간 flock)"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._sync_mutex, open(self.path / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    # ---------- 파일 ----------
+
+    def _column(self, info: dict, name: str) -> np.ndarray:
+        """센서 컬럼 파일을 읽기 전용 memmap 으로 (길이는 meta 의 rows 기준, 그 뒤에 덧붙는 중인 바이트는 무시)"""
+        if info["rows"] == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self.path / info["dir"] / f"{name}.bin", dtype=COLUMNS[name], mode="r", shape=(info["rows"],))
+
+    @staticmethod
+    def _dir_generation(name: str) -> tuple[str, int]:
+        """디렉터리 이름 s<sensor_id>[.<세대>] → (sensor_id 문자열, 세대). 형식이 다르면 ("", -1)"""
+        key, _, gen = name[1:].partition(".")
+        if not name.startswith("s") or not key.isdigit() or not (gen or "0").isdigit():
+            return "", -1
+        return key, int(gen or 0)
+
+    def _new_dir(self, key: str, gen: int) -> tuple[str, int]:
+        """센서 key 의 gen 세대 이후 중 아직 없는 디렉터리 이름 (지우지 못하고 남은 디렉터리를 다시 쓰지 않도록)"""
+        while True:
+            name = f"s{key}" if gen == 0 else f"s{key}.{gen}"
+            if not (self.path / name).exists():
+                return name, gen
+            gen += 1
+
+    def _collect(self, meta: dict) -> None:
+        """
+        참조 안 되는 센서 디렉터리 삭제. 조회 중인 다른 프로세스가 직전 세대를 매핑하고 있을 수 있어
+        현재 세대보다 2세대 이상 오래된 것만 (meta 에 없는 센서는 바로). 매핑 중이라 못 지우면(Windows) 다음에.
+        """
+        referenced = {info["dir"] for info in meta["sensors"].values()}
+        current = {key: info.get("gen", 0) for key, info in meta["sensors"].items()}
+        for d in self.path.iterdir():
+            if not d.is_dir() or d.name in referenced:
+                continue
+            key, gen = self._dir_generation(d.name)
+            if key in current and gen >= current[key] - 1:
+                continue
+            try:
+                shutil.rmtree(d)
+            except PermissionError:
+                pass
+
+    def _repair(self, meta: dict) -> None:
+        """meta 기준으로 정리: 중단된 덧붙이기로 길어진 파일은 잘라내고, 오래된 세대 디렉터리는 삭제"""
+        self._collect(meta)
+        for info in meta["sensors"].values():
+            for name, dt in COLUMNS.items():
+                f = self.path / info["dir"] / f"{name}.bin"
+                if f.exists() and f.stat().st_size > info["rows"] * dt.itemsize:
+                    os.truncate(f, info["rows"] * dt.itemsize)
+
+    def _rewrite(self, key: str, info: dict, cols: dict[str, np.ndarray]) -> None:
+        """센서 데이터를 새 세대 디렉터리에 통째로 씀 (meta 교체 전까지 기존 디렉터리는 그대로)"""
+        new_dir, gen = self._new_dir(key, info.get("gen", 0) + 1)
+        (self.path / new_dir).mkdir()
+        for name, dt in COLUMNS.items():
+            np.ascontiguousarray(cols[name], dtype=dt).tofile(self.path / new_dir / f"{name}.bin")
+        info.update(dir=new_dir, gen=gen, rows=int(cols["id"].size))
+
+    # ---------- 동기화 ----------
+
+    def _append(self, meta: dict, rows: list[dict]) -> None:
+        """DB 행(id 순)을 센서별로 나눠 각 컬럼 파일 끝에 덧붙임"""
+        n = len(rows)
+        ids = np.fromiter(map(itemgetter("id"), rows), dtype=np.int64, count=n)
+        sid = np.fromiter(map(itemgetter("sensor_id"), rows), dtype=np.int64, count=n)
+        ts = np.array(list(map(itemgetter("recorded_at"), rows)), dtype="datetime64[s]")
+        value = np.array(list(map(itemgetter("value"), rows)), dtype=np.float64)
+        anomaly = np.fromiter((r.get("label") == "anomaly" for r in rows), dtype=np.bool_, count=n)
+
+        order = np.argsort(sid, kind="stable")  # 센서별로 묶되 센서 안에서는 id 순서 유지
+        sid_s = sid[order]
+        starts = np.flatnonzero(np.r_[True, sid_s[1:] != sid_s[:-1]])
+        for s0, e0 in zip(starts.tolist(), np.r_[starts[1:], n].tolist()):
+            idx = order[s0:e0]
+            key = str(int(sid_s[s0]))
+            info = meta["sensors"].get(key)
+            if info is None:
+                # 새 센서 (rebuild 뒤 지우지 못한 이전 디렉터리가 남아 있으면 다음 세대 이름으로)
+                new_dir, gen = self._new_dir(key, 0)
+                info = meta["sensors"][key] = {"dir": new_dir, "gen": gen, "rows": 0, "sorted": True, "trimmed": 0}
+            (self.path / info["dir"]).mkdir(exist_ok=True)
+            t = ts[idx]
+            if info["sorted"]:
+                in_order = t.size < 2 or bool(np.all(t[1:] >= t[:-1]))
+                if in_order and info.get("last_ts") is not None:
+                    in_order = int(t[0].astype(np.int64)) >= info["last_ts"]
+                info["sorted"] = in_order
+            t_max = int(t.astype(np.int64).max())
+            info["last_ts"] = t_max if info.get("last_ts") is None else max(info["last_ts"], t_max)
+            for name, arr in (("id", ids[idx]), ("ts", t), ("value", value[idx]), ("anomaly", anomaly[idx])):
+                with open(self.path / info["dir"] / f"{name}.bin", "ab") as f:
+                    f.write(arr.tobytes())
+            info["rows"] += int(idx.size)
+
+    def _enforce_limit(self, meta: dict) -> int:
+        """디스크 한도 초과 시 센서마다 오래된 행부터 같은 비율로 잘라냄. 잘라낸 행 수 반환."""
+        total = sum(info["rows"] for info in meta["sensors"].values()) * ROW_BYTES
+        if self.max_bytes <= 0 or total <= self.max_bytes:
+            return 0
+        keep_frac = self.max_bytes * TRIM_TARGET / total
+        dropped = 0
+        for key, info in meta["sensors"].items():
+            drop = info["rows"] - int(info["rows"] * keep_frac)
+            if drop <= 0:
+                continue
+            cols = {name: self._column(info, name) for name in COLUMNS}
+            if info["sorted"]:
+                sel = slice(drop, info["rows"])
+            else:  # 최신 시각 keep 건, 원래(id) 순서 유지
+                sel = np.sort(np.argsort(cols["ts"], kind="stable")[drop:])
+            self._rewrite(key, info, {name: np.asarray(col[sel]) for name, col in cols.items()})
+            info["trimmed"] += drop
+            dropped += drop
+        self._write_meta(meta)
+        return dropped
+
+    def sync(self, batch: int = TELEMETRY_CACHE_BATCH, max_batches: Optional[int] = None) -> dict:
+        """
+        워터마크(meta.last_id) 이후 텔레메트리를 batch 건씩 받아 캐시에 덧붙임 (배치마다 meta 교체).
+        반환 형식은 watermark_jobs.catch_up_telemetry 와 같아 CatchUpRunner 로 주기 실행 가능.
+        """
+        with self._sync_lock():
+            meta = json.loads(json.dumps(self.meta()))  # 조회 중인 meta 와 분리된 복사본을 수정
+            self._repair(meta)
+            with get_db() as cur:
+                cur.execute("SELECT id, equipment_id, sensor_name, sensor_type FROM sensors")
+                sensors = {str(r["id"]): r for r in cur.fetchall()}
+
+            total = batches = 0
+            while max_batches is None or batches < max_batches:
+                with get_db() as cur:
+                    rows, more = fetch_telemetry_after(cur, meta["last_id"], batch)
+                if not rows:
+                    break
+                self._append(meta, rows)
+                meta["last_id"] = int(rows[-1]["id"])
+                for key, info in meta["sensors"].items():
+                    s = sensors.get(key) or {}
+                    info.update(equipment_id=s.get("equipment_id"), sensor_name=s.get("sensor_name"),
+                                sensor_type=s.get("sensor_type"))
+                self._write_meta(meta)
+                total += len(rows)
+                batches += 1
+                if not more:
+                    break
+            trimmed = self._enforce_limit(meta)
+        return {"rows": total, "applied": total, "watermark": meta["last_id"], "trimmed": trimmed}
+
+    def compact(self) -> dict:
+        """시각순이 아닌(sorted=false) 센서를 (recorded_at, id) 순으로 다시 써서 시간 범위 조회를 복사 없이"""
+        with self._sync_lock():
+            meta = json.loads(json.dumps(self.meta()))
+            self._repair(meta)
+            compacted = []
+            for key, info in meta["sensors"].items():
+                if info["sorted"] or info["rows"] == 0:
+                    continue
+                cols = {name: self._column(info, name) for name in COLUMNS}
+                order = np.lexsort((cols["id"], cols["ts"]))
+                self._rewrite(key, info, {name: np.asarray(col)[order] for name, col in cols.items()})
+                info["sorted"] = True
+                compacted.append(int(key))
+            self._write_meta(meta)
+        return {"compacted": compacted}
+
+    def rebuild(self) -> dict:
+        """캐시 삭제 후 처음부터 동기화 (매핑 중이라 못 지운 디렉터리는 새 세대 이름을 피해 두었다가 다음 동기화 때 삭제)"""
+        with self._sync_lock():
+            for d in self.path.iterdir():
+                if d.is_dir():
+                    try:
+                        shutil.rmtree(d)
+                    except PermissionError:
+                        pass
+            (self.path / "meta.json").unlink(missing_ok=True)
+        return self.sync()
+
+    # ---------- 조회 ----------
+
+    def sensor_ids(self, equipment_id: Optional[str] = None, sensor_id: Optional[int] = None) -> list[int]:
+        """캐시에 있는 센서 ID (get_telemetry 와 같은 필터: equipment_id > sensor_id > 전체)"""
+        sensors = self.meta()["sensors"]
+        if equipment_id:
+            return sorted(int(k) for k, info in sensors.items() if info.get("equipment_id") == equipment_id)
+        if sensor_id:
+            return [sensor_id] if str(sensor_id) in sensors else []
+        return sorted(int(k) for k in sensors)
+
+    def read(self, sensor_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+        """
+        센서 1개의 recorded_at [start, end) 구간 컬럼 {id, ts, value, anomaly} (시각순).
+        sorted 센서면 memmap 슬라이스(복사 없음), 아니면 정렬된 복사본.
+        """
+        info = self.meta()["sensors"].get(str(sensor_id))
+        if not info or info["rows"] == 0:
+            return _empty_columns()
+        cols = {name: self._column(info, name) for name in COLUMNS}
+        ts = cols["ts"]
+        lo_t = None if start is None else np.datetime64(start, "s")
+        hi_t = None if end is None else np.datetime64(end, "s")
+        if info["sorted"]:
+            lo = 0 if lo_t is None else int(np.searchsorted(ts, lo_t, side="left"))
+            hi = ts.size if hi_t is None else int(np.searchsorted(ts, hi_t, side="left"))
+            return {name: col[lo:hi] for name, col in cols.items()}
+        mask = np.ones(ts.size, dtype=bool)
+        if lo_t is not None:
+            mask &= ts >= lo_t
+        if hi_t is not None:
+            mask &= ts < hi_t
+        idx = np.flatnonzero(mask)
+        idx = idx[np.lexsort((cols["id"][idx], ts[idx]))]
+        return {name: np.asarray(col)[idx] for name, col in cols.items()}
+
+    def window(
+        self,
+        sensor_ids: list[int],
+        limit: int = 200,
+        per_sensor_limit: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[int, dict]]:
+        """
+        db.get_telemetry 와 같은 구간(센서들 전체 최근 limit 건, 또는 센서마다 최근 per_sensor_limit 건)을
+        failure_engine.compute_failure_probability_arrays 입력 (sensor_id, value, recorded_at, sensor_info) 으로.
+        """
+        n_each = per_sensor_limit or limit
+        parts = [(sid, self.read(sid, since, until)) for sid in sensor_ids]
+        parts = [(sid, {k: v[-n_each:] for k, v in cols.items()}) for sid, cols in parts if cols["id"].size]
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64), {}
+        sensor_id = np.concatenate([np.full(cols["id"].size, sid, dtype=np.int64) for sid, cols in parts])
+        value = np.concatenate([cols["value"] for _, cols in parts])
+        ts = np.concatenate([cols["ts"] for _, cols in parts]).astype(np.int64)
+        if not per_sensor_limit and ts.size > limit:
+            keep = np.argpartition(-ts, limit - 1)[:limit]
+            sensor_id, value, ts = sensor_id[keep], value[keep], ts[keep]
+        sensors = self.meta()["sensors"]
+        sensor_info = {
+            sid: {
+                "sensor_id": sid,
+                "sensor_name": sensors[str(sid)].get("sensor_name"),
+                "sensor_type": sensors[str(sid)].get("sensor_type"),
+                "equipment_id": sensors[str(sid)].get("equipment_id"),
+            }
+            for sid, _ in parts
+        }
+        return sensor_id, value, ts, sensor_info
+
+    # ---------- 상태 / 점검 ----------
+
+    def stats(self) -> dict:
+        meta = self.meta()
+        sensors = meta["sensors"].values()
+        rows = sum(info["rows"] for info in sensors)
+        return {
+            "path": str(self.path),
+            "last_id": meta["last_id"],
+            "sensors": len(meta["sensors"]),
+            "rows": rows,
+            "bytes": rows * ROW_BYTES,
+            "max_bytes": self.max_bytes,
+            "unsorted_sensors": sum(1 for info in sensors if not info["sorted"]),
+            "trimmed_rows": sum(info["trimmed"] for info in sensors),
+        }
+
+    def verify(self) -> dict:
+        """
+        무결성 점검:
+        - 파일 크기 >= meta 행 수, 센서 안 id 중복 없음, sorted 면 ts 비감소
+        - DB 의 id <= last_id 센서별 건수 = 캐시 행 + 잘라낸 행 (missing: 캐시 누락, extra: DB 에서 삭제됨 — 보존 기간 파티션 삭제 등)
+        """
+        meta = self.meta()
+        problems = []
+        for key, info in meta["sensors"].items():
+            for name, dt in COLUMNS.items():
+                f = self.path / info["dir"] / f"{name}.bin"
+                if not f.exists() or f.stat().st_size < info["rows"] * dt.itemsize:
+                    problems.append({"sensor_id": int(key), "kind": "file", "detail": f"{name}.bin 길이 부족"})
+            if any(p["sensor_id"] == int(key) for p in problems):
+                continue
+            ids, ts = self._column(info, "id"), self._column(info, "ts")
+            if info["sorted"] and ts.size > 1 and not np.all(ts[1:] >= ts[:-1]):
+                problems.append({"sensor_id": int(key), "kind": "order", "detail": "sorted 인데 시각 역순 존재"})
+            if np.unique(ids).size != ids.size:
+                problems.append({"sensor_id": int(key), "kind": "duplicate", "detail": "id 중복"})
+
+        with get_db() as cur:
+            cur.execute(
+                "SELECT sensor_id, COUNT(*) AS n FROM telemetry WHERE id <= %s GROUP BY sensor_id", (meta["last_id"],)
+            )
+            db_counts = {str(r["sensor_id"]): int(r["n"]) for r in cur.fetchall()}
+        for key in sorted(set(db_counts) | set(meta["sensors"]), key=int):
+            info = meta["sensors"].get(key, {"rows": 0, "trimmed": 0})
+            cached, expected = info["rows"] + info["trimmed"], db_counts.get(key, 0)
+            if cached < expected:
+                problems.append({"sensor_id": int(key), "kind": "missing", "detail": f"캐시 {cached} < DB {expected}"})
+            elif cached > expected:
+                problems.append({"sensor_id": int(key), "kind": "extra", "detail": f"캐시 {cached} > DB {expected}"})
+        return {
+            "ok": not any(p["kind"] != "extra" for p in problems),
+            "last_id": meta["last_id"],
+            "problems": problems,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 텔레메트리 컬럼형 캐시")
+    parser.add_argument("cmd", choices=("sync", "stats", "verify", "compact", "rebuild"))
+    parser.add_argument("--path", default=TELEMETRY_CACHE_DIR)
+    args = parser.parse_args()
+    cache = TelemetryCache(args.path)
+    if args.cmd == "sync":
+        print(cache.sync())
+    elif args.cmd == "stats":
+        print(cache.stats())
+    elif args.cmd == "verify":
+        res = cache.verify()
+        for p in res["problems"]:
+            print(f"sensor {p['sensor_id']}: [{p['kind']}] {p['detail']}")
+        print("OK" if res["ok"] else "문제 있음 — rebuild 권장")
+    elif args.cmd == "compact":
+        print(cache.compact())
+    else:
+        print(cache.rebuild())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# 텔레메트리 대량 적재 (POST /api/telemetry/bulk)
+# - 입력: 컬럼형 JSON {"sensor_id": [...], "recorded_at": [...], "value": [...], "label": [...], "meta": [...]}
+#         또는 행 객체 배열 / NDJSON (한 줄에 {"sensor_id": .., "recorded_at": .., "value": ..})
+# - 검증: NumPy 배열로 한꺼번에 (센서 마스터 존재, 값 유한, 시각 파싱·범위, 라벨 길이, meta 형식)
+# - 시각: DATETIME 컬럼은 서버 로컬 시각(다른 스크립트의 datetime.now())이므로 오프셋 없는 ISO 문자열은 그대로,
+#         epoch 초·오프셋 있는 ISO 문자열은 로컬 시각으로 바꾸고 (한 배치에 섞여도 값마다), 미래 시각 한도도 로컬 현재 시각 기준
+# - 저장: chunk 건씩 다중 행 INSERT 1문장, chunk 마다 한 트랜잭션. 같은 트랜잭션에서 sensor_stats 증분 반영
+#   (INSERT 전에 chunk 센서의 sensor_stats 행을 잠가, 같은 센서 chunk 들이 id 순서대로 커밋되게 함)
+#   (다중 행 INSERT 의 id 는 연속 할당: innodb_autoinc_lock_mode 0/1, MariaDB 기본값 1)
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import numpy as np
+import pymysql
+
+from db import get_db, get_sensor_ids
+from fast_json import loads
+from sensor_stats import apply_telemetry, ensure_sensor_rows, lock_sensor_stats
+
+TELEMETRY_BULK_MAX_ROWS = int(os.getenv("TELEMETRY_BULK_MAX_ROWS", "200000"))  # 요청 1회 최대 행 수
+TELEMETRY_INGEST_CHUNK = int(os.getenv("TELEMETRY_INGEST_CHUNK", "5000"))  # INSERT 1문장(=1트랜잭션) 행 수
+TELEMETRY_MAX_FUTURE_SEC = float(os.getenv("TELEMETRY_MAX_FUTURE_SEC", "300"))  # 현재보다 이 초 이상 미래 시각은 거부
+# 적재 시 sensor_stats 바로 갱신 (테이블이 없으면 자동으로 끄고 catch-up 작업에 맡김)
+TELEMETRY_INGEST_UPDATE_STATS = os.getenv("TELEMETRY_INGEST_UPDATE_STATS", "true").lower() in ("true", "1", "yes")
+SENSOR_CACHE_TTL = float(os.getenv("TELEMETRY_SENSOR_CACHE_TTL", "60"))
+
+COLUMNS = ("sensor_id", "recorded_at", "value", "label", "meta")
+LABEL_MAX_LEN = 20  # telemetry.label VARCHAR(20)
+MAX_REJECTED_ROWS = 100  # 응답에 담는 거부 행 상세 최대 수
+
+_SQL_INSERT_PREFIX = "INSERT INTO telemetry (sensor_id, recorded_at, value, label, meta) VALUES "
+_ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s)"
+
+
+class IngestError(ValueError):
+    """요청 본문 형식 오류 (400)"""
+
+
+class SensorIdCache:
+    """sensors.id 집합 캐시. ttl 초마다, 또는 모르는 id 가 들어오면 (최소 1초 간격) 다시 조회."""
+
+    def __init__(self, ttl: float = SENSOR_CACHE_TTL, loader=get_sensor_ids):
+        self._ttl = ttl
+        self._loader = loader
+        self._ids = np.empty(0, dtype=np.int64)
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _reload(self) -> None:
+        self._ids = np.unique(np.asarray(self._loader(), dtype=np.int64))
+        self._loaded_at = time.monotonic()
+
+    def known(self, sensor_ids: np.ndarray) -> np.ndarray:
+        """sensor_ids 각각이 sensors 에 있는지 (bool 배열)"""
+        with self._lock:
+            age = time.monotonic() - self._loaded_at
+            if age > self._ttl:
+                self._reload()
+            mask = np.isin(sensor_ids, self._ids)
+            if not mask.all() and age > 1.0:
+                self._reload()
+                mask = np.isin(sensor_ids, self._ids)
+            return mask
+
+
+_sensor_cache = SensorIdCache()
+_stats_enabled = TELEMETRY_INGEST_UPDATE_STATS
+
+
+# ---------- 입력 파싱 ----------
+
+def columns_from_json(body: Any) -> dict[str, list]:
+    """컬럼형 dict 또는 행 객체 배열 → 컬럼별 리스트"""
+    if isinstance(body, list):
+        return _columns_from_rows(body)
+    if not isinstance(body, dict):
+        raise IngestError("본문은 컬럼형 객체 또는 행 객체 배열이어야 합니다.")
+    missing = [c for c in ("sensor_id", "recorded_at", "value") if not isinstance(body.get(c), list)]
+    if missing:
+        raise IngestError(f"컬럼 배열이 없습니다: {', '.join(missing)}")
+    n = len(body["sensor_id"])
+    cols = {}
+    for c in COLUMNS:
+        v = body.get(c)
+        if v is None or isinstance(v, (str, dict)):
+            v = [v] * n  # 생략 또는 단일 값 → 모든 행에 적용
+        if len(v) != n:
+            raise IngestError(f"{c} 길이({len(v)})가 sensor_id 길이({n})와 다릅니다.")
+        cols[c] = v
+    return cols
+
+
+def columns_from_ndjson(raw: bytes) -> dict[str, list]:
+    """NDJSON (한 줄에 행 객체 1개) → 컬럼별 리스트. 파싱 실패 줄은 빈 행으로 두어 검증에서 거부"""
+    rows = []
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(loads(line))
+        except ValueError:
+            rows.append(None)
+    return _columns_from_rows(rows)
+
+
+def _columns_from_rows(rows: list) -> dict[str, list]:
+    rows = [r if isinstance(r, dict) else {} for r in rows]
+    return {c: [r.get(c) for r in rows] for c in COLUMNS}
+
+
+def _float_array(values: list) -> np.ndarray:
+    """숫자 리스트 → float64 (숫자가 아닌 값은 nan)"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.full(len(values), np.nan)
+        for i, v in enumerate(values):
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                out[i] = v
+            elif isinstance(v, str):
+                try:
+                    out[i] = float(v)
+                except ValueError:
+                    pass
+        return out
+
+
+def _utc_offset(sec: int) -> int:
+    """epoch 초 시점의 로컬 시간대 UTC 오프셋(초). 플랫폼 범위 밖이면 0"""
+    try:
+        return time.localtime(sec).tm_gmtoff
+    except (OverflowError, OSError, ValueError):
+        return 0
+
+
+def _epoch_to_local(sec: np.ndarray) -> np.ndarray:
+    """epoch 초(int64) → 로컬 벽시계 datetime64[s]. 구간 안에 DST 전환이 없으면 오프셋 1회 계산"""
+    if sec.size == 0:
+        return sec.astype("datetime64[s]")
+    lo, hi = _utc_offset(int(sec.min())), _utc_offset(int(sec.max()))
+    if lo == hi:
+        offset = lo
+    else:
+        offset = np.fromiter((_utc_offset(t) for t in sec.tolist()), dtype=np.int64, count=sec.size)
+    return (sec + offset).astype("datetime64[s]")
+
+
+def _has_offset(text: str) -> bool:
+    """ISO 8601 문자열에 UTC 오프셋(Z, +09:00, -05:00 …)이 붙었는지 (날짜 부분 10자 뒤만 검사)"""
+    tail = text[10:]
+    return tail.endswith(("Z", "z")) or "+" in tail or "-" in tail
+
+
+def _aware_to_local(text: str) -> np.datetime64:
+    """오프셋이 붙은 ISO 8601 문자열 → 로컬 벽시계 datetime64[s]"""
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    return np.datetime64(datetime.fromisoformat(text).astimezone().replace(tzinfo=None), "s")
+
+
+def _datetime_array(values: list) -> np.ndarray:
+    """
+    recorded_at 리스트 → 로컬 벽시계 datetime64[s] (값마다 형식에 따라, 한 배치에 섞여 있어도 됨).
+    epoch 초 → 로컬 시각으로 변환, 오프셋 없는 ISO 8601 문자열 → 로컬 시각 그대로,
+    오프셋 있는 문자열 → 로컬 시각으로 변환. 그 밖의 형식·파싱 실패는 NaT.
+    """
+    n = len(values)
+    out = np.full(n, np.datetime64("NaT"), dtype="datetime64[s]")
+    if n and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        sec = np.array(values, dtype=np.float64)
+        ok = np.isfinite(sec)
+        out[ok] = _epoch_to_local(sec[ok].astype(np.int64))
+        return out
+    num_idx, num_val, str_idx, str_val = [], [], [], []
+    for i, v in enumerate(values):
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            num_idx.append(i)
+            num_val.append(v)
+        elif isinstance(v, str) and _has_offset(v):
+            try:
+                out[i] = _aware_to_local(v)
+            except (ValueError, OverflowError, OSError):
+                pass
+        elif isinstance(v, str):
+            str_idx.append(i)
+            str_val.append(v)
+    if num_idx:
+        idx, sec = np.array(num_idx), np.array(num_val, dtype=np.float64)
+        ok = np.isfinite(sec)
+        out[idx[ok]] = _epoch_to_local(sec[ok].astype(np.int64))
+    if str_idx:
+        try:
+            out[str_idx] = np.array(str_val, dtype="datetime64[s]")
+        except ValueError:
+            for i, v in zip(str_idx, str_val):
+                try:
+                    out[i] = np.datetime64(v, "s")
+                except ValueError:
+                    pass
+    return out
+
+
+# ---------- 검증 ----------
+
+def validate(cols: dict[str, list], sensor_cache: Optional[SensorIdCache] = None) -> dict:
+    """
+    컬럼별 리스트를 배열로 바꿔 벡터화 검증.
+    반환: {"mask": 유효 행 bool, "reason": 행별 거부 사유(없으면 None), 변환된 배열들}
+    """
+    sensor_cache = sensor_cache or _sensor_cache
+    n = len(cols["sensor_id"])
+    sid_f = _float_array(cols["sensor_id"])
+    sid_ok = np.isfinite(sid_f) & (sid_f == np.floor(sid_f)) & (sid_f > 0)
+    sid = np.where(sid_ok, sid_f, -1).astype(np.int64)
+    known = np.zeros(n, dtype=bool)
+    if sid_ok.any():
+        known[sid_ok] = sensor_cache.known(sid[sid_ok])
+
+    value = _float_array(cols["value"])
+    value_ok = np.isfinite(value)
+
+    ts = _datetime_array(cols["recorded_at"])
+    now = np.datetime64(datetime.now() + timedelta(seconds=TELEMETRY_MAX_FUTURE_SEC), "s")  # 로컬 (DATETIME 과 같은 기준)
+    ts_ok = ~np.isnat(ts) & (ts >= np.datetime64("1970-01-01T00:00:01")) & (ts <= now)
+
+    labels = ["normal" if v is None else v for v in cols.get("label") or [None] * n]
+    label_ok = np.array([isinstance(v, str) and 0 < len(v) <= LABEL_MAX_LEN for v in labels], dtype=bool)
+    meta_ok = np.array([v is None or isinstance(v, dict) for v in cols.get("meta") or [None] * n], dtype=bool)
+
+    # 행별 첫 번째 실패 사유 (검사 순서대로)
+    checks = (
+        ("invalid_sensor_id", sid_ok),
+        ("unknown_sensor", known | ~sid_ok),
+        ("invalid_value", value_ok),
+        ("invalid_recorded_at", ts_ok),
+        ("invalid_label", label_ok),
+        ("invalid_meta", meta_ok),
+    )
+    mask = np.ones(n, dtype=bool)
+    reason = np.full(n, None, dtype=object)
+    for name, ok in checks:
+        bad = mask & ~ok
+        reason[bad] = name
+        mask &= ok
+    return {"mask": mask, "reason": reason, "sensor_id": sid, "value": value, "recorded_at": ts, "label": labels}
+
+
+# ---------- 저장 ----------
+
+def _insert_chunk(cur, rows: list[tuple]) -> int:
+    """다중 행 INSERT 1문장으로 저장 → 첫 행 id"""
+    sql = _SQL_INSERT_PREFIX + ",".join(cur.mogrify(_ROW_PLACEHOLDER, r) for r in rows)
+    cur.execute(sql)
+    return int(cur.lastrowid)
+
+
+def _ensure_stats_rows(sensor_ids: np.ndarray) -> None:
+    """
+    요청에 나온 센서의 sensor_stats 행을 적재 전에 별도 트랜잭션으로 생성 (lock_sensor_stats 가 실제 행만 잠그도록).
+    sensor_stats 테이블이 없으면 통계 갱신을 끔. 그 밖의 DB 오류는 chunk 저장에서 보고되므로 무시.
+    """
+    global _stats_enabled
+    if not _stats_enabled:
+        return
+    try:
+        with get_db() as cur:
+            ensure_sensor_rows(cur, np.unique(sensor_ids).tolist())
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] == 1146:  # 1146: 테이블 없음 (sensor_stats 미생성)
+            _stats_enabled = False
+    except Exception:
+        pass
+
+
+def _write_chunk(rows: list[tuple], sid: np.ndarray, value: np.ndarray, ts_text: list[str]) -> bool:
+    """
+    chunk 1개를 한 트랜잭션으로 저장 (+ sensor_stats 반영). sensor_stats 를 갱신했으면 True.
+    통계 행을 INSERT 전에 잠가 같은 센서를 가진 chunk 는 잠금 순서 = id 순서 = 커밋 순서가 됨.
+    """
+    global _stats_enabled
+    update_stats = _stats_enabled
+    try:
+        with get_db() as cur:
+            locked = lock_sensor_stats(cur, sid.tolist()) if update_stats else None
+            first_id = _insert_chunk(cur, rows)
+            if update_stats:
+                ids = np.arange(first_id, first_id + len(rows), dtype=np.int64)
+                apply_telemetry(cur, ids, sid, value, ts_text, locked=locked)
+        return update_stats
+    except pymysql.err.ProgrammingError as e:
+        if not update_stats or e.args[0] != 1146:  # 1146: 테이블 없음 (sensor_stats 미생성)
+            raise
+    _stats_enabled = False  # 이후는 catch-up 작업(sensor_stats.py)에 맡김
+    with get_db() as cur:
+        _insert_chunk(cur, rows)
+    return False
+
+
+def ingest(cols: dict[str, list], chunk_size: int = TELEMETRY_INGEST_CHUNK, all_or_nothing: bool = False) -> dict:
+    """
+    검증 후 유효 행을 chunk_size 건씩 저장. 결과 요약 반환.
+    all_or_nothing=True 면 거부 행이 하나라도 있을 때 아무것도 저장하지 않음.
+    DB 오류 시 그 chunk 부터는 저장하지 않고 failed/error 로 보고 (앞선 chunk 는 이미 커밋됨).
+    """
+    t0 = time.perf_counter()
+    n = len(cols["sensor_id"])
+    v = validate(cols)
+    mask = v["mask"]
+    idx = np.flatnonzero(mask)
+    rejected_idx = np.flatnonzero(~mask)
+    reasons, counts = np.unique(v["reason"][rejected_idx].astype(str), return_counts=True)
+    result = {
+        "received": n,
+        "accepted": 0,
+        "rejected": int(rejected_idx.size),
+        "rejected_by_reason": dict(zip(reasons.tolist(), counts.tolist())),
+        "rejected_rows": [{"index": int(i), "reason": v["reason"][i]} for i in rejected_idx[:MAX_REJECTED_ROWS]],
+        "failed": 0,
+        "chunks": 0,
+        "stats_updated": False,
+    }
+    if idx.size == 0 or (all_or_nothing and rejected_idx.size):
+        result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        return result
+
+    sid = v["sensor_id"][idx]
+    value = v["value"][idx]
+    ts_text = np.char.replace(np.datetime_as_string(v["recorded_at"][idx], unit="s"), "T", " ").tolist()
+    labels = v["label"]
+    metas = cols.get("meta") or [None] * n
+    sid_list, value_list = sid.tolist(), value.tolist()
+    rows = [
+        (sid_list[j], ts_text[j], value_list[j], labels[i],
+         None if metas[i] is None else json.dumps(metas[i], ensure_ascii=False))
+        for j, i in enumerate(idx.tolist())
+    ]
+
+    chunk_size = max(1, chunk_size)
+    _ensure_stats_rows(sid)
+    for lo in range(0, len(rows), chunk_size):
+        hi = min(lo + chunk_size, len(rows))
+        try:
+            result["stats_updated"] |= _write_chunk(rows[lo:hi], sid[lo:hi], value[lo:hi], ts_text[lo:hi])
+        except Exception as e:
+            result["failed"] = len(rows) - lo
+            result["error"] = str(e)
+            break
+        result["accepted"] += hi - lo
+        result["chunks"] += 1
+
+    elapsed = time.perf_counter() - t0
+    result["elapsed_ms"] = round(elapsed * 1000, 2)
+    result["rows_per_sec"] = round(result["accepted"] / elapsed) if elapsed > 0 else None
+    return result
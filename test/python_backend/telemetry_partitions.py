@@ -0,0 +1,153 @@
+# telemetry 테이블 파티션 관리 (RANGE COLUMNS(recorded_at), 일 또는 월 단위)
+# 파티션 이름: p20250101 (일) / p202501 (월), 마지막은 p_future (MAXVALUE)
+# - maintain: p_future 를 쪼개 앞으로 ahead 단위만큼 파티션을 미리 만들고, 보존 기간이 지난 파티션은 DROP PARTITION
+#   (DROP PARTITION 은 파일 단위 삭제라 행 수와 무관하게 즉시 끝남. 대량 DELETE 불필요)
+# - p_future 는 항상 비어 있도록 미리 만들어 두므로 REORGANIZE 도 데이터 이동 없이 끝남
+# 테이블 생성·이전: docs/09_telemetry_partitioned.sql 또는 db_setup.py --partitioned
+#
+# 실행: python telemetry_partitions.py status
+#       python telemetry_partitions.py maintain [--ahead 14] [--retention-days 90] [--dry-run]
+# 주기 실행 예 (cron, 매일 01:00): 0 1 * * * cd python_backend && python telemetry_partitions.py maintain
+
+import argparse
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from db import get_db
+
+TELEMETRY_PARTITION_UNIT = os.getenv("TELEMETRY_PARTITION_UNIT", "day")  # day | month
+TELEMETRY_PARTITION_AHEAD = int(os.getenv("TELEMETRY_PARTITION_AHEAD", "14"))  # 미리 만들 파티션 수 (단위 기준)
+TELEMETRY_RETENTION_DAYS = int(os.getenv("TELEMETRY_RETENTION_DAYS", "0"))  # 원본 보존 기간(일). 0 이면 삭제 안 함
+TABLE = "telemetry"
+FUTURE_PARTITION = "p_future"
+
+_BOUND_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def floor_unit(d: date, unit: str) -> date:
+    return d.replace(day=1) if unit == "month" else d
+
+
+def next_start(d: date, unit: str) -> date:
+    if unit == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def partition_name(start: date, unit: str) -> str:
+    """구간 시작일 → 파티션 이름 (p20250101 / p202501)"""
+    return start.strftime("p%Y%m" if unit == "month" else "p%Y%m%d")
+
+
+def parse_bound(description: Optional[str]) -> Optional[date]:
+    """information_schema.PARTITIONS.PARTITION_DESCRIPTION → 상한 날짜 (MAXVALUE 면 None)"""
+    m = _BOUND_RE.search(description or "")
+    return date.fromisoformat(m.group(1)) if m else None
+
+
+def plan(
+    existing: list[tuple[str, Optional[date]]], today: date, unit: str, ahead: int, retention_days: int
+) -> dict:
+    """
+    현재 파티션 [(이름, 상한)] 기준 작업 계획.
+    - add: 마지막 상한(없으면 오늘이 속한 구간 시작)부터 today 이후 ahead 단위까지 [(이름, 상한)]
+    - drop: 상한 <= today - retention_days 인 파티션 이름 (retention_days=0 이면 없음, p_future 제외)
+    """
+    bounds = [b for _, b in existing if b is not None]
+    start = max(bounds) if bounds else floor_unit(today, unit)
+    horizon = floor_unit(today, unit)
+    for _ in range(ahead + 1):
+        horizon = next_start(horizon, unit)
+    add = []
+    while start < horizon:
+        upper = next_start(start, unit)
+        add.append((partition_name(start, unit), upper))
+        start = upper
+
+    drop = []
+    if retention_days > 0:
+        cutoff = today - timedelta(days=retention_days)
+        drop = [name for name, b in existing if b is not None and b <= cutoff]
+    return {"add": add, "drop": drop}
+
+
+def reorganize_sql(add: list[tuple[str, date]], table: str = TABLE) -> str:
+    parts = ", ".join(f"PARTITION {name} VALUES LESS THAN ('{upper.isoformat()} 00:00:00')" for name, upper in add)
+    return (f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({parts}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))")
+
+
+def drop_sql(names: list[str], table: str = TABLE) -> str:
+    return f"ALTER TABLE {table} DROP PARTITION {', '.join(names)}"
+
+
+def existing_partitions(cur, table: str = TABLE) -> list[dict]:
+    """table 파티션 목록 (이름, 상한, 대략적 행 수). 파티션 없는 테이블이면 빈 리스트"""
+    cur.execute(
+        """SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS description, TABLE_ROWS AS table_rows
+           FROM information_schema.PARTITIONS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+           ORDER BY PARTITION_ORDINAL_POSITION""",
+        (table,),
+    )
+    return [{**r, "bound": parse_bound(r["description"])} for r in cur.fetchall()]
+
+
+def maintain(
+    ahead: int = TELEMETRY_PARTITION_AHEAD,
+    retention_days: int = TELEMETRY_RETENTION_DAYS,
+    unit: str = TELEMETRY_PARTITION_UNIT,
+    dry_run: bool = False,
+    today: Optional[date] = None,
+    table: str = TABLE,
+) -> dict:
+    """미래 파티션 생성 + 만료 파티션 삭제. 실행(또는 dry_run 시 실행할) SQL 목록 반환."""
+    today = today or datetime.now().date()
+    with get_db() as cur:
+        parts = existing_partitions(cur, table)
+        if not parts:
+            raise RuntimeError(f"{table} 테이블이 파티션 구조가 아닙니다 (docs/09_telemetry_partitioned.sql 참고).")
+        if parts[-1]["name"] != FUTURE_PARTITION:
+            raise RuntimeError(f"마지막 파티션이 {FUTURE_PARTITION} (MAXVALUE) 가 아닙니다.")
+        p = plan([(r["name"], r["bound"]) for r in parts], today, unit, ahead, retention_days)
+        statements = []
+        if p["add"]:
+            statements.append(reorganize_sql(p["add"], table))
+        if p["drop"]:
+            statements.append(drop_sql(p["drop"], table))
+        if not dry_run:
+            for sql in statements:
+                cur.execute(sql)
+    return {"added": [n for n, _ in p["add"]], "dropped": p["drop"], "sql": statements, "dry_run": dry_run}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="telemetry 파티션 관리")
+    parser.add_argument("--table", default=TABLE, help="대상 테이블 (이전 작업 중이면 telemetry_p)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="파티션 목록")
+    p_m = sub.add_parser("maintain", help="미래 파티션 생성 + 만료 파티션 삭제")
+    p_m.add_argument("--ahead", type=int, default=TELEMETRY_PARTITION_AHEAD)
+    p_m.add_argument("--retention-days", type=int, default=TELEMETRY_RETENTION_DAYS)
+    p_m.add_argument("--unit", choices=("day", "month"), default=TELEMETRY_PARTITION_UNIT)
+    p_m.add_argument("--dry-run", action="store_true", help="실행하지 않고 SQL 만 출력")
+    args = parser.parse_args()
+
+    if args.cmd == "status":
+        with get_db() as cur:
+            parts = existing_partitions(cur, args.table)
+        if not parts:
+            print(f"{args.table}: 파티션 없음")
+        for r in parts:
+            print(f"{r['name']:<12} < {r['bound'] or 'MAXVALUE'!s:<12} rows≈{r['table_rows']}")
+    else:
+        res = maintain(args.ahead, args.retention_days, args.unit, args.dry_run, table=args.table)
+        for sql in res["sql"]:
+            print(sql + ";")
+        print(f"추가 {len(res['added'])}개, 삭제 {len(res['dropped'])}개" + (" (dry-run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
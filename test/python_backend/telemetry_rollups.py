@@ -0,0 +1,179 @@
+# 텔레메트리 시간 구간 집계 (telemetry_rollups, docs/08_telemetry_rollups.sql)
+# - 1분 / 1시간 / 1일 단위로 센서별 count, min, max, sum, sum of squares, anomaly 건수 유지
+# - job_watermarks 의 telemetry.id 이후 행만 읽어 NumPy 로 (센서, 구간) 그룹 집계 후 누적 UPSERT
+#   (집계 값이 모두 더하기/최소/최대라 늦게 들어온 과거 시각 행도 해당 구간에 그대로 합쳐짐)
+# - choose_resolution(): 조회 기간과 포인트 예산으로 해상도 선택
+#
+# 실행: python telemetry_rollups.py catchup | rebuild [--from-cache]
+
+import argparse
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from db import get_db
+from telemetry_cache import TelemetryCache
+from watermark_jobs import catch_up_telemetry, reset_watermark, set_watermark
+
+TELEMETRY_ROLLUP_BATCH = int(os.getenv("TELEMETRY_ROLLUP_BATCH", "50000"))  # catch-up 1회 조회 행 수
+WATERMARK_JOB = "telemetry_rollups"
+
+# 해상도 → 구간 길이(초), 세밀한 것부터
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+_SQL_UPSERT = """INSERT INTO telemetry_rollups
+                   (sensor_id, resolution, bucket_start, sample_count, min_value, max_value, sum_value, sum_sq, anomaly_count)
+                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                 ON DUPLICATE KEY UPDATE
+                   sample_count = sample_count + VALUES(sample_count),
+                   min_value = LEAST(COALESCE(min_value, VALUES(min_value)), VALUES(min_value)),
+                   max_value = GREATEST(COALESCE(max_value, VALUES(max_value)), VALUES(max_value)),
+                   sum_value = sum_value + VALUES(sum_value),
+                   sum_sq = sum_sq + VALUES(sum_sq),
+                   anomaly_count = anomaly_count + VALUES(anomaly_count)"""
+
+
+def aggregate(
+    sensor_id: np.ndarray, recorded_at: np.ndarray, value: np.ndarray, anomaly: np.ndarray, bucket_seconds: int
+) -> dict[str, np.ndarray]:
+    """
+    (센서, 구간) 별 집계. recorded_at: datetime64[s] 배열. 정렬 1회 + reduceat.
+    반환 배열: sensor_id, bucket_start(datetime64[s]), count, min, max, sum, sum_sq, anomaly_count
+    """
+    sec = recorded_at.astype("datetime64[s]").astype(np.int64)
+    bucket = sec // bucket_seconds
+    key = (sensor_id.astype(np.int64) << 32) | (bucket & 0xFFFFFFFF)
+    order = np.argsort(key, kind="stable")
+    key_s, val_s = key[order], value[order]
+    starts = np.flatnonzero(np.r_[True, key_s[1:] != key_s[:-1]])
+    return {
+        "sensor_id": key_s[starts] >> 32,
+        "bucket_start": (bucket[order][starts] * bucket_seconds).astype("datetime64[s]"),
+        "count": np.diff(np.r_[starts, key_s.size]),
+        "min": np.minimum.reduceat(val_s, starts),
+        "max": np.maximum.reduceat(val_s, starts),
+        "sum": np.add.reduceat(val_s, starts),
+        "sum_sq": np.add.reduceat(val_s * val_s, starts),
+        "anomaly_count": np.add.reduceat(anomaly[order].astype(np.int64), starts),
+    }
+
+
+def apply_rows(cur, rows: list[dict]) -> int:
+    """텔레메트리 행(id, sensor_id, recorded_at, value, label)을 모든 해상도 집계에 누적. 반영 행 수 반환."""
+    value = np.array([r["value"] for r in rows], dtype=np.float64)
+    ok = np.isfinite(value)
+    if not ok.any():
+        return 0
+    sensor_id = np.array([r["sensor_id"] for r in rows], dtype=np.int64)[ok]
+    recorded_at = np.array([r["recorded_at"] for r in rows], dtype="datetime64[s]")[ok]
+    anomaly = np.array([r.get("label") == "anomaly" for r in rows], dtype=bool)[ok]
+    return upsert_aggregates(cur, sensor_id, recorded_at, value[ok], anomaly)
+
+
+def upsert_aggregates(
+    cur, sensor_id: np.ndarray, recorded_at: np.ndarray, value: np.ndarray, anomaly: np.ndarray
+) -> int:
+    """배열(유한한 value 만)을 모든 해상도 집계에 누적 UPSERT. 반영 행 수 반환."""
+    for resolution, seconds in RESOLUTIONS.items():
+        agg = aggregate(sensor_id, recorded_at, value, anomaly, seconds)
+        bucket_text = np.char.replace(np.datetime_as_string(agg["bucket_start"], unit="s"), "T", " ").tolist()
+        cur.executemany(_SQL_UPSERT, list(zip(
+            agg["sensor_id"].tolist(),
+            [resolution] * len(bucket_text),
+            bucket_text,
+            agg["count"].tolist(),
+            agg["min"].tolist(),
+            agg["max"].tolist(),
+            agg["sum"].tolist(),
+            agg["sum_sq"].tolist(),
+            agg["anomaly_count"].tolist(),
+        )))
+    return int(value.size)
+
+
+def catch_up(batch: int = TELEMETRY_ROLLUP_BATCH, max_batches: Optional[int] = None) -> dict:
+    """워터마크 이후 텔레메트리를 batch 건씩 집계에 반영 (배치마다 한 트랜잭션)."""
+    return catch_up_telemetry(WATERMARK_JOB, apply_rows, batch, max_batches)
+
+
+def rebuild() -> dict:
+    """집계·워터마크 초기화 후 전체 재계산."""
+    with get_db() as cur:
+        cur.execute("DELETE FROM telemetry_rollups")
+        reset_watermark(cur, WATERMARK_JOB)
+    return catch_up()
+
+
+def rebuild_from_cache(cache: TelemetryCache) -> dict:
+    """
+    로컬 텔레메트리 캐시(telemetry_cache.py)로 전체 재계산 → 이력을 DB 에서 다시 읽지 않음.
+    캐시 last_id 까지는 캐시에서, 그 이후는 catch_up 으로 DB 에서. 디스크 한도로 잘린 캐시는 사용 불가.
+    워터마크를 먼저 last_id 로 옮기므로 도중에 중단되면 (중복 없이) 누락만 생김 → 다시 실행.
+    """
+    meta = cache.meta()
+    if any(info["trimmed"] for info in meta["sensors"].values()):
+        raise RuntimeError("캐시가 디스크 한도로 잘려 전체 이력이 없습니다. rebuild(DB)를 사용하세요.")
+    last_id = meta["last_id"]
+    with get_db() as cur:
+        cur.execute("DELETE FROM telemetry_rollups")
+        reset_watermark(cur, WATERMARK_JOB)
+        set_watermark(cur, last_id, WATERMARK_JOB)
+    cached = 0
+    for sid in cache.sensor_ids():
+        cols = cache.read(sid)
+        ok = np.isfinite(cols["value"]) & (cols["id"] <= last_id)  # 읽는 중 동기화로 늘어난 행 제외
+        if not ok.any():
+            continue
+        with get_db() as cur:
+            cached += upsert_aggregates(
+                cur, np.full(int(ok.sum()), sid, dtype=np.int64), cols["ts"][ok], cols["value"][ok], cols["anomaly"][ok]
+            )
+    return {"cache_rows": cached, **catch_up()}
+
+
+def choose_resolution(start: datetime, end: datetime, max_points: int) -> str:
+    """
+    기간 [start, end) 를 max_points 개 이하 구간으로 표시할 수 있는 가장 세밀한 해상도
+    (= 예산을 지키는 데 필요한 만큼만 거칠게). 1일 단위로도 넘치면 1d.
+    """
+    span = max((end - start).total_seconds(), 1.0)
+    for resolution, seconds in RESOLUTIONS.items():
+        if span / seconds <= max_points:
+            return resolution
+    return "1d"
+
+
+def series_columns(rows: list[dict]) -> dict[str, list]:
+    """rollup 행(bucket_start 순) → 컬럼형 시계열 (bucket_start, count, min, max, mean, std, anomaly_count)"""
+    count = np.array([r["sample_count"] for r in rows], dtype=np.float64)
+    total = np.array([r["sum_value"] for r in rows], dtype=np.float64)
+    sum_sq = np.array([r["sum_sq"] for r in rows], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+        std = np.sqrt(np.maximum(sum_sq / count - mean * mean, 0.0))
+    return {
+        "bucket_start": [r["bucket_start"] for r in rows],
+        "count": count.astype(np.int64).tolist(),
+        "min": [r["min_value"] for r in rows],
+        "max": [r["max_value"] for r in rows],
+        "mean": np.round(mean, 6).tolist(),
+        "std": np.round(std, 6).tolist(),
+        "anomaly_count": [r["anomaly_count"] for r in rows],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="telemetry_rollups 증분 갱신")
+    parser.add_argument("cmd", choices=("catchup", "rebuild"))
+    parser.add_argument("--from-cache", action="store_true", help="rebuild 시 이력을 로컬 텔레메트리 캐시에서 읽음")
+    args = parser.parse_args()
+    if args.cmd == "catchup":
+        print(catch_up())
+    else:
+        print(rebuild_from_cache(TelemetryCache()) if args.from_cache else rebuild())
+
+
+if __name__ == "__main__":
+    main()
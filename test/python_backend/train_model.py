@@ -1,111 +1,123 @@
 # -*- coding: utf-8 -*-
 """
-훈련 데이터(CSV)로 방전용량 선형 회귀 학습 후 models/model.json 에 계수 저장.
-표준 라이브러리만 사용. 실행: python train_model.py
+훈련 데이터로 방전용량 회귀 모델 학습 후 models/model.json 에 저장 (linear_model.py 형식).
+
+데이터를 청크 단위로 읽어 XᵀX / Xᵀy 만 누적하므로 수백만 행도 일정한 메모리로 학습합니다.
+- --source csv (기본): 프로젝트 루트 cathode_calcination_data.csv, 특징 이름은 CSV 컬럼명
+  (cathode_csv.py 공용 로더 — 두 번째 실행부터 .npy 사이드카 캐시를 mmap 으로 읽음)
+- --source db: training_data 테이블을 id 키셋 페이지로 (특징 feature1, feature2 / 목표 target)
+항: 특징별 1..--degree 차 + (--interactions) 두 특징 곱 + (--terms) 직접 지정 ('소성온도^2,소성온도*Li_Me_비율')
+
+실행: python train_model.py
+      python train_model.py --features 소성온도,소성시간,Li_Me_비율 --degree 2 --interactions
+      python train_model.py --source db --degree 2 --publish
 """
 
-from pathlib import Path
-import csv
+import argparse
 import json
+import os
+from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 
-def load_csv():
-    """CSV에서 소성온도, 소성시간, 방전용량 추출 → (X, y)."""
-    X, y = [], []
-    root = Path(__file__).resolve().parent.parent
-    path = root / "cathode_calcination_data.csv"
-    with open(path, "r", encoding="utf-8-sig") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            try:
-                f1 = float(row.get("소성온도", 0))
-                f2 = float(row.get("소성시간", 0))
-                t = float(row.get("방전용량", 0))
-                if f1 == 0 and f2 == 0 and t == 0:
-                    continue
-                X.append((f1, f2))
-                y.append(t)
-            except (ValueError, TypeError):
-                continue
-    return X, y
-
-
-def solve_3x3(a):
-    """3x3 행렬 a의 역행렬 (a는 3x3 list of lists)."""
-    def det2(a, b, c, d):
-        return a * d - b * c
-
-    m = a
-    d = (
-        m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1])
-        - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
-        + m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0])
-    )
-    if abs(d) < 1e-12:
-        return None
-    inv = [
-        [
-            det2(m[1][1], m[1][2], m[2][1], m[2][2]) / d,
-            -det2(m[0][1], m[0][2], m[2][1], m[2][2]) / d,
-            det2(m[0][1], m[0][2], m[1][1], m[1][2]) / d,
-        ],
-        [
-            -det2(m[1][0], m[1][2], m[2][0], m[2][2]) / d,
-            det2(m[0][0], m[0][2], m[2][0], m[2][2]) / d,
-            -det2(m[0][0], m[0][2], m[1][0], m[1][2]) / d,
-        ],
-        [
-            det2(m[1][0], m[1][1], m[2][0], m[2][1]) / d,
-            -det2(m[0][0], m[0][1], m[2][0], m[2][1]) / d,
-            det2(m[0][0], m[0][1], m[1][0], m[1][1]) / d,
-        ],
-    ]
-    return inv
-
-
-def fit_linear(X, y):
-    """y = b + c1*x1 + c2*x2 OLS. (X: list of (x1,x2), y: list) → (intercept, coef)."""
-    n = len(X)
-    sx1 = sx2 = sy = s11 = s22 = s12 = s1y = s2y = 0.0
-    for (x1, x2), yi in zip(X, y):
-        sx1 += x1
-        sx2 += x2
-        sy += yi
-        s11 += x1 * x1
-        s22 += x2 * x2
-        s12 += x1 * x2
-        s1y += x1 * yi
-        s2y += x2 * yi
-    # [n, sx1, sx2; sx1, s11, s12; sx2, s12, s22] @ [b, c1, c2] = [sy, s1y, s2y]
-    A = [[n, sx1, sx2], [sx1, s11, s12], [sx2, s12, s22]]
-    b_vec = [sy, s1y, s2y]
-    inv = solve_3x3(A)
-    if not inv:
-        return 0.0, [0.0, 0.0]
-    w = [sum(inv[i][j] * b_vec[j] for j in range(3)) for i in range(3)]
-    return w[0], [w[1], w[2]]
+import cathode_csv
+from linear_model import fit_stream, parse_terms, polynomial_terms, term_name
+
+DEFAULT_CSV = cathode_csv.DEFAULT_CSV
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+# 생성기(generate_cathode_data.py)에서 방전용량은 소성온도·Li_Me_비율에 대해 2차 (포물선)
+DEFAULT_FEATURES = {"csv": "소성온도,소성시간,Li_Me_비율", "db": "feature1,feature2"}
+DEFAULT_TARGET = {"csv": "방전용량", "db": "target"}
+CHUNK_ROWS = 100_000
+
+
+def iter_csv_chunks(
+    path: Path, features: list[str], target: str, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    cathode_csv.iter_chunks (검증·사이드카 캐시 공용 로더) 로 chunk_rows 행씩 검증한 (X, y).
+    사이드카 기록·mmap 읽기 모두 청크 단위이므로 메모리는 청크 크기만큼만 사용.
+    """
+    skipped = invalid = 0
+    for data in cathode_csv.iter_chunks(path, features + [target], chunk_rows=chunk_rows):
+        skipped += data.skipped
+        invalid += len(data.invalid_rows)
+        if len(data):
+            yield np.column_stack([data[f] for f in features]), np.asarray(data[target])
+    if skipped or invalid:
+        print(f"  제외: 모두 0 인 행 {skipped}건, 숫자 변환 실패 {invalid}건")
+
+
+def iter_db_chunks(chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """training_data 를 id 오름차순 키셋 페이지(after_id)로 읽어 (X: feature1, feature2 / y: target) 청크로."""
+    from db import get_training_data
+
+    after_id = 0
+    while True:
+        rows = get_training_data(limit=chunk_rows, after_id=after_id)
+        if not rows:
+            break
+        data = np.array(
+            [(r["feature1"], r["feature2"], r["target"]) for r in rows], dtype=np.float64
+        )
+        data = data[np.isfinite(data).all(axis=1)]
+        yield data[:, :2], data[:, 2]
+        after_id = rows[-1]["id"]
+        if len(rows) < chunk_rows:
+            break
 
 
 def main():
-    models_dir = Path(__file__).resolve().parent / "models"
-    models_dir.mkdir(parents=True, exist_ok=True)
-    out = models_dir / "model.json"
-
-    print("훈련 데이터 로드 중...")
-    X, y = load_csv()
-    n = len(X)
-    f1 = [p[0] for p in X]
-    f2 = [p[1] for p in X]
-    print(f"  샘플 수: {n}")
-    print(f"  소성온도: {min(f1):.1f} ~ {max(f1):.1f} °C")
-    print(f"  소성시간: {min(f2):.1f} ~ {max(f2):.1f} h")
-    print(f"  방전용량: {min(y):.2f} ~ {max(y):.2f} mAh/g")
-
-    intercept, coef = fit_linear(X, y)
-    payload = {"intercept": intercept, "coef": coef}
-    with open(out, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    print(f"모델 저장: {out}")
+    parser = argparse.ArgumentParser(description="방전용량 회귀 모델 학습 (청크 스트리밍)")
+    parser.add_argument("--source", choices=("csv", "db"), default="csv")
+    parser.add_argument("--csv", type=Path, default=DEFAULT_CSV, help="--source csv 일 때 파일 경로")
+    parser.add_argument("--features", help="쉼표 구분 특징 (앞의 두 개가 API feature1, feature2)")
+    parser.add_argument("--target")
+    parser.add_argument("--degree", type=int, default=2, help="특징별 최고 차수 (기본 2)")
+    parser.add_argument("--interactions", action="store_true", help="두 특징 곱 항 추가")
+    parser.add_argument("--terms", default="", help="추가 항 (예: 소성온도^3,소성온도*Li_Me_비율)")
+    parser.add_argument("--ridge", type=float, default=0.0, help="L2 정규화 (정규화된 특징 기준)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="청크 행 수")
+    parser.add_argument("--out", type=Path, default=MODELS_DIR / "model.json")
+    parser.add_argument("--publish", action="store_true", help="모델 레지스트리에 새 버전으로 게시·활성화")
+    args = parser.parse_args()
+
+    features = [f.strip() for f in (args.features or DEFAULT_FEATURES[args.source]).split(",") if f.strip()]
+    target = args.target or DEFAULT_TARGET[args.source]
+    if args.source == "db" and features != ["feature1", "feature2"]:
+        parser.error("--source db 의 특징은 feature1,feature2 입니다.")
+    terms = polynomial_terms(features, args.degree, args.interactions)
+    for term in parse_terms(args.terms, features):
+        if term not in terms:
+            terms.append(term)
+
+    print(f"훈련 데이터: {args.source} ({args.csv if args.source == 'csv' else 'training_data'})")
+    print(f"  특징: {features} → 목표: {target}")
+    print(f"  항: {[term_name(t) for t in terms]}")
+    chunks = (
+        iter_csv_chunks(args.csv, features, target, args.chunk) if args.source == "csv" else iter_db_chunks(args.chunk)
+    )
+    model = fit_stream(chunks, features, terms, args.ridge)
+    if model is None:
+        print("학습할 데이터가 없습니다.")
+        return
+    model["target"] = target
+    m = model["metrics"]
+    print(f"  샘플 수: {m['n']}, R²: {m['r2']}, RMSE: {m['rmse']}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    # 임시 파일에 쓴 뒤 교체: 서버 워처가 쓰는 중인 model.json 을 읽지 않도록
+    tmp = args.out.with_name(f".{args.out.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(model, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, args.out)
+    print(f"모델 저장: {args.out}")
+    if args.publish:
+        from model_registry import ModelRegistry
+
+        version = ModelRegistry(MODELS_DIR).publish(args.out)
+        print(f"레지스트리 게시·활성화: {version}")
 
 
 if __name__ == "__main__":
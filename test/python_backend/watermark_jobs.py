@@ -0,0 +1,142 @@
+# telemetry.id 워터마크 기반 증분 작업 (job_watermarks 테이블, docs/07_sensor_stats.sql)
+# - catch_up_telemetry(): 워터마크 이후 텔레메트리를 batch 건씩 읽어 apply(cur, rows) 호출 후 워터마크 전진
+#   (반영과 워터마크 갱신이 같은 트랜잭션이라 중단돼도 중복·누락 없음)
+# - 안전 지연(WATERMARK_LAG_SEC): id 는 INSERT 때 발급되지만 커밋은 나중일 수 있어, 낮은 id 가 높은 id 보다 늦게
+#   보이면 워터마크가 그 행을 영영 건너뜀 (동시 적재 chunk 등). 그래서 삽입된 지(created_at) WATERMARK_LAG_SEC 가
+#   지나지 않은 첫 행 앞까지만 반영하고 나머지는 다음 주기로 미룸 (트랜잭션이 그 시간 안에 끝난다고 가정)
+# - CatchUpRunner: FastAPI 실행 중 interval 초마다 catch-up 을 돌리는 백그라운드 스레드
+# 사용처: sensor_stats.py (센서별 누적 통계), telemetry_rollups.py (1분/1시간/1일 집계), telemetry_cache.py,
+#         online_model.py (training_data)
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from db import get_db
+
+WATERMARK_LAG_SEC = float(os.getenv("WATERMARK_LAG_SEC", "30"))  # 0 이면 지연 없음 (단일 적재 경로일 때만)
+
+SQL_TELEMETRY_AFTER = """SELECT id, sensor_id, recorded_at, value, label, created_at FROM telemetry
+                          WHERE id > %s ORDER BY id LIMIT %s"""
+
+
+def settled_cutoff(cur, lag: float = WATERMARK_LAG_SEC) -> Optional[datetime]:
+    """DB 시각 기준 NOW() - lag (created_at 과 같은 시계). lag <= 0 이면 None"""
+    if lag <= 0:
+        return None
+    cur.execute("SELECT NOW() - INTERVAL %s SECOND AS cutoff", (lag,))
+    return cur.fetchone()["cutoff"]
+
+
+def settled_prefix(rows: list[dict], cutoff: Optional[datetime]) -> list[dict]:
+    """id 순 rows 중 created_at 이 cutoff 이후인 첫 행 앞까지 (그 앞 id 의 늦은 커밋을 기다림). created_at 없으면 정착으로 봄"""
+    if cutoff is None:
+        return rows
+    for i, r in enumerate(rows):
+        created = r.get("created_at")
+        if created is not None and created > cutoff:
+            return rows[:i]
+    return rows
+
+
+def fetch_telemetry_after(cur, after_id: int, batch: int, lag: float = WATERMARK_LAG_SEC) -> tuple[list[dict], bool]:
+    """after_id 이후 텔레메트리 batch 건 중 정착된 앞부분 → (행, 바로 이어서 더 읽을지: 배치가 가득 찼고 잘리지 않음)"""
+    cutoff = settled_cutoff(cur, lag)  # 조회 전에 정함 (조회 시점에 이미 lag 이상 지난 행만)
+    cur.execute(SQL_TELEMETRY_AFTER, (after_id, batch))
+    rows = cur.fetchall()
+    settled = settled_prefix(rows, cutoff)
+    return settled, len(rows) == batch and len(settled) == len(rows)
+
+
+def get_watermark(cur, job: str, for_update: bool = False) -> int:
+    sql = "SELECT last_id FROM job_watermarks WHERE job_name = %s"
+    cur.execute(sql + " FOR UPDATE" if for_update else sql, (job,))
+    row = cur.fetchone()
+    return int(row["last_id"]) if row else 0
+
+
+def set_watermark(cur, last_id: int, job: str) -> None:
+    cur.execute(
+        """INSERT INTO job_watermarks (job_name, last_id) VALUES (%s, %s)
+           ON DUPLICATE KEY UPDATE last_id = GREATEST(last_id, VALUES(last_id))""",
+        (job, last_id),
+    )
+
+
+def reset_watermark(cur, job: str) -> None:
+    cur.execute("DELETE FROM job_watermarks WHERE job_name = %s", (job,))
+
+
+def catch_up_telemetry(
+    job: str, apply: Callable[[object, list[dict]], int], batch: int, max_batches: Optional[int] = None
+) -> dict:
+    """
+    워터마크(telemetry.id) 이후 행을 batch 건씩 apply(cur, rows) 로 반영. 배치마다 한 트랜잭션 (반영 + 워터마크).
+    여러 워커가 동시에 돌아도 워터마크 행 잠금으로 한 곳만 진행. 최근 WATERMARK_LAG_SEC 안에 삽입된 행부터는 다음 실행에.
+    반환: {"rows": 읽은 행, "applied": apply 반환값 합, "watermark": 마지막 id}
+    """
+    total = applied = batches = 0
+    watermark = 0
+    while max_batches is None or batches < max_batches:
+        with get_db() as cur:
+            set_watermark(cur, 0, job)  # 행이 없으면 생성
+            watermark = get_watermark(cur, job, for_update=True)
+            rows, more = fetch_telemetry_after(cur, watermark, batch)
+            if not rows:
+                break
+            applied += apply(cur, rows)
+            watermark = rows[-1]["id"]
+            set_watermark(cur, watermark, job)
+        total += len(rows)
+        batches += 1
+        if not more:
+            break
+    return {"rows": total, "applied": applied, "watermark": watermark}
+
+
+class CatchUpRunner:
+    """interval 초마다 job() 실행 (DB 오류·테이블 없음은 무시하고 다음 주기에 재시도). job 은 catch_up_telemetry 형태 dict 반환."""
+
+    def __init__(self, name: str, job: Callable[[], dict], interval: float):
+        self._name = name
+        self._job = job
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "rows": 0, "failures": 0, "last_error": None, "last_run_ms": None, "watermark": None}
+
+    def start(self) -> None:
+        if self._thread is not None or self._interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                res = self._job()
+                with self._lock:
+                    self._stats["runs"] += 1
+                    self._stats["rows"] += res["rows"]
+                    self._stats["watermark"] = res["watermark"]
+                    self._stats["last_run_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            except Exception as e:
+                with self._lock:
+                    self._stats["failures"] += 1
+                    self._stats["last_error"] = str(e)
+            self._stop.wait(self._interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"interval": self._interval, "running": self._thread is not None, **self._stats}
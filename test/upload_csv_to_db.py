@@ -2,116 +2,189 @@
 # -*- coding: utf-8 -*-
 """
 CSV 파일을 MariaDB의 training_data 테이블에 업로드하는 스크립트
+
+CSV 를 공용 로더(python_backend/cathode_csv.py)로 chunk 행씩 읽고 검증해 청크마다 다중 행 INSERT(executemany) 1회 + 커밋 1회로
+저장합니다 (파일 전체를 메모리에 올리지 않음).
+- --workers N: 청크 N 개를 풀 연결로 동시에 저장 (DB_POOL_SIZE 이하)
+- 체크포인트: 저장이 끝난 청크 번호를 <CSV>.upload-checkpoint.json 에 기록 → 중간에 실패해도 다시 실행하면
+  남은 청크만 저장 (CSV 파일·청크 크기가 같을 때만 이어 씀, 모두 끝나면 삭제)
+  커밋 직후 체크포인트 기록 전에 중단되면 그 청크 1개는 다시 저장될 수 있음
+- ONLINE_MODEL_ENABLED=true 면 청크마다 온라인 학습 통계(online_model.py)를 잠그고 저장·반영
+  (동시 저장 청크가 반영 위치 아래로 늦게 커밋돼 누락되지 않도록. 이 경우 청크 저장은 잠금 순서대로 직렬화됨)
+
+실행: python upload_csv_to_db.py [CSV 경로] [--chunk 5000] [--workers 4] [--restart]
 """
 
 import os
 import sys
-import csv
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 # python_backend의 db 모듈 사용
 sys.path.insert(0, str(Path(__file__).parent / "python_backend"))
 
-from db import get_db, insert_training_data
+from cathode_csv import TRAINING_COLUMNS, iter_chunks
+import online_model
+from db import DB_POOL_SIZE, get_db, insert_training_rows
 from dotenv import load_dotenv
 
 # .env 파일 로드
 env_path = Path(__file__).parent / "python_backend" / ".env"
 load_dotenv(env_path)
+ONLINE_MODEL_ENABLED = os.getenv("ONLINE_MODEL_ENABLED", "false").lower() in ("true", "1", "yes")
+
+DEFAULT_CHUNK_ROWS = 5000
+MAX_WARNINGS = 20  # 숫자 변환 오류 경고 출력 최대 건수
+
+
+class Checkpoint:
+    """저장이 끝난 청크 번호 기록 (CSV 크기·수정 시각·청크 크기가 같을 때만 이어 쓰기)."""
+
+    def __init__(self, csv_path: Path, chunk_rows: int, restart: bool = False):
+        self.path = csv_path.with_name(csv_path.name + ".upload-checkpoint.json")
+        st = csv_path.stat()
+        self._signature = {
+            "csv": csv_path.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunk_rows": chunk_rows, "layout": "csv-rows",
+        }
+        # 청크 번호는 CSV 행(빈 줄 제외) chunk_rows 행 단위 (CSV 가 같으면 같은 행 구성, 검증 후 저장 행 수는 청크마다 다름)
+        self._lock = threading.Lock()
+        self.done: set[int] = set()
+        self.inserted = 0
+        if self.path.exists() and not restart:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            if {k: saved.get(k) for k in self._signature} == self._signature:
+                self.done = set(saved["done"])
+                self.inserted = saved["inserted"]
+            else:
+                print(f"[안내] CSV 파일 또는 청크 크기가 바뀌어 체크포인트를 무시합니다: {self.path.name}")
+
+    def mark(self, chunk_no: int, rows: int) -> None:
+        with self._lock:
+            self.done.add(chunk_no)
+            self.inserted += rows
+            data = {**self._signature, "done": sorted(self.done), "inserted": self.inserted}
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
 
-def upload_csv_to_db(csv_file_path):
+def upload_csv_to_db(csv_file_path, chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: int = 1, restart: bool = False):
     """
     CSV 파일을 읽어서 training_data 테이블에 업로드
-    
+
     CSV 구조:
     - 소성온도: feature1로 사용
-    - 소성시간: feature2로 사용  
+    - 소성시간: feature2로 사용
     - 방전용량: target으로 사용
     """
     csv_path = Path(csv_file_path)
-    
+
     if not csv_path.exists():
         print(f"[오류] CSV 파일을 찾을 수 없습니다: {csv_path}")
         return False
-    
+
+    if workers > DB_POOL_SIZE:
+        print(f"[안내] --workers {workers} → DB_POOL_SIZE({DB_POOL_SIZE}) 로 제한합니다.")
+        workers = DB_POOL_SIZE
+    workers = max(1, workers)
+
     print("=" * 60)
     print("CSV 파일을 MariaDB에 업로드 중...")
     print("=" * 60)
     print(f"CSV 파일: {csv_path}")
     print(f"데이터베이스: {os.getenv('DB_NAME', 'test_db')}")
+    print(f"청크: {chunk_rows}행, 동시 저장: {workers}")
     print()
-    
+
+    checkpoint = Checkpoint(csv_path, chunk_rows, restart)
+    if checkpoint.done:
+        print(f"체크포인트에서 이어서 저장: 완료된 청크 {len(checkpoint.done)}개 ({checkpoint.inserted}건) 건너뜀")
     inserted_count = 0
-    error_count = 0
-    skipped_count = 0
-    
+    failure = None
+    t0 = time.perf_counter()
+
+    insert = online_model.insert_training_rows if ONLINE_MODEL_ENABLED else insert_training_rows
+
+    def store(chunk_no: int, rows: list[tuple]) -> int:
+        n = insert(rows)
+        checkpoint.mark(chunk_no, n)
+        return n
+
     try:
-        # UTF-8 BOM 처리
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            # CSV 읽기
-            reader = csv.DictReader(f)
-            
-            # 헤더 확인
-            headers = reader.fieldnames
-            if headers:
-                print(f"CSV 컬럼: {', '.join(headers)}")
-            print()
-            
-            # 데이터 읽기 및 삽입
-            for row_num, row in enumerate(reader, start=2):  # 2부터 시작 (헤더 제외)
-                try:
-                    # CSV 컬럼에서 값 추출
-                    # 소성온도 -> feature1
-                    feature1 = float(row.get('소성온도', 0))
-                    
-                    # 소성시간 -> feature2
-                    feature2 = float(row.get('소성시간', 0))
-                    
-                    # 방전용량 -> target
-                    target = float(row.get('방전용량', 0))
-                    
-                    # 데이터 유효성 검사
-                    if feature1 == 0 and feature2 == 0 and target == 0:
-                        skipped_count += 1
-                        continue
-                    
-                    # DB에 삽입
-                    insert_training_data(feature1, feature2, target)
-                    inserted_count += 1
-                    
-                    # 진행 상황 출력 (100건마다)
-                    if inserted_count % 100 == 0:
-                        print(f"  진행 중... {inserted_count}건 삽입 완료")
-                        
-                except ValueError as e:
-                    error_count += 1
-                    print(f"  [경고] {row_num}번째 행 처리 실패 (숫자 변환 오류): {e}")
+        # 공용 로더: 컬럼 매핑·검증(숫자 변환 실패 행 제외, 세 값이 모두 0 인 행 건너뜀)·.npy 캐시, chunk_rows 행씩
+        chunks = iter_chunks(csv_path, list(TRAINING_COLUMNS.values()), chunk_rows=chunk_rows)
+        f1, f2, tg = TRAINING_COLUMNS["feature1"], TRAINING_COLUMNS["feature2"], TRAINING_COLUMNS["target"]
+        csv_rows = skipped = invalid = 0
+
+        with ThreadPoolExecutor(workers) as pool:
+            pending = set()
+            for chunk_no, data in enumerate(chunks):
+                if failure is not None:
+                    break
+                csv_rows += len(data) + data.skipped + len(data.invalid_rows)
+                skipped += data.skipped
+                for row_num in data.invalid_rows[:max(0, MAX_WARNINGS - invalid)]:
+                    print(f"  [경고] {row_num}번째 행 처리 실패 (숫자 변환 오류)")
+                invalid += len(data.invalid_rows)
+                if chunk_no in checkpoint.done:
                     continue
-                except Exception as e:
-                    error_count += 1
-                    print(f"  [오류] {row_num}번째 행 처리 실패: {e}")
+                if not len(data):
+                    checkpoint.mark(chunk_no, 0)
                     continue
-        
+                rows = list(zip(data[f1].tolist(), data[f2].tolist(), data[tg].tolist()))
+                pending.add(pool.submit(store, chunk_no, rows))
+                # 변환이 저장보다 빠르면 메모리에 청크가 쌓이지 않도록 대기
+                while len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        try:
+                            inserted_count += fut.result()
+                        except Exception as e:
+                            failure = failure or e
+                    elapsed = time.perf_counter() - t0
+                    print(f"  진행 중... {inserted_count}건 삽입 완료 ({inserted_count / elapsed:,.0f} rows/s)")
+            for fut in pending:
+                try:
+                    inserted_count += fut.result()
+                except Exception as e:
+                    failure = failure or e
+        elapsed = time.perf_counter() - t0
+
+        if failure is not None:
+            print()
+            print(f"[오류] 청크 저장 실패: {failure}")
+            print(f"  이번 실행에서 {inserted_count}건 저장. 다시 실행하면 체크포인트({checkpoint.path.name})부터 이어서 저장합니다.")
+            return False
+        checkpoint.clear()
+
         print()
         print("=" * 60)
         print("[완료] 업로드 완료!")
         print("=" * 60)
-        print(f"  성공: {inserted_count}건")
-        if skipped_count > 0:
-            print(f"  건너뜀: {skipped_count}건")
-        if error_count > 0:
-            print(f"  오류: {error_count}건")
+        print(f"  CSV 행: {csv_rows}건")
+        print(f"  성공: {inserted_count}건 ({elapsed:.2f}초, {inserted_count / elapsed if elapsed else 0:,.0f} rows/s)")
+        if skipped > 0:
+            print(f"  건너뜀: {skipped}건")
+        if invalid:
+            print(f"  오류: {invalid}건")
         print()
-        
+
         # 업로드된 데이터 확인
         print("업로드된 데이터 확인:")
         with get_db() as cur:
             cur.execute("SELECT COUNT(*) as total FROM training_data")
             total = cur.fetchone()
             print(f"  전체 훈련 데이터: {total['total']}건")
-            
+
             cur.execute("""
-                SELECT 
+                SELECT
                     MIN(feature1) as min_feature1,
                     MAX(feature1) as max_feature1,
                     AVG(feature1) as avg_feature1,
@@ -129,12 +202,9 @@ def upload_csv_to_db(csv_file_path):
             print(f"    Feature1 (소성온도): {stats['min_feature1']:.2f} ~ {stats['max_feature1']:.2f} (평균: {stats['avg_feature1']:.2f})")
             print(f"    Feature2 (소성시간): {stats['min_feature2']:.2f} ~ {stats['max_feature2']:.2f} (평균: {stats['avg_feature2']:.2f})")
             print(f"    Target (방전용량): {stats['min_target']:.2f} ~ {stats['max_target']:.2f} (평균: {stats['avg_target']:.2f})")
-        
+
         return True
-        
-    except FileNotFoundError:
-        print(f"[오류] CSV 파일을 찾을 수 없습니다: {csv_path}")
-        return False
+
     except Exception as e:
         print(f"[오류] 업로드 중 오류 발생: {e}")
         import traceback
@@ -142,14 +212,18 @@ def upload_csv_to_db(csv_file_path):
         return False
 
 if __name__ == "__main__":
-    # CSV 파일 경로
-    csv_file = Path(__file__).parent / "cathode_calcination_data.csv"
-    
+    parser = argparse.ArgumentParser(description="CSV → training_data 일괄 업로드")
+    parser.add_argument("csv", nargs="?", default=str(Path(__file__).parent / "cathode_calcination_data.csv"))
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_ROWS, help="청크(트랜잭션) 당 행 수")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 저장할 청크 수 (DB_POOL_SIZE 이하)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 저장")
+    args = parser.parse_args()
+
     print("CSV 파일 업로드 스크립트")
     print()
-    
-    success = upload_csv_to_db(csv_file)
-    
+
+    success = upload_csv_to_db(args.csv, chunk_rows=args.chunk, workers=args.workers, restart=args.restart)
+
     if success:
         print("\n대시보드에서 데이터를 확인할 수 있습니다!")
         print("http://localhost:3000 에서 확인하세요.")
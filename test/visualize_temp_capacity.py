@@ -1,26 +1,25 @@
 """
 소성온도-방전용량 상관관계 시각화
-CSV 로드 → 산점도 + 2차 추세선 (표준 라이브러리만 사용, HTML+SVG 출력)
+CSV 로드(공용 로더 cathode_csv) → 산점도 + 2차 추세선 (계산·출력은 표준 라이브러리, HTML+SVG 출력)
 
 실행: python visualize_temp_capacity.py
 """
-import csv
+import sys
 import webbrowser
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / 'python_backend'))
+
+from cathode_csv import load
+
 CSV_PATH = Path(__file__).parent / 'cathode_calcination_data.csv'
 OUT_HTML = Path(__file__).parent / 'temp_capacity_correlation.html'
 
 
 def load_csv(path):
-    """CSV 로드 → (소성온도 리스트, 방전용량 리스트)"""
-    temp, capacity = [], []
-    with open(path, 'r', encoding='utf-8-sig') as f:
-        r = csv.DictReader(f)
-        for row in r:
-            temp.append(float(row['소성온도']))
-            capacity.append(float(row['방전용량']))
-    return temp, capacity
+    """CSV 로드 → (소성온도 리스트, 방전용량 리스트). 공용 로더의 검증·캐시 사용 (python_backend/cathode_csv.py)"""
+    data = load(path, ['소성온도', '방전용량'])
+    return data['소성온도'].tolist(), data['방전용량'].tolist()
 
 
 def mean(x):